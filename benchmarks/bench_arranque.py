@@ -0,0 +1,86 @@
+"""
+Benchmark de arranque: tiempo de importación de main_generador_final.py en invocaciones de un solo uso,
+medido con `python -X importtime` (se descuenta lo que el intérprete importa siempre, p. ej. site).
+Falla (código 1) si algún comando supera el presupuesto o si generate/check cargan la pila de cifrado o de red.
+Uso: python benchmarks/bench_arranque.py [presupuesto en ms] [repeticiones]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PRINCIPAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "main_generador_final.py")
+PRESUPUESTO_MS = 100.0
+#Tiempo de importación máximo (el mínimo de las repeticiones, menos sensible a la carga de la máquina) de los módulos del proyecto y lo que arrastran, por comando
+PROHIBIDOS = ("cryptography", "requests", "urllib3", "asyncio", "ssl", "http.client", "multiprocessing",
+              "concurrent.futures.process")
+#Módulos que un generate/check sin red ni bóveda no debe cargar
+COMANDOS = {
+    "generate": (["generate", "-n", "1"], b"", True),
+    "check": (["check"], b"Password123!\n", True),
+    "list": (["list"], b"", False),
+}
+
+
+def _importaciones(args: list, entrada: bytes, cwd: str) -> tuple:
+    """
+    Ejecuta con -X importtime y devuelve ({módulo de nivel superior: µs acumulados}, {todos los módulos}, segundos).
+    Las líneas de nivel superior son las que no tienen sangría en la columna del nombre.
+    """
+    entorno = dict(os.environ, HIBP_MODO="offline")
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-X", "importtime"] + args, input=entrada, cwd=cwd, env=entorno,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    dt = time.perf_counter() - t0
+    if p.returncode not in (0, 1):
+        print(p.stderr.decode(errors="replace")[-2000:])
+        sys.exit(1)
+    superiores, todos = {}, set()
+    for linea in p.stderr.decode(errors="replace").splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not acumulado.strip().isdigit():
+            continue  # cabecera
+        todos.add(nombre.strip())
+        if not nombre.startswith("  ", 1):
+            superiores[nombre.strip()] = superiores.get(nombre.strip(), 0) + int(acumulado)
+    return superiores, todos, dt
+
+
+def medir(repeticiones: int = 7) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        base, _, _ = _importaciones(["-c", "pass"], b"", tmp)
+        vacio = min(_importaciones(["-c", "pass"], b"", tmp)[2] for _ in range(repeticiones))
+        for nombre, (args, entrada, sin_pilas) in COMANDOS.items():
+            tiempos, procesos, cargados = [], [], set()
+            for _ in range(repeticiones):
+                superiores, todos, dt = _importaciones([PRINCIPAL] + args, entrada, tmp)
+                tiempos.append(sum(us for m, us in superiores.items() if m not in base) / 1000)
+                procesos.append(dt)
+                cargados |= todos
+            prohibidos = [p for p in PROHIBIDOS if any(m == p or m.startswith(p + ".") for m in cargados)]
+            resultados[nombre] = {"import_ms": min(tiempos), "proceso_ms": min(procesos) * 1000,
+                                  "interprete_vacio_ms": vacio * 1000,
+                                  "prohibidos": prohibidos if sin_pilas else []}
+    return resultados
+
+
+if __name__ == "__main__":
+    presupuesto = float(sys.argv[1]) if len(sys.argv) > 1 else PRESUPUESTO_MS
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    r = medir(repeticiones)
+    print(f"Importación de main_generador_final.py (mínimo de {repeticiones}, presupuesto {presupuesto:.0f} ms)")
+    fallas = []
+    for nombre, m in r.items():
+        print(f"- {nombre:10}: importaciones {m['import_ms']:6.1f} ms   proceso completo {m['proceso_ms']:6.1f} ms "
+              f"(intérprete vacío {m['interprete_vacio_ms']:.1f} ms)")
+        if m["import_ms"] > presupuesto:
+            fallas.append(f"{nombre}: {m['import_ms']:.1f} ms supera el presupuesto de {presupuesto:.0f} ms")
+        if m["prohibidos"]:
+            fallas.append(f"{nombre}: carga {', '.join(m['prohibidos'])}")
+    for f in fallas:
+        print("FALLA", f)
+    sys.exit(1 if fallas else 0)
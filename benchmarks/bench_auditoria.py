@@ -0,0 +1,59 @@
+"""
+Benchmark de auditoría: eventos por segundo del registro original (abrir, escribir una línea y cerrar por evento)
+frente al escritor con hilo y cola, para cada nivel de durabilidad. Incluye el vaciado final en el tiempo medido.
+Uso: python benchmarks/bench_auditoria.py [eventos]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import audit
+
+
+def _registrar_original(ruta: str, evento: str, params: dict = None):
+    registro = {"timestamp": datetime.utcnow().isoformat() + "Z", "evento": evento, "params": params or {}}
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro) + "\n")
+
+
+def _contar_lineas(ruta: str) -> int:
+    with open(ruta, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def medir(eventos: int) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "original.log")
+        t0 = time.perf_counter()
+        for i in range(eventos):
+            _registrar_original(ruta, "generated", {"len": 16, "i": i})
+        resultados["original"] = eventos / (time.perf_counter() - t0)
+        for durabilidad in audit.DURABILIDADES:
+            audit.AUDIT_FILE = os.path.join(tmp, f"{durabilidad}.log")
+            audit.AUDIT_DURABILIDAD = durabilidad
+            t0 = time.perf_counter()
+            for i in range(eventos):
+                audit.registrar_evento("generated", {"len": 16, "i": i})
+            audit.vaciar_auditoria()
+            resultados[durabilidad] = eventos / (time.perf_counter() - t0)
+            if _contar_lineas(audit.AUDIT_FILE) != eventos:
+                print(f"ERROR: faltan eventos con durabilidad {durabilidad}")
+                sys.exit(1)
+        audit.cerrar_auditoria()
+    return resultados
+
+
+if __name__ == "__main__":
+    eventos = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    r = medir(eventos)
+    print(f"Auditoría: {eventos:,} eventos")
+    print(f"- original (abrir/cerrar por evento): {r['original']:,.0f} eventos/s")
+    for durabilidad in audit.DURABILIDADES:
+        print(f"- escritor en segundo plano, durabilidad {durabilidad:5}: {r[durabilidad]:,.0f} eventos/s "
+              f"({r[durabilidad] / r['original']:.1f}x)")
@@ -0,0 +1,86 @@
+"""
+Benchmark de consultas de auditoría: "todos los hibp_hit de la última semana" recorriendo un audit.log plano
+(json.loads de cada línea) frente a consultar_eventos sobre segmentos comprimidos con índice (un segmento por día).
+Uso: python benchmarks/bench_auditoria_consulta.py [eventos_por_dia] [dias]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import audit
+
+EVENTOS = ["generated", "evaluacion", "hibp_checked", "saved_encrypted", "variants_generated"]
+
+
+def _dia(rnd, inicio: datetime, n: int) -> list:
+    lineas = []
+    for i in range(n):
+        ts = inicio + timedelta(seconds=86400 * i / n)
+        evento = "hibp_hit" if rnd.random() < 0.005 else rnd.choice(EVENTOS)
+        lineas.append(json.dumps({"timestamp": ts.isoformat() + "Z", "evento": evento,
+                                  "params": {"len": 16, "i": i}}) + "\n")
+    return lineas
+
+
+def _recorrido_plano(ruta: str, evento: str, desde: datetime) -> int:
+    n = 0
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            r = json.loads(linea)
+            if r["evento"] == evento and datetime.fromisoformat(r["timestamp"].replace("Z", "")) >= desde:
+                n += 1
+    return n
+
+
+def medir(eventos_por_dia: int, dias: int) -> dict:
+    rnd = random.Random(3)
+    ahora = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as tmp:
+        audit.AUDIT_FILE = os.path.join(tmp, "audit.log")
+        audit.AUDIT_SEGMENTOS_DIR = os.path.join(tmp, "segmentos")
+        plano = os.path.join(tmp, "plano.log")
+        with open(plano, "w", encoding="utf-8") as todo:
+            for d in range(dias, 0, -1):
+                lineas = _dia(rnd, ahora - timedelta(days=d), eventos_por_dia)
+                todo.writelines(lineas)
+                with open(audit.AUDIT_FILE, "w", encoding="utf-8") as f:
+                    f.writelines(lineas)
+                audit.rotar_auditoria()
+        bytes_plano = os.path.getsize(plano)
+        bytes_segmentos = sum(os.path.getsize(os.path.join(audit.AUDIT_SEGMENTOS_DIR, x))
+                              for x in os.listdir(audit.AUDIT_SEGMENTOS_DIR))
+        desde = ahora - timedelta(days=7)
+
+        t0 = time.perf_counter()
+        esperado = _recorrido_plano(plano, "hibp_hit", desde)
+        t_plano = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        obtenido = sum(1 for _ in audit.consultar_eventos("hibp_hit", desde=desde))
+        t_indice = time.perf_counter() - t0
+        tracemalloc.start()  # en una pasada aparte: tracemalloc distorsiona los tiempos
+        sum(1 for _ in audit.consultar_eventos("hibp_hit", desde=desde))
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if obtenido != esperado:
+            print(f"ERROR: {obtenido} resultados, se esperaban {esperado}")
+            sys.exit(1)
+    return {"eventos": eventos_por_dia * dias, "resultados": obtenido, "plano_s": t_plano, "indice_s": t_indice,
+            "pico_memoria_kb": pico / 1024, "bytes_plano": bytes_plano, "bytes_segmentos": bytes_segmentos}
+
+
+if __name__ == "__main__":
+    por_dia = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    dias = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    r = medir(por_dia, dias)
+    print(f"Auditoría: {r['eventos']:,} eventos en {dias} días, hibp_hit de los últimos 7 días ({r['resultados']})")
+    print(f"- audit.log plano ({r['bytes_plano'] / 2**20:.1f} MiB): {r['plano_s']:.2f} s")
+    print(f"- segmentos comprimidos ({r['bytes_segmentos'] / 2**20:.1f} MiB): {r['indice_s']:.3f} s, "
+          f"pico de memoria {r['pico_memoria_kb']:.0f} KiB")
@@ -0,0 +1,62 @@
+"""
+Benchmark de lista negra: escaneo lineal de blacklist.txt frente al índice compilado (mmap + búsqueda binaria).
+Uso: python benchmarks/bench_blacklist.py [lineas] [consultas]
+"""
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from blacklist import compilar_indice, IndiceBlacklist
+
+
+def _escaneo_lineal(password: str, blacklist_file: str) -> bool:
+    #Implementación original de chequear_blacklist_local
+    with open(blacklist_file, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if password.strip() == line.strip():
+                return True
+    return False
+
+
+def medir(lineas: int, consultas: int, bloom: bool = True) -> dict:
+    rnd = random.Random(1234)
+    with tempfile.TemporaryDirectory() as tmp:
+        txt = os.path.join(tmp, "blacklist.txt")
+        idx = os.path.join(tmp, "blacklist.idx")
+        with open(txt, "w", encoding="utf-8") as f:
+            for _ in range(lineas):
+                f.write("".join(rnd.choices(string.ascii_lowercase + string.digits, k=10)) + "\n")
+        consultas_pw = ["Q" + "".join(rnd.choices(string.ascii_letters, k=12)) for _ in range(consultas)]
+
+        t0 = time.perf_counter()
+        compilar_indice(txt, idx, bloom=bloom)
+        t_compilar = time.perf_counter() - t0
+
+        n_lineal = max(1, min(consultas, 5))
+        t0 = time.perf_counter()
+        for pw in consultas_pw[:n_lineal]:
+            _escaneo_lineal(pw, txt)
+        t_lineal = (time.perf_counter() - t0) / n_lineal
+
+        with IndiceBlacklist(idx) as indice:
+            t0 = time.perf_counter()
+            for pw in consultas_pw:
+                indice.contiene(pw)
+            t_indice = (time.perf_counter() - t0) / consultas
+
+    return {"lineas": lineas, "compilar_s": t_compilar,
+            "lineal_us": t_lineal * 1e6, "indice_us": t_indice * 1e6}
+
+
+if __name__ == "__main__":
+    lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    r = medir(lineas, consultas)
+    print(f"Lista de {lineas} líneas (compilación: {r['compilar_s']:.2f} s)")
+    print(f"- escaneo lineal:   {r['lineal_us']:,.1f} µs/consulta")
+    print(f"- índice compilado: {r['indice_us']:,.1f} µs/consulta")
@@ -0,0 +1,61 @@
+"""
+Benchmark del costo fijo por operación de storage: leer key.bin y construir Fernet en cada llamada (original)
+frente a la caché validada por stat y a sesion_boveda() (sin tocar el disco).
+Uso: python benchmarks/bench_cifrador.py [operaciones]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+from cryptography.fernet import Fernet
+
+
+def _original():
+    #Implementación anterior de _get_cipher
+    with open(storage.KEY_FILE, "rb") as f:
+        key = f.read()
+    return Fernet(key)
+
+
+def medir(ops: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.KEY_FILE = os.path.join(tmp, "key.bin")
+        storage.VAULT_DB = os.path.join(tmp, "vault.db")
+        storage.VAULT_BACKEND = "sqlite"
+        storage.generar_key()
+        token = storage._get_cipher().encrypt(b"x")
+
+        t0 = time.perf_counter()
+        for _ in range(ops):
+            _original().decrypt(token)
+        t_original = (time.perf_counter() - t0) / ops
+        t0 = time.perf_counter()
+        for _ in range(ops):
+            storage._get_cipher().decrypt(token)
+        t_cache = (time.perf_counter() - t0) / ops
+        with storage.sesion_boveda():
+            t0 = time.perf_counter()
+            for _ in range(ops):
+                storage._get_cipher().decrypt(token)
+            t_sesion = (time.perf_counter() - t0) / ops
+        t0 = time.perf_counter()
+        for _ in range(ops):
+            storage._get_cipher().decrypt(token)
+        t_cache = min(t_cache, (time.perf_counter() - t0) / ops)
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+    return {"original_us": t_original * 1e6, "cache_us": t_cache * 1e6, "sesion_us": t_sesion * 1e6}
+
+
+if __name__ == "__main__":
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    r = medir(ops)
+    print(f"{ops} descifrados de un token (incluye obtener el cifrador)")
+    print(f"- leer key.bin + Fernet() por llamada: {r['original_us']:.1f} µs")
+    print(f"- caché validada por stat:             {r['cache_us']:.1f} µs")
+    print(f"- dentro de sesion_boveda():           {r['sesion_us']:.1f} µs")
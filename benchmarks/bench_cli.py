@@ -0,0 +1,53 @@
+"""
+Benchmark de los subcomandos no interactivos: operaciones por segundo de generate, check y store
+ejecutando main_generador_final.py como lo haría un pipeline (proceso aparte, stdin/stdout).
+Incluye el arranque del intérprete. Uso: python benchmarks/bench_cli.py [operaciones]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PRINCIPAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "main_generador_final.py")
+
+
+def _correr(args: list, entrada: bytes, cwd: str) -> tuple:
+    entorno = dict(os.environ, HIBP_MODO="offline")
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, PRINCIPAL] + args, input=entrada, cwd=cwd, env=entorno,
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    dt = time.perf_counter() - t0
+    if p.returncode not in (0, 1):
+        print(p.stderr.decode(errors="replace"))
+        sys.exit(1)
+    return dt, p.stdout
+
+
+def medir(n: int) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        dt, salida = _correr(["generate", "-n", str(n), "--formato", "texto"], b"", tmp)
+        resultados["generate texto"] = n / dt
+        dt, salida = _correr(["generate", "-n", str(n), "--evaluar"], b"", tmp)
+        resultados["generate --evaluar"] = n / dt
+        passwords = b"\n".join(linea.split(b'"')[3] for linea in salida.splitlines())
+        dt, _ = _correr(["check", "--sin-hibp"], passwords, tmp)
+        resultados["check"] = n / dt
+        aliases = "\n".join(f"cuenta{i}" for i in range(n)).encode()
+        dt, _ = _correr(["store", "--generar", "--forzar"], aliases, tmp)
+        resultados["store --generar --forzar"] = n / dt
+        aliases = "\n".join(f"otra{i}" for i in range(n)).encode()
+        dt, _ = _correr(["store", "--generar"], aliases, tmp)
+        resultados["store --generar (con control de reutilización)"] = n / dt
+        dt, _ = _correr(["list"], b"", tmp)
+        resultados["list"] = 2 * n / dt
+    return resultados
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    r = medir(n)
+    print(f"Subcomandos con {n:,} operaciones (incluye arranque del proceso)")
+    for nombre, ops in r.items():
+        print(f"- {nombre:48}: {ops:,.0f} ops/s")
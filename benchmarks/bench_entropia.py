@@ -0,0 +1,50 @@
+"""
+Benchmark del estimador por patrones con presupuesto de latencia por contraseña.
+Mide la carga de las tablas precompiladas y la latencia p50/p99/máxima sobre un corpus mixto
+(contraseñas generadas y elegidas por humanos). Termina con error si se supera el presupuesto.
+Uso: python benchmarks/bench_entropia.py [contraseñas] [presupuesto_p99_ms]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+PRESUPUESTO_P99_MS = 10.0
+PRESUPUESTO_CARGA_MS = 50.0
+
+
+def medir(n: int) -> dict:
+    t0 = time.perf_counter()
+    import entropia
+    entropia._obtener_tablas()
+    t_carga = (time.perf_counter() - t0) * 1e3
+
+    from generator import generar_lote
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from bench_fuerza import corpus
+    rnd = random.Random(8)
+    datos = corpus(n // 2) + generar_lote(n // 4, 16) + generar_lote(n - n // 2 - n // 4, 32)
+    rnd.shuffle(datos)
+
+    tiempos = []
+    for pw in datos:
+        t0 = time.perf_counter()
+        entropia.estimar_entropia(pw)
+        tiempos.append((time.perf_counter() - t0) * 1e3)
+    tiempos.sort()
+    return {"n": n, "carga_ms": t_carga, "p50_ms": tiempos[len(tiempos) // 2],
+            "p99_ms": tiempos[int(len(tiempos) * 0.99)], "max_ms": tiempos[-1]}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    presupuesto = float(sys.argv[2]) if len(sys.argv) > 2 else PRESUPUESTO_P99_MS
+    r = medir(n)
+    print(f"Carga de tablas: {r['carga_ms']:.1f} ms (presupuesto {PRESUPUESTO_CARGA_MS} ms)")
+    print(f"{n} estimaciones: p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, máx {r['max_ms']:.2f} ms "
+          f"(presupuesto p99 {presupuesto} ms)")
+    if r["p99_ms"] > presupuesto or r["carga_ms"] > PRESUPUESTO_CARGA_MS:
+        print("FALLA: presupuesto de latencia superado")
+        sys.exit(1)
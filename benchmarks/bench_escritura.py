@@ -0,0 +1,58 @@
+"""
+Benchmark de escrituras en la bóveda json: una reescritura atómica (temporal + fsync + rename) por cambio
+frente a agrupar los cambios con lote_boveda() (una sola escritura), y lo mismo para sqlite.
+Uso: python benchmarks/bench_escritura.py [entradas_previas] [cambios]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+
+
+def _cambios(n: int, prefijo: str):
+    for i in range(n):
+        storage.guardar_contrasena_cifrada(f"Pw!{prefijo}{i}", f"{prefijo}{i}")
+
+
+def medir(entradas: int, cambios: int) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.KEY_FILE = os.path.join(tmp, "key.bin")
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage.VAULT_DB = os.path.join(tmp, "vault.db")
+        storage.generar_key()
+        token = storage._get_cipher().encrypt(b"x").decode()
+        storage._escribir_vault([{"alias": f"e{i}", "password": token, "created_at": "", "expires_at": "",
+                                  "meta": {}} for i in range(entradas)])
+        storage.migrar_json_a_sqlite()
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage._escribir_vault([{"alias": f"e{i}", "password": token, "created_at": "", "expires_at": "",
+                                  "meta": {}} for i in range(entradas)])
+        for backend in ("json", "sqlite"):
+            storage.VAULT_BACKEND = backend
+            t0 = time.perf_counter()
+            _cambios(cambios, "uno")
+            t_uno = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            with storage.lote_boveda():
+                _cambios(cambios, "lote")
+            t_lote = time.perf_counter() - t0
+            resultados[backend] = {"uno_cambios_s": cambios / t_uno, "lote_cambios_s": cambios / t_lote}
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+    return resultados
+
+
+if __name__ == "__main__":
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cambios = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    r = medir(entradas, cambios)
+    print(f"{cambios} cambios sobre una bóveda de {entradas:,} entradas")
+    for backend, x in r.items():
+        print(f"- {backend:6}: commit por cambio {x['uno_cambios_s']:,.0f} cambios/s, "
+              f"lote_boveda {x['lote_cambios_s']:,.0f} cambios/s")
@@ -0,0 +1,59 @@
+"""
+Benchmark de evaluación de fuerza: evaluar_fuerza una por una frente a evaluar_fuerza_lote sobre un corpus generado
+(contraseñas aleatorias, palabras con dígitos, secuencias, repeticiones y algunas no ASCII).
+Verifica que ambos resultados sean idénticos; termina con error si no lo son.
+Uso: python benchmarks/bench_fuerza.py [tamaño_corpus]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from generator import generar_lote
+from validator import evaluar_fuerza, evaluar_fuerza_lote
+
+PALABRAS = ["password", "dragon", "monkey", "Qwerty", "sunshine", "princess", "fútbol", "contraseña", "ABC", "admin"]
+
+
+def corpus(n: int, semilla: int = 3) -> list:
+    rnd = random.Random(semilla)
+    salida = generar_lote(n // 2, 12)
+    while len(salida) < n:
+        tipo = rnd.random()
+        if tipo < 0.4:
+            pw = rnd.choice(PALABRAS) + str(rnd.randint(0, 9999))
+        elif tipo < 0.6:
+            pw = "".join(rnd.choices(string.digits, k=rnd.randint(4, 10)))
+        elif tipo < 0.8:
+            c = rnd.choice(string.ascii_letters)
+            pw = rnd.choice(PALABRAS) + c * rnd.randint(1, 4) + "!"
+        else:
+            pw = "".join(rnd.choices(string.printable.strip() + "ñÁ²", k=rnd.randint(0, 20)))
+        salida.append(pw)
+    rnd.shuffle(salida)
+    return salida
+
+
+def medir(n: int) -> dict:
+    datos = corpus(n)
+    t0 = time.perf_counter()
+    uno_a_uno = [evaluar_fuerza(pw) for pw in datos]
+    t_uno = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    lote = evaluar_fuerza_lote(datos)
+    t_lote = time.perf_counter() - t0
+    return {"n": n, "uno_pw_s": n / t_uno, "lote_pw_s": n / t_lote, "iguales": uno_a_uno == lote}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    r = medir(n)
+    print(f"Corpus de {n} contraseñas")
+    print(f"- evaluar_fuerza:      {r['uno_pw_s']:,.0f} contraseñas/s")
+    print(f"- evaluar_fuerza_lote: {r['lote_pw_s']:,.0f} contraseñas/s (x{r['lote_pw_s'] / r['uno_pw_s']:.1f})")
+    print(f"- resultados idénticos: {r['iguales']}")
+    if not r["iguales"]:
+        sys.exit(1)
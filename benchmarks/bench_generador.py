@@ -0,0 +1,41 @@
+"""
+Benchmark de generación: compara generar_contrasena (un secrets.choice por carácter) con generar_lote (bloques de entropía).
+Uso: python benchmarks/bench_generador.py [n] [longitud]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from generator import generar_contrasena, generar_lote
+
+
+def medir(n: int, longitud: int) -> dict:
+    #Devuelve contraseñas por segundo de cada implementación
+    t0 = time.perf_counter()
+    for _ in range(n):
+        generar_contrasena(longitud, True, True, True, True)
+    t_individual = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    generar_lote(n, longitud, True, True, True, True)
+    t_lote = time.perf_counter() - t0
+
+    return {
+        "n": n,
+        "longitud": longitud,
+        "individual_pw_s": n / t_individual,
+        "lote_pw_s": n / t_lote,
+        "aceleracion": t_individual / t_lote,
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    longitud = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    r = medir(n, longitud)
+    print(f"{n} contraseñas de longitud {longitud}")
+    print(f"- generar_contrasena: {r['individual_pw_s']:,.0f} contraseñas/s")
+    print(f"- generar_lote:       {r['lote_pw_s']:,.0f} contraseñas/s")
+    print(f"- aceleración:        x{r['aceleracion']:.1f}")
@@ -0,0 +1,70 @@
+"""
+Benchmark de la caché de rangos HIBP contra un servidor local (sin red).
+Mide latencia por consulta y ratio de aciertos: sin caché (comportamiento original), caché fría y caché caliente.
+Uso: python benchmarks/bench_hibp_cache.py [consultas] [distintas] [latencia_ms]
+"""
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import hibp
+from servidor_hibp_local import ServidorHIBPLocal
+
+
+def medir(consultas: int, distintas: int, latencia: float) -> dict:
+    rnd = random.Random(99)
+    pool = ["".join(rnd.choices(string.ascii_letters + string.digits, k=12)) for _ in range(distintas)]
+    carga = [rnd.choice(pool) for _ in range(consultas)]
+    comprometidas = pool[:10]
+    resultados = {}
+    with ServidorHIBPLocal(comprometidas=comprometidas, latencia=latencia) as srv, \
+            tempfile.TemporaryDirectory() as tmp:
+        hibp.HIBP_API_URL = srv.url
+        esperado = {pw: pw in comprometidas for pw in pool}
+
+        # Sin caché: una descarga por consulta (TTL 0, sin disco)
+        sin_cache = hibp.CacheRangos(directorio=None, ttl=-1)
+        t0 = time.perf_counter()
+        for pw in carga:
+            hibp.contar_online(pw, cache=sin_cache)
+        resultados["sin_cache_ms"] = (time.perf_counter() - t0) / consultas * 1e3
+
+        cache = hibp.CacheRangos(directorio=os.path.join(tmp, "cache"), max_memoria=distintas // 2)
+        t0 = time.perf_counter()
+        ok = True
+        for pw in carga:
+            ok &= ((hibp.contar_online(pw, cache=cache) or 0) > 0) == esperado[pw]
+        resultados["fria_ms"] = (time.perf_counter() - t0) / consultas * 1e3
+        resultados["fria_ratio"] = cache.ratio_aciertos()
+
+        # Caché caliente en otro proceso: memoria vacía, disco poblado
+        cache2 = hibp.CacheRangos(directorio=os.path.join(tmp, "cache"))
+        t0 = time.perf_counter()
+        for pw in carga:
+            hibp.contar_online(pw, cache=cache2)
+        resultados["disco_ms"] = (time.perf_counter() - t0) / consultas * 1e3
+        t0 = time.perf_counter()
+        for pw in carga:
+            hibp.contar_online(pw, cache=cache2)
+        resultados["memoria_ms"] = (time.perf_counter() - t0) / consultas * 1e3
+        resultados["caliente_ratio"] = cache2.ratio_aciertos()
+        resultados["correcto"] = ok
+        resultados["peticiones_http"] = srv.peticiones
+    return resultados
+
+
+if __name__ == "__main__":
+    consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    distintas = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    latencia = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.005
+    r = medir(consultas, distintas, latencia)
+    print(f"{consultas} consultas sobre {distintas} contraseñas distintas (latencia simulada {latencia * 1000:.0f} ms)")
+    print(f"- sin caché:               {r['sin_cache_ms']:.3f} ms/consulta")
+    print(f"- caché fría:              {r['fria_ms']:.3f} ms/consulta, aciertos {r['fria_ratio']:.1%}")
+    print(f"- caché en disco/memoria:  {r['disco_ms']:.3f} / {r['memoria_ms']:.3f} ms/consulta, aciertos {r['caliente_ratio']:.1%}")
+    print(f"- resultados correctos: {r['correcto']} (peticiones HTTP totales: {r['peticiones_http']})")
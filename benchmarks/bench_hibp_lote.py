@@ -0,0 +1,46 @@
+"""
+Benchmark del chequeo HIBP por lotes (asyncio, prefijos deduplicados, conexiones keep-alive)
+frente al camino secuencial (una petición por contraseña), contra un servidor local.
+Uso: python benchmarks/bench_hibp_lote.py [contraseñas] [latencia_ms] [concurrencia]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import hibp
+from generator import generar_lote
+from servidor_hibp_local import ServidorHIBPLocal
+
+
+def medir(n: int, latencia: float, concurrencia: int) -> dict:
+    candidatos = generar_lote(n, 14)
+    comprometidas = candidatos[:5]
+    with ServidorHIBPLocal(comprometidas=comprometidas, latencia=latencia) as srv:
+        hibp.HIBP_API_URL = srv.url
+
+        t0 = time.perf_counter()
+        secuencial = {pw: hibp.contar_online(pw, cache=hibp.CacheRangos(directorio=None)) for pw in candidatos}
+        t_sec = time.perf_counter() - t0
+        peticiones_sec = srv.peticiones
+
+        t0 = time.perf_counter()
+        lote = hibp.contar_lote(candidatos, concurrencia=concurrencia, cache=hibp.CacheRangos(directorio=None))
+        t_lote = time.perf_counter() - t0
+        peticiones_lote = srv.peticiones - peticiones_sec
+
+    return {"n": n, "secuencial_s": t_sec, "lote_s": t_lote, "iguales": secuencial == lote,
+            "peticiones_secuencial": peticiones_sec, "peticiones_lote": peticiones_lote,
+            "comprometidas_detectadas": sum(1 for pw in comprometidas if lote.get(pw))}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    concurrencia = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    r = medir(n, latencia, concurrencia)
+    print(f"{n} contraseñas, latencia simulada {latencia * 1000:.0f} ms, concurrencia {concurrencia}")
+    print(f"- secuencial: {r['secuencial_s']:.2f} s ({r['peticiones_secuencial']} peticiones)")
+    print(f"- lote async: {r['lote_s']:.2f} s ({r['peticiones_lote']} peticiones), x{r['secuencial_s'] / r['lote_s']:.1f}")
+    print(f"- resultados idénticos: {r['iguales']}, comprometidas detectadas: {r['comprometidas_detectadas']}/5")
@@ -0,0 +1,55 @@
+"""
+Benchmark de listado de la bóveda: leer_todas (descifra todo) frente a listar_metadatos (sin descifrar)
+y leer_todas_perezoso (descifra solo lo que se consulta).
+Uso: python benchmarks/bench_listado.py [entradas]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+
+
+def medir(entradas: int) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.KEY_FILE = os.path.join(tmp, "key.bin")
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage.VAULT_DB = os.path.join(tmp, "vault.db")
+        storage.generar_key()
+        cipher = storage._get_cipher()
+        storage._escribir_vault([{
+            "alias": f"alias{i}", "password": cipher.encrypt(f"Pw!{i:08d}".encode()).decode(),
+            "created_at": "2025-01-01T00:00:00Z", "expires_at": "2025-04-01T00:00:00Z", "meta": {}
+        } for i in range(entradas)])
+        for backend in ("json", "sqlite"):
+            storage.VAULT_BACKEND = backend
+            if backend == "sqlite":
+                storage.migrar_json_a_sqlite()
+            t0 = time.perf_counter()
+            storage.leer_todas()
+            t_todas = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            storage.listar_metadatos()
+            t_meta = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            registros = storage.leer_todas_perezoso()
+            [r["password_plain"] for r in registros[:10]]
+            t_perezoso = time.perf_counter() - t0
+            resultados[backend] = {"leer_todas_s": t_todas, "metadatos_s": t_meta, "perezoso_10_s": t_perezoso}
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+    return resultados
+
+
+if __name__ == "__main__":
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    r = medir(entradas)
+    print(f"Listado de {entradas:,} entradas")
+    for backend, x in r.items():
+        print(f"- {backend:6}: leer_todas {x['leer_todas_s']:.3f} s, listar_metadatos {x['metadatos_s']:.3f} s, "
+              f"perezoso (10 descifradas) {x['perezoso_10_s']:.3f} s")
@@ -0,0 +1,61 @@
+"""
+Benchmark de operaciones masivas de la bóveda: importar CSV y rotar clave con 1 proceso frente a N procesos.
+Uso: python benchmarks/bench_masivo.py [entradas] [procesos]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+
+
+def _preparar(tmp: str, entradas: int) -> str:
+    storage.KEY_FILE = os.path.join(tmp, "key.bin")
+    storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+    storage.VAULT_DB = os.path.join(tmp, "vault.db")
+    for con in storage._conexiones.values():
+        con.close()
+    storage._conexiones.clear()
+    for ruta in (storage.VAULT_DB, storage.KEY_FILE):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+    storage.generar_key()
+    ruta_csv = os.path.join(tmp, "import.csv")
+    if not os.path.exists(ruta_csv):
+        with open(ruta_csv, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["alias", "password"])
+            for i in range(entradas):
+                w.writerow([f"alias{i}", f"Pw!{i:08d}xyz"])
+    return ruta_csv
+
+
+def medir(entradas: int, procesos: int) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sorted({1, procesos}):
+            ruta_csv = _preparar(tmp, entradas)
+            t0 = time.perf_counter()
+            storage.importar_csv(ruta_csv, trabajadores=n)
+            t_importar = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            storage.rotar_clave(trabajadores=n)
+            t_rotar = time.perf_counter() - t0
+            resultados[n] = {"importar_s": t_importar, "rotar_s": t_rotar}
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+    return resultados
+
+
+if __name__ == "__main__":
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    r = medir(entradas, procesos)
+    print(f"{entradas:,} entradas")
+    for n, x in r.items():
+        print(f"- {n} proceso(s): importar {x['importar_s']:.2f} s, rotar clave {x['rotar_s']:.2f} s")
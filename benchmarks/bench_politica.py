@@ -0,0 +1,56 @@
+"""
+Benchmark de políticas: reintentos esperados con "generar hasta que evaluar_fuerza esté conforme"
+frente a generar_con_politica (cumple por construcción, 0 reintentos).
+Uso: python benchmarks/bench_politica.py [n] [longitud]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from generator import generar_contrasena, generar_con_politica, PoliticaContrasena
+from validator import evaluar_fuerza
+
+
+def _cumple(pw: str) -> bool:
+    #Criterio que aplicaban los llamadores: las 4 clases presentes y sin issues en evaluar_fuerza
+    r = evaluar_fuerza(pw)
+    return (any(c.isupper() for c in pw) and any(c.islower() for c in pw)
+            and any(c.isdigit() for c in pw) and any(not c.isalnum() for c in pw)
+            and not any(r["issues"].values()))
+
+
+def medir(n: int, longitud: int) -> dict:
+    reintentos = 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        while not _cumple(generar_contrasena(longitud, True, True, True, True)):
+            reintentos += 1
+    t_reintento = time.perf_counter() - t0
+
+    politica = PoliticaContrasena(longitud=longitud)
+    fallos = 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        if not _cumple(generar_con_politica(politica)):
+            fallos += 1
+    t_politica = time.perf_counter() - t0
+
+    return {
+        "n": n,
+        "longitud": longitud,
+        "reintentos_por_pw": reintentos / n,
+        "reintento_pw_s": n / t_reintento,
+        "politica_reintentos_por_pw": fallos / n,
+        "politica_pw_s": n / t_politica,
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    longitud = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    r = medir(n, longitud)
+    print(f"{n} contraseñas de longitud {longitud}")
+    print(f"- regenerar hasta cumplir: {r['reintentos_por_pw']:.3f} reintentos/pw, {r['reintento_pw_s']:,.0f} pw/s")
+    print(f"- generar_con_politica:    {r['politica_reintentos_por_pw']:.3f} reintentos/pw, {r['politica_pw_s']:,.0f} pw/s")
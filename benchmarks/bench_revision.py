@@ -0,0 +1,115 @@
+"""
+Benchmark de la auditoría de la bóveda (src/revision.py) sobre una bóveda sintética: contraseñas generadas más
+duplicadas, variantes parecidas (1-2 cambios), entradas de la lista negra y de una base HIBP offline plantadas.
+Verifica que se encuentren todas las plantadas y, sobre una muestra, que la búsqueda de parecidas dé lo mismo que
+comparar todos los pares con es_demasiado_similar.
+Uso: python benchmarks/bench_revision.py [entradas] [trabajadores]
+"""
+import csv
+import hashlib
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import audit
+import storage
+from generator import generar_lote
+from hibp import compilar_base
+from validator import es_demasiado_similar
+from revision import revisar_boveda, pares_similares
+
+PLANTADAS = 0.01
+#Fracción de la bóveda de cada tipo plantado (duplicadas, parecidas, lista negra, HIBP)
+
+
+def _variante(rnd: random.Random, pw: str) -> str:
+    #Uno o dos caracteres cambiados en una contraseña de 16: nunca igual a la original, siempre sobre el umbral.
+    s = list(pw)
+    for i in rnd.sample(range(len(s)), rnd.randint(1, 2)):
+        s[i] = rnd.choice(string.ascii_letters.replace(s[i], ""))
+    return "".join(s)
+
+
+def _bovedas_sinteticas(n: int, rnd: random.Random):
+    base = generar_lote(n, 16)
+    k = max(1, int(n * PLANTADAS))
+    indices = rnd.sample(range(n), 4 * k)
+    duplicadas, parecidas, negras, brechas = (indices[i * k:(i + 1) * k] for i in range(4))
+    filas = [[f"e{i}", pw] for i, pw in enumerate(base)]
+    for i in duplicadas:
+        filas.append([f"dup{i}", base[i]])
+    for i in parecidas:
+        filas.append([f"sim{i}", _variante(rnd, base[i])])
+    return filas, duplicadas, parecidas, [base[i] for i in negras], [base[i] for i in brechas]
+
+
+def medir(n: int = 100_000, trabajadores: int = None) -> dict:
+    rnd = random.Random(25)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        audit.AUDIT_FILE = os.path.join(tmp, "audit.log")
+        storage.KEY_FILE, storage.VAULT_DB = os.path.join(tmp, "key.bin"), os.path.join(tmp, "vault.db")
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage.generar_key()
+        filas, duplicadas, parecidas, negras, brechas = _bovedas_sinteticas(n, rnd)
+        with open("entrada.csv", "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows([["alias", "password"]] + filas)
+        storage.importar_csv("entrada.csv", trabajadores)
+        with open("blacklist.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(negras + ["123456", "password"]) + "\n")
+        with open("dump.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(f"{hashlib.sha1(pw.encode()).hexdigest().upper()}:{i + 1}"
+                              for i, pw in enumerate(brechas)) + "\n")
+        compilar_base("dump.txt")
+
+        t0 = time.perf_counter()
+        informe = revisar_boveda(trabajadores, blacklist_file="blacklist.txt", hibp_modo="offline")
+        total = time.perf_counter() - t0
+
+        # Comprobaciones: todo lo plantado aparece en el informe
+        hallazgos = {h["alias"]: h for h in informe["hallazgos"]}
+        faltan = [f"dup{i}" for i in duplicadas if "duplicada" not in hallazgos.get(f"dup{i}", {}).get("motivos", [])]
+        faltan += [f"sim{i}" for i in parecidas if "similar" not in hallazgos.get(f"sim{i}", {}).get("motivos", [])]
+        if informe["lista_negra"] != len(negras) or informe["hibp"]["comprometidas"] != len(brechas):
+            faltan.append(f"lista negra {informe['lista_negra']}/{len(negras)}, "
+                          f"hibp {informe['hibp']['comprometidas']}/{len(brechas)}")
+        storage._conexiones.clear()
+
+    # Muestra: índice de prefijos contra todos los pares
+    muestra = list(dict.fromkeys(pw for _, pw in rnd.sample(filas, min(1500, len(filas)))))
+    muestra += [_variante(rnd, pw) for pw in muestra[:300]]
+    muestra = list(dict.fromkeys(muestra))
+    t0 = time.perf_counter()
+    todos = {(j, i) for i in range(len(muestra)) for j in range(i) if es_demasiado_similar(muestra[i], muestra[j])}
+    t_todos = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    indice = set(pares_similares(muestra, trabajadores=1))
+    t_indice = time.perf_counter() - t0
+    return {"informe": informe, "total_s": total, "faltan": faltan, "muestra": len(muestra),
+            "muestra_iguales": indice == todos, "muestra_pares": len(todos),
+            "muestra_todos_s": t_todos, "muestra_indice_s": t_indice}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    trabajadores = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    r = medir(n, trabajadores)
+    inf = r["informe"]
+    print(f"Auditoría de {inf['entradas']:,} entradas ({trabajadores or os.cpu_count()} trabajadores): "
+          f"{r['total_s']:.1f} s")
+    for etapa, s in inf["tiempos_s"].items():
+        print(f"- {etapa:22}: {s:8.2f} s")
+    print(f"Hallazgos {len(inf['hallazgos']):,}: duplicadas {len(inf['duplicadas'])} grupos, "
+          f"parecidas {inf['pares_similares']} pares, lista negra {inf['lista_negra']}, "
+          f"HIBP {inf['hibp']['comprometidas']} ({inf['hibp']['prefijos']:,} prefijos)")
+    print(f"Muestra de {r['muestra']:,}: {r['muestra_pares']} pares parecidos; todos los pares "
+          f"{r['muestra_todos_s']:.2f} s, índice {r['muestra_indice_s']:.2f} s, "
+          f"{'iguales' if r['muestra_iguales'] else 'DISTINTOS'}")
+    if r["faltan"] or not r["muestra_iguales"]:
+        print("FALLA", r["faltan"][:5])
+        sys.exit(1)
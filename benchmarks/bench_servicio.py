@@ -0,0 +1,159 @@
+"""
+Prueba de carga del servicio HTTP (src/servicio.py) en localhost: latencia p50/p99 y peticiones por segundo
+con varios clientes concurrentes (conexiones keep-alive), por tipo de operación.
+Como referencia mide también la latencia de lanzar main_generador_final.py por cada operación.
+Uso: python benchmarks/bench_servicio.py [peticiones por escenario] [clientes concurrentes]
+"""
+import asyncio
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+class _Cliente:
+    #Conexión HTTP/1.1 keep-alive mínima (Content-Length) contra el servicio.
+
+    def __init__(self, puerto: int, token: str):
+        self.puerto = puerto
+        self.token = token
+        self._lector = self._escritor = None
+
+    async def abrir(self):
+        self._lector, self._escritor = await asyncio.open_connection("127.0.0.1", self.puerto)
+
+    def cerrar(self):
+        self._escritor.close()
+
+    async def peticion(self, metodo: str, ruta: str, datos=None) -> tuple:
+        cuerpo = json.dumps(datos).encode() if datos is not None else b""
+        self._escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {self.token}\r\n"
+                             f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo)
+        await self._escritor.drain()
+        status = int((await self._lector.readline()).split()[1])
+        largo = 0
+        while True:
+            linea = await self._lector.readline()
+            if linea == b"\r\n":
+                break
+            if linea.lower().startswith(b"content-length:"):
+                largo = int(linea.split(b":")[1])
+        return status, json.loads(await self._lector.readexactly(largo))
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+async def _escenario(puerto: int, token: str, n: int, clientes: int, peticion) -> dict:
+    """
+    Reparte n peticiones entre `clientes` conexiones concurrentes. peticion(i) -> (metodo, ruta, datos, esperados).
+    Aborta si alguna respuesta no tiene el status esperado.
+    """
+    latencias = []
+    siguiente = iter(range(n))
+
+    async def cliente():
+        c = _Cliente(puerto, token)
+        await c.abrir()
+        try:
+            for i in siguiente:
+                metodo, ruta, datos, esperados = peticion(i)
+                t0 = time.perf_counter()
+                status, respuesta = await c.peticion(metodo, ruta, datos)
+                latencias.append(time.perf_counter() - t0)
+                if status not in esperados:
+                    print(f"{metodo} {ruta}: status {status} {respuesta}")
+                    sys.exit(1)
+        finally:
+            c.cerrar()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(clientes)))
+    total = time.perf_counter() - t0
+    return {"req_s": n / total, "p50_ms": _percentil(latencias, 0.50) * 1000,
+            "p99_ms": _percentil(latencias, 0.99) * 1000}
+
+
+async def _medir_servicio(puerto: int, token: str, n: int, clientes: int) -> dict:
+    escenarios = {
+        "generar": lambda i: ("POST", "/generar", {"longitud": 20}, (200,)),
+        "generar x10 + evaluar": lambda i: ("POST", "/generar", {"cantidad": 10, "evaluar": True}, (200,)),
+        "evaluar": lambda i: ("POST", "/evaluar", {"password": f"Clave#{i:06d}xyZ"}, (200,)),
+        "brechas (offline)": lambda i: ("POST", "/brechas", {"password": f"clave{i}", "modo": "offline"}, (200,)),
+        "boveda guardar (forzar)": lambda i: ("POST", "/boveda", {"alias": f"f{i}", "forzar": True}, (201,)),
+        "boveda guardar (reutilización)": lambda i: ("POST", "/boveda", {"alias": f"r{i}"}, (201, 409)),
+        "boveda leer alias": lambda i: ("GET", f"/boveda/f{i}", None, (200,)),
+        "mezcla 80% lectura": lambda i: (("POST", "/boveda", {"alias": f"m{i}", "forzar": True}, (201,)) if i % 5 == 0
+                                         else ("GET", f"/boveda/f{i}", None, (200,))),
+    }
+    resultados = {}
+    for nombre, peticion in escenarios.items():
+        resultados[nombre] = await _escenario(puerto, token, n, clientes, peticion)
+
+    # Comprobación: todo lo confirmado con forzar está en la bóveda
+    c = _Cliente(puerto, token)
+    await c.abrir()
+    sin_token = _Cliente(puerto, "")
+    await sin_token.abrir()
+    status, _ = await sin_token.peticion("GET", "/boveda/f0")
+    sin_token.cerrar()
+    if status != 401:
+        print(f"GET /boveda/f0 sin token: status {status}")
+        sys.exit(1)
+    _, listado = await c.peticion("GET", "/boveda")
+    _, salud = await c.peticion("GET", "/salud")
+    c.cerrar()
+    aliases = {e["alias"] for e in listado["entradas"]}
+    faltan = [a for a in [f"f{i}" for i in range(n)] + [f"m{i}" for i in range(0, n, 5)] if a not in aliases]
+    if faltan:
+        print(f"Faltan {len(faltan)} entradas en la bóveda, p. ej. {faltan[:3]}")
+        sys.exit(1)
+    resultados["_escrituras_por_commit"] = salud["escrituras_boveda"] / max(1, salud["lotes_boveda"])
+    return resultados
+
+
+def _medir_subproceso(repeticiones: int, cwd: str) -> dict:
+    #Referencia: una operación = un proceso (lo que hacen hoy los servicios que llaman al CLI).
+    latencias = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(SRC, "main_generador_final.py"), "generate", "-n", "1"],
+                       cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        latencias.append(time.perf_counter() - t0)
+    return {"req_s": repeticiones / sum(latencias), "p50_ms": _percentil(latencias, 0.50) * 1000,
+            "p99_ms": _percentil(latencias, 0.99) * 1000}
+
+
+def medir(n: int = 2000, clientes: int = 16) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        token = secrets.token_urlsafe(32)
+        entorno = dict(os.environ, HIBP_MODO="offline", AUDIT_DURABILIDAD="flush", SERVICIO_TOKEN=token)
+        proceso = subprocess.Popen([sys.executable, os.path.join(SRC, "servicio.py"), "--puerto", "0"],
+                                   cwd=tmp, env=entorno, stdout=subprocess.PIPE, text=True)
+        try:
+            puerto = int(proceso.stdout.readline().rsplit(":", 1)[1])
+            resultados = asyncio.run(_medir_servicio(puerto, token, n, clientes))
+        finally:
+            proceso.terminate()
+            proceso.wait(10)
+        resultados["subproceso por operación (generate -n 1)"] = _medir_subproceso(20, tmp)
+    return resultados
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    clientes = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    r = medir(n, clientes)
+    print(f"Servicio HTTP en localhost: {n:,} peticiones por escenario, {clientes} clientes concurrentes")
+    for nombre, m in r.items():
+        if nombre.startswith("_"):
+            continue
+        print(f"- {nombre:42}: {m['req_s']:>9,.0f} req/s   p50 {m['p50_ms']:7.2f} ms   p99 {m['p99_ms']:7.2f} ms")
+    print(f"Escrituras por commit de la bóveda (promedio): {r['_escrituras_por_commit']:.1f}")
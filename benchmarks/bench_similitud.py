@@ -0,0 +1,93 @@
+"""
+Microbenchmark del motor de similitud frente a difflib.SequenceMatcher.ratio().
+Antes de medir verifica sobre entradas aleatorias (incluidas variantes cercanas) que ratio_similitud da exactamente
+el mismo valor que difflib y que ConsultaSimilitud toma la misma decisión con el umbral; si no, termina con error.
+Uso: python benchmarks/bench_similitud.py [pares] [candidatas_por_consulta]
+"""
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from validator import ratio_similitud, ConsultaSimilitud, UMBRAL_SIMILITUD
+
+ALFABETOS = ["ab", "abc01", "abcdefghij", "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%"]
+
+
+def _aleatoria(rnd: random.Random) -> str:
+    return "".join(rnd.choices(rnd.choice(ALFABETOS), k=rnd.randint(0, 40)))
+
+
+def _variante(pw: str, rnd: random.Random) -> str:
+    chars = list(pw)
+    for _ in range(rnd.randint(0, 4)):
+        op = rnd.random()
+        if op < 0.4 and chars:
+            chars[rnd.randrange(len(chars))] = rnd.choice("aZ9!")
+        elif op < 0.7:
+            chars.insert(rnd.randint(0, len(chars)), rnd.choice("bY8?"))
+        elif chars:
+            del chars[rnd.randrange(len(chars))]
+    return "".join(chars)
+
+
+def verificar(pares: int, semilla: int = 2025) -> int:
+    #Devuelve la cantidad de discrepancias con difflib (debe ser 0)
+    rnd = random.Random(semilla)
+    errores = 0
+    for _ in range(pares):
+        a = _aleatoria(rnd)
+        b = _variante(a, rnd) if rnd.random() < 0.5 else _aleatoria(rnd)
+        esperado = SequenceMatcher(None, a, b).ratio()
+        if ratio_similitud(a, b) != esperado:
+            errores += 1
+        if ConsultaSimilitud(a).demasiado_similar(b) != (esperado > UMBRAL_SIMILITUD):
+            errores += 1
+    return errores
+
+
+def medir(consultas: int, candidatas: int) -> dict:
+    rnd = random.Random(11)
+    alfabeto = ALFABETOS[-1]
+    pool = ["".join(rnd.choices(alfabeto, k=16)) for _ in range(candidatas)]
+    pool += [_variante(pool[i], rnd) for i in range(0, candidatas, 50)]
+    qs = [rnd.choice(pool) if i % 4 == 0 else "".join(rnd.choices(alfabeto, k=16)) for i in range(consultas)]
+    n = consultas * len(pool)
+
+    t0 = time.perf_counter()
+    esperado = [[SequenceMatcher(None, q, c).ratio() > UMBRAL_SIMILITUD for c in pool] for q in qs]
+    t_difflib = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    obtenido = [[ratio_similitud(q, c) > UMBRAL_SIMILITUD for c in pool] for q in qs]
+    t_ratio = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    uno_vs_muchos = []
+    for q in qs:
+        consulta = ConsultaSimilitud(q)
+        uno_vs_muchos.append([consulta.demasiado_similar(c) for c in pool])
+    t_consulta = time.perf_counter() - t0
+
+    return {"comparaciones": n, "difflib_us": t_difflib / n * 1e6, "ratio_us": t_ratio / n * 1e6,
+            "consulta_us": t_consulta / n * 1e6, "iguales": esperado == obtenido == uno_vs_muchos}
+
+
+if __name__ == "__main__":
+    pares = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    candidatas = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    errores = verificar(pares)
+    print(f"Verificación contra difflib en {pares} pares aleatorios: {errores} discrepancias")
+    if errores:
+        sys.exit(1)
+    r = medir(20, candidatas)
+    print(f"{r['comparaciones']} comparaciones de contraseñas de 16 caracteres")
+    print(f"- SequenceMatcher.ratio(): {r['difflib_us']:.2f} µs")
+    print(f"- ratio_similitud:         {r['ratio_us']:.2f} µs")
+    print(f"- ConsultaSimilitud:       {r['consulta_us']:.2f} µs (umbral con cortes tempranos)")
+    print(f"- mismas decisiones: {r['iguales']}")
+    if not r["iguales"]:
+        sys.exit(1)
@@ -0,0 +1,78 @@
+"""
+Benchmark de puede_guardar_password: descifrar y comparar toda la bóveda (original) frente al índice de similitud
+(sketches por entrada, solo se descifran los candidatos). Verifica además que ambos decidan igual.
+Uso: python benchmarks/bench_similitud_vault.py [entradas] [consultas]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+from cryptography.fernet import Fernet
+from generator import generar_lote
+from validator import es_demasiado_similar, UMBRAL_SIMILITUD
+
+
+def _original(password: str) -> bool:
+    #Lógica original: leer_todas() + comparación contra cada entrada
+    for it in storage.leer_todas():
+        stored = it.get("password_plain") or ""
+        if stored and (password == stored or SequenceMatcher(None, password, stored).ratio() > UMBRAL_SIMILITUD):
+            return False
+    return True
+
+
+def _indexado(password: str) -> bool:
+    for stored in storage.buscar_candidatos_similares(password, UMBRAL_SIMILITUD):
+        if stored and (password == stored or es_demasiado_similar(password, stored)):
+            return False
+    return True
+
+
+def _mutar(pw: str, rnd: random.Random) -> str:
+    #Variante cercana: cambia 1-3 caracteres
+    chars = list(pw)
+    for _ in range(rnd.randint(1, 3)):
+        chars[rnd.randrange(len(chars))] = rnd.choice("abcXYZ019!?")
+    return "".join(chars)
+
+
+def medir(entradas: int, consultas: int) -> dict:
+    rnd = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.KEY_FILE = os.path.join(tmp, "key.bin")
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage.generar_key()
+        key = storage._leer_key()
+        cipher = Fernet(key)
+        almacenadas = generar_lote(entradas, 14)
+        storage._escribir_vault([{
+            "alias": f"a{i}", "password": cipher.encrypt(pw.encode()).decode(),
+            "created_at": "", "expires_at": "", "meta": {}
+        } for i, pw in enumerate(almacenadas)])
+
+        muestras = [_mutar(rnd.choice(almacenadas), rnd) if i % 2 else pw
+                    for i, pw in enumerate(generar_lote(consultas, 14))]
+        t0 = time.perf_counter()
+        a = [_original(pw) for pw in muestras]
+        t_orig = (time.perf_counter() - t0) / consultas
+        t0 = time.perf_counter()
+        b = [_indexado(pw) for pw in muestras]
+        t_idx = (time.perf_counter() - t0) / consultas
+    return {"entradas": entradas, "original_ms": t_orig * 1e3, "indexado_ms": t_idx * 1e3,
+            "iguales": a == b, "bloqueadas": a.count(False)}
+
+
+if __name__ == "__main__":
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    r = medir(entradas, consultas)
+    print(f"Bóveda de {entradas} entradas, {consultas} intentos de guardado ({r['bloqueadas']} bloqueados)")
+    print(f"- original (descifrar todo + difflib): {r['original_ms']:.1f} ms/guardado")
+    print(f"- índice de similitud:                 {r['indexado_ms']:.1f} ms/guardado")
+    print(f"- mismas decisiones: {r['iguales']}")
@@ -0,0 +1,74 @@
+"""
+Benchmark de la bóveda: costo por operación (guardar, existe_alias, eliminar_alias) con el formato json original
+frente a sqlite, sobre bóvedas precargadas. También mide la migración json -> sqlite.
+Uso: python benchmarks/bench_storage.py [entradas] [operaciones]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+
+
+def _precargar(entradas: int):
+    #Escribe una bóveda json sintética (cifrado real de una sola contraseña, reutilizada) para no medir Fernet aquí.
+    cipher = storage._get_cipher()
+    token = cipher.encrypt(b"Xy7!precargada").decode()
+    storage._escribir_vault([{
+        "alias": f"alias{i}", "password": token, "created_at": "2025-01-01T00:00:00Z",
+        "expires_at": "2025-04-01T00:00:00Z", "meta": {}
+    } for i in range(entradas)])
+
+
+def _medir_ops(ops: int) -> dict:
+    t0 = time.perf_counter()
+    for i in range(ops):
+        storage.guardar_contrasena_cifrada(f"Nueva!{i}pw", f"nuevo{i}")
+    t_guardar = (time.perf_counter() - t0) / ops
+    t0 = time.perf_counter()
+    for i in range(ops):
+        storage.existe_alias(f"alias{i * 7}")
+    t_existe = (time.perf_counter() - t0) / ops
+    t0 = time.perf_counter()
+    for i in range(ops):
+        storage.eliminar_alias(f"nuevo{i}")
+    t_eliminar = (time.perf_counter() - t0) / ops
+    return {"guardar_ms": t_guardar * 1e3, "existe_ms": t_existe * 1e3, "eliminar_ms": t_eliminar * 1e3}
+
+
+def medir(entradas: int, ops: int) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.KEY_FILE = os.path.join(tmp, "key.bin")
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage.VAULT_DB = os.path.join(tmp, "vault.db")
+        storage.generar_key()
+        _precargar(entradas)
+
+        storage.VAULT_BACKEND = "json"
+        resultados["json"] = _medir_ops(max(1, min(ops, 2_000_000 // max(entradas, 1))))
+
+        t0 = time.perf_counter()
+        storage.migrar_json_a_sqlite()
+        resultados["migracion_s"] = time.perf_counter() - t0
+
+        storage.VAULT_BACKEND = "sqlite"
+        resultados["sqlite"] = _medir_ops(ops)
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+    return resultados
+
+
+if __name__ == "__main__":
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    r = medir(entradas, ops)
+    print(f"Bóveda de {entradas:,} entradas (migración json -> sqlite: {r['migracion_s']:.2f} s)")
+    for nombre in ("json", "sqlite"):
+        x = r[nombre]
+        print(f"- {nombre:6}: guardar {x['guardar_ms']:.3f} ms, existe {x['existe_ms']:.3f} ms, "
+              f"eliminar {x['eliminar_ms']:.3f} ms")
@@ -0,0 +1,73 @@
+"""
+Benchmark de "qué vence en los próximos 7 días": recorrido de listar_metadatos parseando cada expires_at
+(procesar_renovaciones original) frente al índice de vencimientos (storage.vencimientos).
+Uso: python benchmarks/bench_vencimientos.py [entradas]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import storage
+
+
+def _recorrido_lineal(dias: int) -> list:
+    limite = datetime.utcnow() + timedelta(days=dias)
+    salida = []
+    for it in storage.listar_metadatos():
+        try:
+            exp = datetime.fromisoformat(it.get('expires_at').replace('Z', ''))
+        except Exception:
+            continue
+        if exp <= limite:
+            salida.append(it)
+    return salida
+
+
+def medir(entradas: int, repeticiones: int = 20) -> dict:
+    resultados = {}
+    rnd = random.Random(7)
+    ahora = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.KEY_FILE = os.path.join(tmp, "key.bin")
+        storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+        storage.VAULT_DB = os.path.join(tmp, "vault.db")
+        storage.generar_key()
+        token = storage._get_cipher().encrypt(b"x").decode()
+        data = [{"alias": f"alias{i}", "password": token, "created_at": "2025-01-01T00:00:00Z",
+                 "expires_at": (ahora + timedelta(days=rnd.uniform(-5, 365))).isoformat() + "Z",
+                 "meta": {"length": 16}} for i in range(entradas)]
+        storage._escribir_vault(data)
+        for backend in ("json", "sqlite"):
+            storage.VAULT_BACKEND = backend
+            if backend == "sqlite":
+                storage.migrar_json_a_sqlite()
+            t0 = time.perf_counter()
+            for _ in range(repeticiones):
+                lineal = _recorrido_lineal(7)
+            t_lineal = (time.perf_counter() - t0) / repeticiones
+            t0 = time.perf_counter()
+            for _ in range(repeticiones):
+                indice = storage.vencimientos(7)
+            t_indice = (time.perf_counter() - t0) / repeticiones
+            if {e["alias"] for e in lineal} != {e["alias"] for e in indice}:
+                print(f"ERROR: resultados distintos en {backend}")
+                sys.exit(1)
+            resultados[backend] = {"lineal_s": t_lineal, "indice_s": t_indice, "vencen": len(indice)}
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+    return resultados
+
+
+if __name__ == "__main__":
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    r = medir(entradas)
+    print(f"Vencimientos en 7 días sobre {entradas:,} entradas")
+    for backend, x in r.items():
+        print(f"- {backend:6}: recorrido {x['lineal_s'] * 1000:.1f} ms, índice {x['indice_s'] * 1000:.2f} ms "
+              f"({x['vencen']} entradas)")
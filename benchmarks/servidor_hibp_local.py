@@ -0,0 +1,76 @@
+"""
+Servidor HTTP local que imita /range/{prefijo} de la API Pwned Passwords, para benchmarks sin red.
+Cada rango tiene sufijos sintéticos deterministas; las contraseñas registradas con 'comprometidas' figuran en su rango,
+las de 'relleno' con conteo 0 (como las respuestas con Add-Padding) y 'errores' fuerza un status HTTP por prefijo.
+También lo usan los tests (tests/test_hibp_cache.py, tests/test_hibp_lote.py).
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServidorHIBPLocal:
+    """Uso: with ServidorHIBPLocal(comprometidas=[...], latencia=0.02) as srv: hibp.HIBP_API_URL = srv.url"""
+
+    def __init__(self, comprometidas=(), entradas_por_rango: int = 800, latencia: float = 0.0, relleno=(),
+                 errores: dict = None):
+        self.entradas_por_rango = entradas_por_rango
+        self.latencia = latencia
+        self.errores = errores or {}
+        self.peticiones = 0
+        self.prefijos = []
+        self._extra = {}
+        for pw, conteo in [(pw, 42) for pw in comprometidas] + [(pw, 0) for pw in relleno]:
+            h = hashlib.sha1(pw.encode("utf-8")).hexdigest().upper()
+            self._extra.setdefault(h[:5], []).append(f"{h[5:]}:{conteo}")
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/range/"
+
+    def cuerpo(self, prefijo: str) -> str:
+        rnd = random.Random(prefijo)
+        lineas = [f"{rnd.getrandbits(140):035X}:{rnd.randint(1, 5000)}" for _ in range(self.entradas_por_rango)]
+        lineas += self._extra.get(prefijo, [])
+        return "\r\n".join(lineas)
+
+    def _handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                prefijo = self.path.rsplit("/", 1)[-1].upper()
+                with servidor._lock:
+                    servidor.peticiones += 1
+                    servidor.prefijos.append(prefijo)
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                if len(prefijo) != 5:
+                    self.send_error(400)
+                    return
+                if prefijo in servidor.errores:
+                    self.send_error(servidor.errores[prefijo])
+                    return
+                datos = servidor.cuerpo(prefijo).encode("ascii")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,347 @@
+"""
+Suite de benchmarks de los caminos calientes, con fixtures sintéticos generados en cada corrida
+(bóvedas, listas negras y contraseñas aleatorias con semilla fija, en un directorio temporal).
+Cada corrida se guarda como JSON en benchmarks/resultados/ y puede compararse con otra: toda métrica que
+empeore más que el umbral se marca como regresión y el código de salida es 1.
+
+    python benchmarks/suite.py                         corre todo y guarda resultados/AAAAMMDD-HHMMSS.json
+    python benchmarks/suite.py --comparar              además compara con la corrida guardada más reciente
+    python benchmarks/suite.py --base X.json --umbral 15 --casos generador,storage
+    python benchmarks/suite.py --rapido                tamaños chicos (sin bóveda de 100k ni lista de 1M)
+    python benchmarks/suite.py --solo-comparar A.json B.json
+
+Métricas: "ops/s" (más es mejor) o "us/op" (menos es mejor). Cada valor es el mejor de varias repeticiones.
+Los benchmarks bench_*.py de este directorio comparan implementaciones; esta suite sigue la evolución en el tiempo.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, "..", "src"))
+
+import audit
+import storage
+from generator import generar_contrasena, generar_variantes, generar_lote
+from validator import evaluar_fuerza, evaluar_fuerza_lote, es_demasiado_similar
+from blacklist import compilar_indice
+from main_generador_final import chequear_blacklist_local
+
+DIR_RESULTADOS = os.path.join(RAIZ, "resultados")
+UMBRAL_REGRESION = 10.0
+#Porcentaje de empeoramiento a partir del cual una métrica se marca como regresión
+REPETICIONES = 5
+SEMILLA = 20251015
+TAMANOS_BOVEDA = (1_000, 10_000, 100_000)
+TAMANOS_BOVEDA_RAPIDO = (1_000, 10_000)
+TAMANOS_BLACKLIST = (1_000, 100_000, 1_000_000)
+TAMANOS_BLACKLIST_RAPIDO = (1_000, 100_000)
+
+
+def _mejor(funcion, repeticiones: int = REPETICIONES) -> float:
+    #Mejor tiempo (s) de varias repeticiones: el mínimo es el menos afectado por la carga de la máquina.
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def _ops(n: int, segundos: float) -> dict:
+    return {"valor": n / segundos, "unidad": "ops/s"}
+
+
+def _us(n: int, segundos: float) -> dict:
+    return {"valor": segundos / n * 1e6, "unidad": "us/op"}
+
+
+def _passwords(rnd: random.Random, n: int) -> list:
+    #Mezcla de contraseñas realistas: aleatorias de 8-24, solo letras, solo dígitos, con secuencias y repeticiones.
+    alfabeto = string.ascii_letters + string.digits + "!@#$%&*-_"
+    salida = []
+    for i in range(n):
+        tipo = i % 5
+        if tipo == 0:
+            salida.append("".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(6, 12))))
+        elif tipo == 1:
+            salida.append("".join(rnd.choices(string.digits, k=rnd.randint(4, 10))))
+        elif tipo == 2:
+            salida.append("".join(rnd.choices(alfabeto, k=rnd.randint(8, 12))) + "abc123")
+        elif tipo == 3:
+            salida.append("aaa" + "".join(rnd.choices(alfabeto, k=rnd.randint(8, 16))))
+        else:
+            salida.append("".join(rnd.choices(alfabeto, k=rnd.randint(12, 24))))
+    return salida
+
+
+# --- Casos: cada uno devuelve {nombre de métrica: {"valor", "unidad"}} ---
+
+def caso_generador(rapido: bool) -> dict:
+    n = 5_000 if rapido else 20_000
+    m = {}
+    m["generador.generar_contrasena_16"] = _ops(n, _mejor(
+        lambda: [generar_contrasena(16, True, True, True, True) for _ in range(n)]))
+    m["generador.generar_variantes_3x16"] = _ops(n // 4, _mejor(
+        lambda: [generar_variantes(16, True, True, True, True, 3) for _ in range(n // 4)]))
+    m["generador.generar_lote_16"] = _ops(n * 5, _mejor(lambda: generar_lote(n * 5, 16)))
+    return m
+
+
+def caso_fuerza(rapido: bool) -> dict:
+    passwords = _passwords(random.Random(SEMILLA), 5_000 if rapido else 20_000)
+    n = len(passwords)
+    return {"fuerza.evaluar_fuerza": _us(n, _mejor(lambda: [evaluar_fuerza(p) for p in passwords])),
+            "fuerza.evaluar_fuerza_lote": _us(n, _mejor(lambda: evaluar_fuerza_lote(passwords)))}
+
+
+def caso_similitud(rapido: bool) -> dict:
+    rnd = random.Random(SEMILLA)
+    base = _passwords(rnd, 1_000 if rapido else 4_000)
+    # Pares parecidos (un carácter cambiado) y pares sin relación, mitad y mitad
+    parecidos = [(p, p[:-1] + "X") for p in base]
+    distintos = list(zip(base, base[1:] + base[:1]))
+    m = {"similitud.es_demasiado_similar_parecidas": _us(len(parecidos), _mejor(
+            lambda: [es_demasiado_similar(a, b) for a, b in parecidos])),
+         "similitud.es_demasiado_similar_distintas": _us(len(distintos), _mejor(
+            lambda: [es_demasiado_similar(a, b) for a, b in distintos]))}
+    return m
+
+
+def _precargar_boveda(tmp: str, entradas: int, rnd: random.Random):
+    """
+    Bóveda sintética de `entradas` en json y en sqlite. Los tokens se cifran una vez y se reutilizan
+    (para no medir Fernet al preparar).
+    """
+    storage.KEY_FILE = os.path.join(tmp, "key.bin")
+    storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+    storage.VAULT_DB = os.path.join(tmp, "vault.db")
+    storage.generar_key()
+    cipher = storage._get_cipher()
+    muestras = _passwords(rnd, 256)
+    tokens = [cipher.encrypt(p.encode()).decode() for p in muestras]
+    ahora = datetime.utcnow().isoformat() + "Z"
+    data = [{"alias": f"alias{i}", "password": tokens[i % 256], "created_at": ahora, "expires_at": ahora,
+             "meta": {"length": 16}} for i in range(entradas)]
+    storage.VAULT_BACKEND = "json"
+    storage._escribir_vault(data)
+    storage.migrar_json_a_sqlite()
+    storage.VAULT_FILE = os.path.join(tmp, "vault.json")
+    storage._escribir_vault(data)
+
+
+def _cerrar_conexiones():
+    for con in storage._conexiones.values():
+        con.close()
+    storage._conexiones.clear()
+
+
+def caso_storage(rapido: bool) -> dict:
+    m = {}
+    rnd = random.Random(SEMILLA)
+    backend_original = storage.VAULT_BACKEND
+    rutas_originales = (storage.KEY_FILE, storage.VAULT_FILE, storage.VAULT_DB)
+    try:
+        for entradas in (TAMANOS_BOVEDA_RAPIDO if rapido else TAMANOS_BOVEDA):
+            etiqueta = f"{entradas // 1000}k"
+            with tempfile.TemporaryDirectory() as tmp:
+                _precargar_boveda(tmp, entradas, rnd)
+                for backend in ("sqlite", "json"):
+                    storage.VAULT_BACKEND = backend
+                    # json reescribe el archivo entero por cambio: menos operaciones en bóvedas grandes
+                    ops = 200 if backend == "sqlite" else max(3, min(200, 200_000 // entradas))
+                    nuevas = [(f"Nueva!{i}{backend}Pw", f"{backend}_nuevo{i}") for i in range(ops)]
+                    t0 = time.perf_counter()
+                    for pw, alias in nuevas:
+                        storage.guardar_contrasena_cifrada(pw, alias)
+                    m[f"storage.{backend}.{etiqueta}.guardar"] = _us(ops, time.perf_counter() - t0)
+                    aliases = [f"alias{rnd.randrange(entradas)}" for _ in range(ops)]
+                    m[f"storage.{backend}.{etiqueta}.leer_alias"] = _us(ops, _mejor(
+                        lambda: [storage.obtener_entrada(a)["password_plain"] for a in aliases], 3))
+                    m[f"storage.{backend}.{etiqueta}.listar_metadatos"] = _ops(entradas, _mejor(
+                        storage.listar_metadatos, 3))
+                    t0 = time.perf_counter()
+                    for _, alias in nuevas:
+                        if not storage.eliminar_alias(alias):
+                            raise RuntimeError(f"{backend}: no se eliminó {alias}")
+                    m[f"storage.{backend}.{etiqueta}.eliminar"] = _us(ops, time.perf_counter() - t0)
+                _cerrar_conexiones()
+    finally:
+        storage.VAULT_BACKEND = backend_original
+        storage.KEY_FILE, storage.VAULT_FILE, storage.VAULT_DB = rutas_originales
+        storage.invalidar_cache_cifrado()
+    return m
+
+
+def caso_blacklist(rapido: bool) -> dict:
+    m = {}
+    rnd = random.Random(SEMILLA)
+    consultas = 5_000 if rapido else 20_000
+    with tempfile.TemporaryDirectory() as tmp:
+        for lineas in (TAMANOS_BLACKLIST_RAPIDO if rapido else TAMANOS_BLACKLIST):
+            etiqueta = f"{lineas // 1000}k"
+            txt = os.path.join(tmp, f"blacklist{etiqueta}.txt")
+            idx = os.path.join(tmp, f"blacklist{etiqueta}.idx")
+            with open(txt, "w", encoding="utf-8") as f:
+                lista = ["".join(rnd.choices(string.ascii_lowercase + string.digits, k=10)) for _ in range(lineas)]
+                f.write("\n".join(lista) + "\n")
+            compilar_indice(txt, idx, bloom=True)
+            # La mitad de las consultas está en la lista
+            pw = [lista[rnd.randrange(lineas)] if i % 2 else "Q" + "".join(rnd.choices(string.ascii_letters, k=12))
+                  for i in range(consultas)]
+            m[f"blacklist.indice.{etiqueta}"] = _us(consultas, _mejor(
+                lambda: [chequear_blacklist_local(p, txt, idx) for p in pw]))
+            # Sin índice: recorrido del archivo de texto (pocas consultas, es lineal en el tamaño de la lista)
+            n_lineal = max(3, min(200, 2_000_000 // lineas))
+            sin_indice = os.path.join(tmp, "no_existe.idx")
+            m[f"blacklist.texto.{etiqueta}"] = _us(n_lineal, _mejor(
+                lambda: [chequear_blacklist_local(p, txt, sin_indice) for p in pw[:n_lineal]], 3))
+    return m
+
+
+def caso_auditoria(rapido: bool) -> dict:
+    m = {}
+    eventos = 20_000 if rapido else 100_000
+    archivo_original, durabilidad_original = audit.AUDIT_FILE, audit.AUDIT_DURABILIDAD
+    with tempfile.TemporaryDirectory() as tmp:
+        for durabilidad in audit.DURABILIDADES:
+            audit.AUDIT_FILE = os.path.join(tmp, f"{durabilidad}.log")
+            audit.AUDIT_DURABILIDAD = durabilidad
+            t0 = time.perf_counter()
+            for i in range(eventos):
+                audit.registrar_evento("generated", {"len": 16, "i": i})
+            audit.vaciar_auditoria()
+            m[f"auditoria.registrar_evento.{durabilidad}"] = _ops(eventos, time.perf_counter() - t0)
+            audit.cerrar_auditoria()
+    audit.AUDIT_FILE, audit.AUDIT_DURABILIDAD = archivo_original, durabilidad_original
+    return m
+
+
+CASOS = {
+    "generador": caso_generador,
+    "fuerza": caso_fuerza,
+    "similitud": caso_similitud,
+    "storage": caso_storage,
+    "blacklist": caso_blacklist,
+    "auditoria": caso_auditoria,
+}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def medir(casos=None, rapido: bool = False) -> dict:
+    metricas = {}
+    archivo_auditoria = audit.AUDIT_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        # Los eventos que registran storage y la lista negra no van a la bitácora real
+        audit.AUDIT_FILE = os.path.join(tmp, "audit.log")
+        try:
+            for nombre in casos or CASOS:
+                t0 = time.perf_counter()
+                metricas.update(CASOS[nombre](rapido))
+                print(f"  {nombre}: {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+        finally:
+            audit.cerrar_auditoria()
+            audit.AUDIT_FILE = archivo_auditoria
+    return {"fecha": datetime.now().isoformat(timespec="seconds"), "commit": _commit(),
+            "python": platform.python_version(), "plataforma": platform.platform(), "rapido": rapido,
+            "metricas": metricas}
+
+
+def comparar(base: dict, actual: dict, umbral: float = UMBRAL_REGRESION) -> list:
+    """
+    Compara métrica por métrica (solo las que están en ambas corridas). Devuelve
+    [(nombre, valor base, valor actual, cambio %, es_regresion)], donde cambio > 0 siempre significa "mejor".
+    """
+    filas = []
+    for nombre, a in actual["metricas"].items():
+        b = base["metricas"].get(nombre)
+        if b is None or b["unidad"] != a["unidad"] or not b["valor"]:
+            continue
+        if a["unidad"] == "ops/s":
+            cambio = (a["valor"] - b["valor"]) / b["valor"] * 100
+        else:
+            cambio = (b["valor"] - a["valor"]) / b["valor"] * 100
+        filas.append((nombre, b["valor"], a["valor"], cambio, cambio < -umbral))
+    return filas
+
+
+def _ultima_corrida(excluir: str = None):
+    rutas = sorted(r for r in glob.glob(os.path.join(DIR_RESULTADOS, "*.json")) if r != excluir)
+    return rutas[-1] if rutas else None
+
+
+def _imprimir_metricas(resultado: dict):
+    for nombre, m in resultado["metricas"].items():
+        print(f"- {nombre:48} {m['valor']:>14,.2f} {m['unidad']}")
+
+
+def _imprimir_comparacion(filas: list, umbral: float) -> int:
+    regresiones = 0
+    for nombre, b, a, cambio, regresion in filas:
+        marca = "REGRESIÓN" if regresion else ("mejora" if cambio > umbral else "")
+        print(f"- {nombre:48} {b:>12,.2f} -> {a:>12,.2f}  {cambio:+6.1f}%  {marca}")
+        regresiones += regresion
+    print(f"{len(filas)} métricas comparadas, {regresiones} regresiones (umbral {umbral:.0f}%).")
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Suite de benchmarks con comparación de regresiones.")
+    parser.add_argument("--casos", default=None, help=f"lista separada por comas ({', '.join(CASOS)})")
+    parser.add_argument("--rapido", action="store_true", help="tamaños chicos")
+    parser.add_argument("-o", "--salida", default=None, help="archivo JSON de resultados")
+    parser.add_argument("--comparar", action="store_true", help="comparar con la corrida guardada más reciente")
+    parser.add_argument("--base", default=None, help="corrida JSON con la que comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION, help="porcentaje de empeoramiento")
+    parser.add_argument("--solo-comparar", nargs=2, metavar=("BASE", "ACTUAL"), help="comparar dos corridas")
+    args = parser.parse_args(argv)
+
+    if args.solo_comparar:
+        with open(args.solo_comparar[0], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.solo_comparar[1], "r", encoding="utf-8") as f:
+            actual = json.load(f)
+        return 1 if _imprimir_comparacion(comparar(base, actual, args.umbral), args.umbral) else 0
+
+    casos = [c.strip() for c in args.casos.split(",")] if args.casos else list(CASOS)
+    desconocidos = [c for c in casos if c not in CASOS]
+    if desconocidos:
+        parser.error(f"casos desconocidos: {', '.join(desconocidos)}")
+    ruta_base = args.base or (_ultima_corrida() if args.comparar else None)
+
+    resultado = medir(casos, args.rapido)
+    os.makedirs(DIR_RESULTADOS, exist_ok=True)
+    salida = args.salida or os.path.join(DIR_RESULTADOS, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+    _imprimir_metricas(resultado)
+    print(f"Resultados guardados en {salida}")
+
+    if ruta_base is None:
+        if args.comparar:
+            print("No hay corridas anteriores con las que comparar.")
+        return 0
+    with open(ruta_base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\nComparación con {ruta_base} (commit {base.get('commit')}, {base.get('fecha')}):")
+    return 1 if _imprimir_comparacion(comparar(base, resultado, args.umbral), args.umbral) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,558 @@
 """
 Módulo audit: registro de eventos en archivo de log en formato JSON por línea con timestamp
+Los eventos se acumulan en memoria y un hilo escritor los agrega a audit.log por lotes (el archivo queda abierto),
+en lugar de abrir y cerrar el archivo en cada evento. Se vuelcan al llegar a AUDIT_TAMANO_LOTE eventos,
+cada AUDIT_INTERVALO segundos, con vaciar_auditoria() y al terminar el proceso.
+Durabilidad (AUDIT_DURABILIDAD): 'none' (buffer del proceso), 'flush' (al sistema operativo en cada lote)
+o 'fsync' (a disco en cada lote).
+
+Rotación: al superar AUDIT_ROTACION_BYTES o AUDIT_ROTACION_SEGUNDOS, audit.log se renombra y se comprime en un
+segmento de audit_segmentos/ (bloques gzip independientes) con un índice .idx al lado: rango de fechas y, por tipo
+de evento, qué bloques lo contienen. Las consultas solo descomprimen los bloques relevantes.
+Consultar:  python audit.py consultar --evento hibp_hit --desde 7d
 """
 #Dependencias
+import argparse
+import atexit
+import glob
 import json
-from datetime import datetime
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
 
 AUDIT_FILE = "audit.log"
+AUDIT_DURABILIDAD = os.environ.get("AUDIT_DURABILIDAD", "flush")
+DURABILIDADES = ("none", "flush", "fsync")
+AUDIT_TAMANO_LOTE = 256
+AUDIT_INTERVALO = 1.0
+AUDIT_MAX_COLA = 10_000
+#Con el buffer lleno registrar_evento espera al escritor (no se descartan eventos)
+AUDIT_BUFFER_NONE = 64 * 1024
+#Con durabilidad 'none' se escribe al SO recién al acumular estos bytes (o al vaciar/rotar/cerrar)
+AUDIT_SEGMENTOS_DIR = "audit_segmentos"
+AUDIT_ROTACION_BYTES = 64 * 1024 * 1024
+AUDIT_ROTACION_SEGUNDOS = 24 * 3600
+TAMANO_BLOQUE_SEGMENTO = 256 * 1024
+#Bytes sin comprimir por bloque (miembro gzip) de un segmento: es lo máximo que se descomprime de una vez
+SUFIJO_PENDIENTE = ".pendiente"
+
+
+def _bloquear(f):
+    #Bloqueo consultivo exclusivo sobre audit.log.lock: escrituras de varios procesos y la rotación no se pisan.
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _desbloquear(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _instante(ts: str) -> datetime:
+    return datetime.fromisoformat(ts.replace("Z", ""))
+
+
+def _primer_instante(ruta: str):
+    #Timestamp del primer evento de un archivo (para la rotación por antigüedad); None si está vacío o ilegible.
+    try:
+        with open(ruta, "rb") as f:
+            return _instante(json.loads(f.readline())["timestamp"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+class EscritorAuditoria:
+    """
+    Hilo escritor con buffer acotado. registrar() agrega la línea ya serializada bajo un lock; el hilo toma
+    todo lo acumulado de una vez y lo escribe con una sola llamada.
+    """
+
+    def __init__(self, ruta: str = AUDIT_FILE, durabilidad: str = AUDIT_DURABILIDAD,
+                 tamano_lote: int = AUDIT_TAMANO_LOTE, intervalo: float = AUDIT_INTERVALO,
+                 max_cola: int = AUDIT_MAX_COLA):
+        if durabilidad not in DURABILIDADES:
+            raise ValueError(f"Durabilidad de auditoría inválida: {durabilidad} (opciones: {', '.join(DURABILIDADES)})")
+        self.ruta = ruta
+        self.durabilidad = durabilidad
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.max_cola = max_cola
+        self.pid = os.getpid()
+        self.error = None
+        self._pendientes = []
+        self._solicitudes = []  # eventos de vaciar() a avisar tras el próximo volcado
+        self._cerrando = False
+        self._cond = threading.Condition()
+        self._sin_escribir = []  # bytes retenidos con durabilidad 'none'
+        self._bytes_sin_escribir = 0
+        self._lock_f = open(ruta + ".lock", "a+b")
+        self._abrir()
+        self._hilo = threading.Thread(target=self._bucle, name="audit-writer", daemon=True)
+        self._hilo.start()
+
+    def _abrir(self):
+        #Sin buffer de Python: lo escrito llega al SO bajo el bloqueo y no puede quedar en un archivo ya rotado.
+        self._archivo = open(self.ruta, "ab", buffering=0)
+        self._inodo = os.fstat(self._archivo.fileno()).st_ino
+        self._inicio = _primer_instante(self.ruta)
+
+    def _reabrir_si_rotado(self):
+        #Otro proceso rotó audit.log: se pasa a escribir en el archivo nuevo.
+        try:
+            inodo = os.stat(self.ruta).st_ino
+        except FileNotFoundError:
+            inodo = None
+        if inodo != self._inodo:
+            self._archivo.close()
+            self._abrir()
+
+    def registrar(self, linea: str):
+        with self._cond:
+            if self._cerrando or not self._hilo.is_alive():
+                #Escritor detenido (otro hilo lo reemplazó, se está saliendo o el hilo murió): escritura directa
+                _agregar_directo(self.ruta, linea)
+                return
+            while len(self._pendientes) >= self.max_cola and self._hilo.is_alive():
+                self._cond.wait()
+            self._pendientes.append(linea)
+            if len(self._pendientes) == self.tamano_lote:
+                self._cond.notify_all()
+
+    def _escribir(self, lote: list, forzar: bool):
+        try:
+            if lote:
+                datos = "".join(lote).encode("utf-8")
+                self._sin_escribir.append(datos)
+                self._bytes_sin_escribir += len(datos)
+            if not self._sin_escribir:
+                return
+            if not forzar and self.durabilidad == "none" and self._bytes_sin_escribir < AUDIT_BUFFER_NONE:
+                return
+            _bloquear(self._lock_f)
+            try:
+                self._reabrir_si_rotado()
+                self._archivo.write(b"".join(self._sin_escribir))
+                self._sin_escribir, self._bytes_sin_escribir = [], 0
+                if self.durabilidad == "fsync":
+                    os.fsync(self._archivo.fileno())
+                if self._inicio is None:
+                    self._inicio = datetime.utcnow()
+                pendiente = None
+                if self._debe_rotar():
+                    self._archivo.close()
+                    pendiente = _rotar_archivo(self.ruta)
+                    self._abrir()
+            finally:
+                _desbloquear(self._lock_f)
+            if pendiente:
+                #La compresión no bloquea a los escritores; si el proceso termina antes, queda para la próxima
+                threading.Thread(target=compactar_pendientes, args=(self.ruta,), daemon=True).start()
+        except OSError as e:
+            self.error = e
+
+    def _debe_rotar(self) -> bool:
+        if os.fstat(self._archivo.fileno()).st_size >= AUDIT_ROTACION_BYTES:
+            return True
+        return (self._inicio is not None
+                and (datetime.utcnow() - self._inicio).total_seconds() >= AUDIT_ROTACION_SEGUNDOS)
+
+    def _bucle(self):
+        solicitudes = []
+        try:
+            self._bucle_escritura(solicitudes)
+        except Exception:
+            self._rescatar(solicitudes)
+
+    def _rescatar(self, en_curso: list):
+        """
+        El hilo escritor murió por una excepción inesperada: se registra en el log, se escribe en forma directa lo que
+        quedaba en memoria, se despierta a quien esperaba en vaciar() y registrar() pasa a escribir sin hilo.
+        """
+        import logging
+        logging.getLogger(__name__).exception("El hilo escritor de auditoría terminó por un error (%s); "
+                                              "se sigue escribiendo sin hilo.", self.ruta)
+        with self._cond:
+            self._cerrando = True
+            texto = b"".join(self._sin_escribir).decode("utf-8") + "".join(self._pendientes)
+            self._sin_escribir, self._bytes_sin_escribir, self._pendientes = [], 0, []
+            solicitudes, self._solicitudes = en_curso + self._solicitudes, []
+            self._cond.notify_all()
+        try:
+            if texto:
+                _agregar_directo(self.ruta, texto)
+        except OSError as e:
+            self.error = e
+        for listo in solicitudes:
+            listo.set()
+        for f in (self._archivo, self._lock_f):
+            try:
+                f.close()
+            except OSError:
+                pass
+
+    def _bucle_escritura(self, solicitudes: list):
+        #`solicitudes` se comparte con _bucle para poder avisarlas si el hilo muere a mitad de un volcado.
+        while True:
+            with self._cond:
+                limite = time.monotonic() + self.intervalo
+                while (len(self._pendientes) < self.tamano_lote and not self._solicitudes and not self._cerrando):
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                lote, self._pendientes = self._pendientes, []
+                solicitudes[:], self._solicitudes = self._solicitudes, []
+                cerrando = self._cerrando
+                self._cond.notify_all()  # despierta a quien esperaba por la cola llena
+            if lote or solicitudes or cerrando:
+                self._escribir(lote, forzar=bool(solicitudes) or cerrando)
+            for listo in solicitudes:
+                listo.set()
+            solicitudes.clear()
+            if cerrando:
+                self._archivo.close()
+                self._lock_f.close()
+                return
+
+    def vaciar(self):
+        #Espera a que todo lo registrado hasta ahora esté escrito (y llegue al SO).
+        listo = threading.Event()
+        with self._cond:
+            if self._cerrando or not self._hilo.is_alive():
+                return
+            self._solicitudes.append(listo)
+            self._cond.notify_all()
+        listo.wait()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def cerrar(self):
+        with self._cond:
+            self._cerrando = True
+            self._cond.notify_all()
+        self._hilo.join()
+
+
+def _agregar_directo(ruta: str, texto: str):
+    #Escritura sin hilo, respetando el bloqueo de rotación.
+    with open(ruta + ".lock", "a+b") as lock_f:
+        _bloquear(lock_f)
+        try:
+            with open(ruta, "a", encoding="utf-8") as f:
+                f.write(texto)
+        finally:
+            _desbloquear(lock_f)
+
+
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def _obtener_escritor() -> EscritorAuditoria:
+    #Escritor del proceso; se recrea si cambió AUDIT_FILE/AUDIT_DURABILIDAD o tras un fork (el hilo no se hereda).
+    global _escritor
+    e = _escritor
+    if e is not None and e.pid == os.getpid() and e.ruta == AUDIT_FILE and e.durabilidad == AUDIT_DURABILIDAD:
+        return e
+    with _escritor_lock:
+        e = _escritor
+        if e is not None and e.pid == os.getpid() and e.ruta == AUDIT_FILE and e.durabilidad == AUDIT_DURABILIDAD:
+            return e
+        if e is not None and e.pid == os.getpid():
+            e.cerrar()
+        _escritor = EscritorAuditoria(AUDIT_FILE, AUDIT_DURABILIDAD)
+        return _escritor
+
+
+_hijo_multiprocessing = {}
+
+def _es_hijo_multiprocessing() -> bool:
+    #Los workers de multiprocessing terminan con os._exit (sin atexit), así que ahí se escribe en forma directa.
+    pid = os.getpid()
+    if pid not in _hijo_multiprocessing:
+        mp = sys.modules.get("multiprocessing")
+        _hijo_multiprocessing[pid] = mp is not None and mp.parent_process() is not None
+    return _hijo_multiprocessing[pid]
+
 
 def registrar_evento(evento: str, params: dict = None):
-    #Escribe línea JSON con timestamp UTC para registrar acciones (generado, guardado, hibp_hit, error, etc.).
+    #Agrega línea JSON con timestamp UTC para registrar acciones (generado, guardado, hibp_hit, error, etc.).
     registro = {
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "evento": evento,
         "params": params or {}
     }
-    with open(AUDIT_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(registro) + "\n")
+    linea = json.dumps(registro) + "\n"
+    if _es_hijo_multiprocessing():
+        _agregar_directo(AUDIT_FILE, linea)
+        return
+    _obtener_escritor().registrar(linea)
+
+
+def vaciar_auditoria():
+    #Fuerza la escritura de los eventos pendientes (p. ej. antes de leer audit.log desde el mismo proceso).
+    e = _escritor
+    if e is not None and e.pid == os.getpid():
+        e.vaciar()
+
+
+@atexit.register
+def cerrar_auditoria():
+    #Escribe lo pendiente y detiene el hilo escritor; se ejecuta también al salir del intérprete.
+    global _escritor
+    with _escritor_lock:
+        e, _escritor = _escritor, None
+    if e is not None and e.pid == os.getpid():
+        e.cerrar()
+
+
+# --- Rotación y segmentos comprimidos ---
+
+def _rotar_archivo(ruta: str):
+    #Renombra audit.log a audit.log.<fecha>-<pid>.pendiente (con el bloqueo tomado). None si estaba vacío.
+    try:
+        if os.path.getsize(ruta) == 0:
+            return None
+    except FileNotFoundError:
+        return None
+    pendiente = f"{ruta}.{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}{SUFIJO_PENDIENTE}"
+    os.replace(ruta, pendiente)
+    return pendiente
+
+
+def rotar_auditoria(ruta: str = None, directorio: str = None) -> list:
+    """
+    Rota audit.log ahora (aunque no llegue a los límites) y comprime todo lo pendiente.
+    Sirve también para convertir un audit.log histórico grande: se procesa en streaming con memoria constante.
+    Devuelve las rutas de los segmentos creados.
+    """
+    ruta = ruta or AUDIT_FILE
+    vaciar_auditoria()
+    with open(ruta + ".lock", "a+b") as lock_f:
+        _bloquear(lock_f)
+        try:
+            _rotar_archivo(ruta)
+        finally:
+            _desbloquear(lock_f)
+    return compactar_pendientes(ruta, directorio)
+
+
+def compactar_pendientes(ruta: str = None, directorio: str = None) -> list:
+    #Comprime los audit.log.*.pendiente en segmentos. Cada archivo se reclama con un rename (un solo compactador).
+    ruta = ruta or AUDIT_FILE
+    directorio = directorio or AUDIT_SEGMENTOS_DIR
+    creados = []
+    for pendiente in sorted(glob.glob(glob.escape(ruta) + ".*" + SUFIJO_PENDIENTE)):
+        reclamado = f"{pendiente}.{os.getpid()}.en_curso"
+        try:
+            os.rename(pendiente, reclamado)
+        except OSError:
+            continue
+        nombre = "audit-" + os.path.basename(pendiente)[len(os.path.basename(ruta)) + 1:-len(SUFIJO_PENDIENTE)]
+        creados.append(_comprimir_segmento(reclamado, os.path.join(directorio, nombre)))
+        os.remove(reclamado)
+    return creados
+
+
+def _comprimir_segmento(origen: str, base: str) -> str:
+    """
+    Escribe base.jsonl.gz como una serie de miembros gzip de ~TAMANO_BLOQUE_SEGMENTO bytes (el archivo completo
+    sigue siendo un gzip válido) y base.idx con el rango de fechas de cada bloque y los bloques de cada evento.
+    El índice se escribe al final: un segmento sin .idx no se considera completo.
+    """
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    bloques, por_evento = [], {}
+    desde = hasta = None
+    total = 0
+    buffer, tamano = [], 0
+    b_desde = b_hasta = None
+    b_eventos = set()
+
+    def volcar(out):
+        nonlocal buffer, tamano, b_desde, b_hasta, b_eventos
+        if not buffer:
+            return
+        comp = zlib.compressobj(6, zlib.DEFLATED, 31)
+        datos = comp.compress(b"".join(buffer)) + comp.flush()
+        for ev in b_eventos:
+            por_evento.setdefault(ev, []).append(len(bloques))
+        bloques.append([out.tell(), len(datos), b_desde, b_hasta])
+        out.write(datos)
+        buffer, tamano = [], 0
+        b_desde = b_hasta = None
+        b_eventos = set()
+
+    with open(origen, "rb") as src, open(base + ".jsonl.gz.tmp", "wb") as out:
+        for linea in src:
+            if not linea.strip():
+                continue
+            if not linea.endswith(b"\n"):
+                linea += b"\n"
+            try:
+                registro = json.loads(linea)
+                ts = _instante(registro["timestamp"]).isoformat()
+                evento = str(registro.get("evento"))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                ts, evento = None, "?"  # línea truncada (corte de luz): se conserva pero no se indexa por fecha
+            if ts is not None:
+                desde = ts if desde is None or ts < desde else desde
+                hasta = ts if hasta is None or ts > hasta else hasta
+                b_desde = ts if b_desde is None or ts < b_desde else b_desde
+                b_hasta = ts if b_hasta is None or ts > b_hasta else b_hasta
+            b_eventos.add(evento)
+            buffer.append(linea)
+            tamano += len(linea)
+            total += 1
+            if tamano >= TAMANO_BLOQUE_SEGMENTO:
+                volcar(out)
+        volcar(out)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(base + ".jsonl.gz.tmp", base + ".jsonl.gz")
+    with open(base + ".idx.tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "desde": desde, "hasta": hasta, "eventos_total": total,
+                   "bloques": bloques, "por_evento": por_evento}, f)
+    os.replace(base + ".idx.tmp", base + ".idx")
+    return base + ".jsonl.gz"
+
+
+# --- Consultas ---
+
+def _a_instante(valor):
+    #Acepta datetime, fecha ISO o relativo ('7d', '12h', '30m') respecto de ahora (UTC).
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    valor = str(valor).strip()
+    unidades = {"d": "days", "h": "hours", "m": "minutes"}
+    if valor[-1:] in unidades and valor[:-1].isdigit():
+        return datetime.utcnow() - timedelta(**{unidades[valor[-1]]: int(valor[:-1])})
+    return _instante(valor)
+
+
+def _fuera_de_rango(b_desde, b_hasta, desde, hasta) -> bool:
+    if b_hasta is None:
+        return False  # sin fechas legibles: no se puede descartar
+    return (desde is not None and _instante(b_hasta) < desde) or (hasta is not None and _instante(b_desde) > hasta)
+
+
+def _coincide(linea: bytes, eventos, desde, hasta, marcas):
+    if marcas is not None and not any(m in linea for m in marcas):
+        return None  # descarte barato antes de parsear el JSON
+    try:
+        registro = json.loads(linea)
+        ts = _instante(registro["timestamp"])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+    if eventos is not None and registro.get("evento") not in eventos:
+        return None
+    if (desde is not None and ts < desde) or (hasta is not None and ts > hasta):
+        return None
+    return registro
+
+
+def _archivos_texto(ruta: str) -> list:
+    #Texto sin comprimir: rotados aún sin compactar (en orden de rotación) y el audit.log actual al final.
+    pendientes = sorted(glob.glob(glob.escape(ruta) + ".*" + SUFIJO_PENDIENTE + "*"))
+    return pendientes + ([ruta] if os.path.exists(ruta) else [])
+
+
+def consultar_eventos(evento=None, desde=None, hasta=None, ruta: str = None, directorio: str = None):
+    """
+    Generador de registros (dict) en orden de rotación que cumplen los filtros:
+      evento: nombre o lista de nombres; desde/hasta: datetime, fecha ISO o relativo ('7d', '24h').
+    Descarta segmentos por el rango de fechas del índice y, dentro de cada segmento, descomprime solo los
+    bloques que contienen el evento y se solapan con el rango. La memoria no depende del tamaño del historial.
+        for r in consultar_eventos('hibp_hit', desde='7d'): ...
+    """
+    ruta = ruta or AUDIT_FILE
+    directorio = directorio or AUDIT_SEGMENTOS_DIR
+    eventos = None
+    if evento is not None:
+        eventos = {evento} if isinstance(evento, str) else set(evento)
+    desde, hasta = _a_instante(desde), _a_instante(hasta)
+    marcas = None if eventos is None else [json.dumps(e).encode("utf-8") for e in eventos]
+    vaciar_auditoria()
+
+    for idx_ruta in sorted(glob.glob(os.path.join(glob.escape(directorio), "*.idx"))):
+        with open(idx_ruta, "r", encoding="utf-8") as f:
+            indice = json.load(f)
+        if _fuera_de_rango(indice["desde"], indice["hasta"], desde, hasta):
+            continue
+        if eventos is None:
+            candidatos = range(len(indice["bloques"]))
+        else:
+            candidatos = sorted({i for e in eventos for i in indice["por_evento"].get(e, ())})
+        if not candidatos:
+            continue
+        with open(idx_ruta[:-len(".idx")] + ".jsonl.gz", "rb") as seg:
+            for i in candidatos:
+                offset, longitud, b_desde, b_hasta = indice["bloques"][i]
+                if _fuera_de_rango(b_desde, b_hasta, desde, hasta):
+                    continue
+                seg.seek(offset)
+                for linea in zlib.decompress(seg.read(longitud), 31).splitlines():
+                    registro = _coincide(linea, eventos, desde, hasta, marcas)
+                    if registro is not None:
+                        yield registro
+
+    for archivo in _archivos_texto(ruta):
+        try:
+            f = open(archivo, "rb")
+        except FileNotFoundError:
+            continue  # compactado mientras tanto
+        with f:
+            for linea in f:
+                registro = _coincide(linea, eventos, desde, hasta, marcas)
+                if registro is not None:
+                    yield registro
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Consulta y rotación del registro de auditoría.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    cons = sub.add_parser("consultar", help="eventos que cumplen los filtros, uno por línea (JSON)")
+    cons.add_argument("-e", "--evento", action="append", help="tipo de evento (se puede repetir)")
+    cons.add_argument("--desde", help="fecha ISO o relativo: 7d, 24h, 30m")
+    cons.add_argument("--hasta", help="fecha ISO o relativo")
+    cons.add_argument("--limite", type=int, default=None)
+    cons.add_argument("--contar", action="store_true", help="solo la cantidad de eventos")
+    sub.add_parser("rotar", help="rota audit.log ahora y comprime lo pendiente")
+    sub.add_parser("compactar", help="comprime los archivos rotados que quedaron sin comprimir")
+    args = parser.parse_args(argv)
+
+    if args.comando == "rotar":
+        for s in rotar_auditoria():
+            print(s)
+        return 0
+    if args.comando == "compactar":
+        for s in compactar_pendientes():
+            print(s)
+        return 0
+    n = 0
+    for registro in consultar_eventos(args.evento, args.desde, args.hasta):
+        n += 1
+        if not args.contar:
+            sys.stdout.write(json.dumps(registro) + "\n")
+        if args.limite is not None and n >= args.limite:
+            break
+    if args.contar:
+        print(n)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
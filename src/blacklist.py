@@ -0,0 +1,198 @@
+"""
+Módulo blacklist: índice precompilado de la lista negra local.
+Convierte blacklist.txt (una contraseña por línea) en un archivo binario con hashes de ancho fijo ordenados,
+consultado por búsqueda binaria sobre mmap. Opcionalmente antepone un filtro de Bloom para descartar
+la mayoría de las consultas negativas sin tocar la tabla. La memoria residente no depende del tamaño de la lista.
+
+Compilar:  python blacklist.py compilar blacklist.txt -o blacklist.idx [--bloom]
+"""
+#Dependencias
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+
+BLACKLIST_INDEX = "blacklist.idx"
+MAGIC = b"BLIDX001"
+CABECERA = struct.Struct("<8sQQI")  # magic, cantidad de hashes, bytes del filtro Bloom, cantidad de funciones hash
+ANCHO_HASH = 8
+#8 bytes de SHA-1: con 10^8 entradas la probabilidad de colisión por consulta es ~5e-12
+BUCKETS = 256
+
+
+def _hash(password: str) -> bytes:
+    #Misma normalización que el escaneo lineal original (strip) antes de calcular el hash.
+    return hashlib.sha1(password.strip().encode("utf-8")).digest()[:ANCHO_HASH]
+
+
+def _posiciones_bloom(h: bytes, m_bits: int, k: int):
+    #Doble hashing (Kirsch-Mitzenmacher) a partir de las dos mitades del hash almacenado.
+    h1, h2 = struct.unpack("<II", h)
+    h2 |= 1
+    return [(h1 + i * h2) % m_bits for i in range(k)]
+
+
+def compilar_indice(blacklist_file: str, index_file: str = BLACKLIST_INDEX,
+                    bloom: bool = False, tasa_falsos_positivos: float = 0.01) -> int:
+    """
+    Compila el índice en dos pasadas con memoria acotada:
+      1. Calcula el hash de cada línea y lo reparte en 256 archivos temporales según su primer byte.
+      2. Ordena y deduplica cada bucket por separado y los concatena (el orden global queda garantizado).
+    Escribe en un archivo temporal y lo renombra al final para no dejar índices a medio escribir.
+    Devuelve la cantidad de hashes únicos.
+    """
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = [os.path.join(tmp, f"{i:02x}") for i in range(BUCKETS)]
+        archivos = [open(r, "wb") for r in rutas]
+        total = 0
+        try:
+            with open(blacklist_file, "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    # Las líneas en blanco también entran (como "" tras strip): el escaneo lineal las compara igual
+                    h = _hash(line)
+                    archivos[h[0]].write(h)
+                    total += 1
+        finally:
+            for a in archivos:
+                a.close()
+
+        m_bits, k = 0, 0
+        if bloom and total:
+            m_bits = int(-total * math.log(tasa_falsos_positivos) / (math.log(2) ** 2))
+            m_bits = max(64, (m_bits + 7) // 8 * 8)
+            k = max(1, round(m_bits / total * math.log(2)))
+        bits = bytearray(m_bits // 8)
+
+        destino = index_file + ".tmp"
+        unicos = 0
+        with open(destino, "wb") as out:
+            out.write(CABECERA.pack(MAGIC, 0, len(bits), k))
+            out.write(bits)  # reservado; se reescribe al final
+            for ruta in rutas:
+                with open(ruta, "rb") as b:
+                    datos = b.read()
+                claves = sorted({datos[i:i + ANCHO_HASH] for i in range(0, len(datos), ANCHO_HASH)})
+                if m_bits:
+                    for h in claves:
+                        for p in _posiciones_bloom(h, m_bits, k):
+                            bits[p >> 3] |= 1 << (p & 7)
+                out.write(b"".join(claves))
+                unicos += len(claves)
+            out.seek(0)
+            out.write(CABECERA.pack(MAGIC, unicos, len(bits), k))
+            out.write(bits)
+        os.replace(destino, index_file)
+    return unicos
+
+
+class IndiceBlacklist:
+    """Índice abierto en modo lectura sobre mmap. Usar como context manager o llamar a cerrar()."""
+
+    def __init__(self, index_file: str = BLACKLIST_INDEX):
+        self.ruta = index_file
+        self._f = open(index_file, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise ValueError("Índice de blacklist vacío o corrupto.")
+        magic, self.cantidad, bytes_bloom, self.k = CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.cerrar()
+            raise ValueError("Formato de índice de blacklist no reconocido.")
+        self._bloom_inicio = CABECERA.size
+        self._m_bits = bytes_bloom * 8
+        self._tabla_inicio = self._bloom_inicio + bytes_bloom
+        self.mtime = os.stat(index_file).st_mtime_ns
+
+    def _en_bloom(self, h: bytes) -> bool:
+        mm, inicio = self._mm, self._bloom_inicio
+        for p in _posiciones_bloom(h, self._m_bits, self.k):
+            if not mm[inicio + (p >> 3)] & (1 << (p & 7)):
+                return False
+        return True
+
+    def contiene(self, password: str) -> bool:
+        #Filtro de Bloom (si existe) y luego búsqueda binaria sobre la tabla ordenada.
+        h = _hash(password)
+        if self._m_bits and not self._en_bloom(h):
+            return False
+        mm, base = self._mm, self._tabla_inicio
+        lo, hi = 0, self.cantidad
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = base + mid * ANCHO_HASH
+            actual = mm[pos:pos + ANCHO_HASH]
+            if actual < h:
+                lo = mid + 1
+            elif actual > h:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def cerrar(self):
+        try:
+            self._mm.close()
+        finally:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+_indices_abiertos = {}
+
+
+def abrir_indice(index_file: str = BLACKLIST_INDEX):
+    """
+    Devuelve el índice abierto (reutilizado entre llamadas) o None si no existe.
+    Si el archivo fue recompilado (cambió su mtime) se reabre.
+    """
+    try:
+        mtime = os.stat(index_file).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    indice = _indices_abiertos.get(index_file)
+    if indice is not None and indice.mtime == mtime:
+        return indice
+    if indice is not None:
+        indice.cerrar()
+    indice = IndiceBlacklist(index_file)
+    _indices_abiertos[index_file] = indice
+    return indice
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Herramientas del índice de lista negra.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    comp = sub.add_parser("compilar", help="compila blacklist.txt en un índice binario")
+    comp.add_argument("blacklist", help="archivo de texto con una contraseña por línea")
+    comp.add_argument("-o", "--salida", default=BLACKLIST_INDEX)
+    comp.add_argument("--bloom", action="store_true", help="antepone un filtro de Bloom")
+    comp.add_argument("--fp", type=float, default=0.01, help="tasa de falsos positivos del filtro de Bloom")
+    cons = sub.add_parser("consultar", help="consulta una contraseña (leída de stdin si no se indica)")
+    cons.add_argument("-i", "--indice", default=BLACKLIST_INDEX)
+    cons.add_argument("password", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.comando == "compilar":
+        n = compilar_indice(args.blacklist, args.salida, bloom=args.bloom, tasa_falsos_positivos=args.fp)
+        print(f"Índice {args.salida} compilado: {n} entradas únicas.")
+        return 0
+    password = args.password if args.password is not None else sys.stdin.readline()
+    with IndiceBlacklist(args.indice) as indice:
+        encontrada = indice.contiene(password)
+    print("EN LISTA NEGRA" if encontrada else "no encontrada")
+    return 1 if encontrada else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,573 @@
+"""
+Módulo entropia: estimador de fortaleza basado en patrones (estilo zxcvbn), complementario al score heurístico
+de validator.evaluar_fuerza.
+Busca palabras de diccionario (también invertidas y con sustituciones l33t), recorridos de teclado, repeticiones,
+secuencias, años y fechas, y elige con programación dinámica la segmentación de menor cantidad de intentos.
+
+Los diccionarios (datos/diccionarios.txt) y los grafos de adyacencia de teclado se precompilan a un archivo binario
+(datos/patrones.bin, formato marshal) que se carga recién en la primera estimación. La cabecera del binario lleva
+la versión de Python y la firma de la fuente; si no coinciden las tablas se reconstruyen en memoria.
+Recompilar tras editar los diccionarios:  python entropia.py compilar
+"""
+#Dependencias
+import hashlib
+import marshal
+import math
+import os
+import re
+import sys
+from datetime import datetime
+from itertools import product
+
+DIR_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+FUENTE_DICCIONARIOS = os.path.join(DIR_DATOS, "diccionarios.txt")
+PATRONES_BIN = os.path.join(DIR_DATOS, "patrones.bin")
+VERSION_FORMATO = 1
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = datetime.now().year
+MAX_DELTA_SECUENCIA = 5
+MAX_COMBINACIONES_L33T = 64
+#Tope de combinaciones de sustitución probadas por contraseña (acota la latencia en entradas con muchos símbolos)
+
+L33T = {
+    "a": "4@", "b": "8", "c": "({[<", "e": "3", "g": "69", "i": "1!|",
+    "l": "1|7", "o": "0", "s": "$5", "t": "+7", "x": "%", "z": "2",
+}
+
+TECLADO_QWERTY = r"""
+`~ 1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+
+    qQ wW eE rR tT yY uU iI oO pP [{ ]} \|
+     aA sS dD fF gG hH jJ kK lL ;: '"
+      zZ xX cC vV bB nN mM ,< .> /?
+"""
+TECLADO_NUMERICO = """
+  / * -
+7 8 9 +
+4 5 6
+1 2 3
+  0 .
+"""
+
+_RE_SHIFTED = re.compile(r'[~!@#$%^&*()_+QWERTYUIOP{}|ASDFGHJKL:"ZXCVBNM<>?]')
+_RE_START_UPPER = re.compile(r"^[A-Z][^A-Z]+$")
+_RE_END_UPPER = re.compile(r"^[^A-Z]+[A-Z]$")
+_RE_ALL_UPPER = re.compile(r"^[^a-z]+$")
+_RE_ALL_LOWER = re.compile(r"^[^A-Z]+$")
+_RE_ANIO = re.compile(r"19\d\d|20\d\d")
+_RE_FECHA_SEP = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+_RE_DIGITOS = re.compile(r"\d{4,8}")
+
+
+# --- Compilación de tablas -------------------------------------------------------------------------
+
+def _construir_grafo(layout: str, inclinado: bool) -> dict:
+    #Grafo de adyacencia: carácter -> lista de vecinos por dirección (None si no hay tecla).
+    posiciones = {}
+    unidad_x = len(layout.split()[0]) + 1
+    for y, linea in enumerate(layout.split("\n")):
+        desplazamiento = y - 1 if inclinado else 0
+        for token in linea.split():
+            x = (linea.index(token) - desplazamiento) // unidad_x
+            posiciones[(x, y)] = token
+    if inclinado:
+        vecinos = lambda x, y: [(x - 1, y), (x, y - 1), (x + 1, y - 1), (x + 1, y), (x, y + 1), (x - 1, y + 1)]
+    else:
+        vecinos = lambda x, y: [(x - 1, y), (x - 1, y - 1), (x, y - 1), (x + 1, y - 1),
+                                (x + 1, y), (x + 1, y + 1), (x, y + 1), (x - 1, y + 1)]
+    grafo = {}
+    for (x, y), chars in posiciones.items():
+        for c in chars:
+            grafo[c] = [posiciones.get(p) for p in vecinos(x, y)]
+    return grafo
+
+
+def _hash_fuente() -> str:
+    with open(FUENTE_DICCIONARIOS, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _firma_fuente() -> str:
+    #Tamaño y mtime de la fuente: comparación barata antes de recurrir al hash del contenido.
+    st = os.stat(FUENTE_DICCIONARIOS)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _cabecera(firma: str, hash_fuente: str) -> bytes:
+    #Primera línea del binario: formato, intérprete (marshal no es portable entre versiones de Python) y fuente.
+    return f"patrones {VERSION_FORMATO} {sys.implementation.cache_tag} {firma} {hash_fuente}\n".encode("ascii")
+
+
+def construir_tablas() -> dict:
+    """Parsea la fuente de diccionarios y construye los grafos de teclado, en memoria."""
+    diccionarios = {}
+    actual = None
+    with open(FUENTE_DICCIONARIOS, "r", encoding="utf-8") as f:
+        for line in f:
+            palabra = line.strip()
+            if palabra.startswith("## "):
+                actual = diccionarios.setdefault(palabra[3:].strip(), {})
+            elif palabra and not palabra.startswith("#") and actual is not None:
+                actual.setdefault(palabra.lower(), len(actual) + 1)
+    grafos = {"qwerty": _construir_grafo(TECLADO_QWERTY, True),
+              "teclado_numerico": _construir_grafo(TECLADO_NUMERICO, False)}
+    return {
+        "diccionarios": diccionarios,
+        "max_palabra": max((len(p) for d in diccionarios.values() for p in d), default=0),
+        "grafos": grafos,
+        "grafos_stats": {n: (len(g), sum(1 for v in g.values() for a in v if a) / len(g)) for n, g in grafos.items()},
+    }
+
+
+def guardar_tablas(tablas: dict, destino: str = None, hash_fuente: str = None):
+    """Escribe el binario (cabecera + marshal) de forma atómica, por defecto en PATRONES_BIN."""
+    destino = destino or PATRONES_BIN
+    cabecera = _cabecera(_firma_fuente(), hash_fuente or _hash_fuente())
+    tmp = f"{destino}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(cabecera)
+            marshal.dump(tablas, f)
+        os.replace(tmp, destino)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def compilar_tablas(destino: str = None) -> dict:
+    """Construye las tablas y escribe el binario. Devuelve las tablas."""
+    tablas = construir_tablas()
+    guardar_tablas(tablas, destino)
+    return tablas
+
+
+def _cargar_binario():
+    #Tablas del binario si corresponde a este formato, a este intérprete y a la fuente actual; None si no.
+    try:
+        with open(PATRONES_BIN, "rb") as f:
+            campos = f.readline().decode("ascii").split()
+            if (len(campos) != 5 or campos[0] != "patrones" or campos[1] != str(VERSION_FORMATO)
+                    or campos[2] != sys.implementation.cache_tag):
+                return None
+            vigente = campos[3] == _firma_fuente()
+            if not vigente and campos[4] != _hash_fuente():
+                return None
+            tablas = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if not vigente:
+        #Mismo contenido con otro mtime (checkout, copia): se actualiza la firma para no volver a hashear.
+        try:
+            guardar_tablas(tablas, hash_fuente=campos[4])
+        except OSError:
+            pass
+    return tablas
+
+
+_tablas = None
+
+
+def _obtener_tablas() -> dict:
+    """
+    Carga perezosa del binario. Si falta, es de otra versión de Python o no corresponde a la fuente actual se
+    reconstruye en memoria y se intenta regrabar; si no se puede escribir (directorio de solo lectura) se usan
+    las tablas en memoria.
+    """
+    global _tablas
+    if _tablas is None:
+        tablas = _cargar_binario()
+        if tablas is None:
+            tablas = construir_tablas()
+            try:
+                guardar_tablas(tablas)
+            except OSError:
+                pass
+        _tablas = tablas
+    return _tablas
+
+
+# --- Búsqueda de patrones --------------------------------------------------------------------------
+
+def _coincidencias_diccionario(password: str, tablas: dict, original: str = None) -> list:
+    salida = []
+    n = len(password)
+    bajo = password.lower()
+    max_palabra = tablas["max_palabra"]
+    for nombre, ranking in tablas["diccionarios"].items():
+        for i in range(n):
+            for j in range(i + 2, min(n, i + max_palabra)):
+                palabra = bajo[i:j + 1]
+                rango = ranking.get(palabra)
+                if rango is not None:
+                    salida.append({"patron": "diccionario", "i": i, "j": j, "token": password[i:j + 1],
+                                   "palabra": palabra, "rango": rango, "diccionario": nombre,
+                                   "invertida": False, "l33t": False})
+    return salida
+
+
+def _coincidencias_invertidas(password: str, tablas: dict) -> list:
+    invertida = password[::-1]
+    n = len(password)
+    salida = []
+    for m in _coincidencias_diccionario(invertida, tablas):
+        m["token"] = m["token"][::-1]
+        m["invertida"] = True
+        m["i"], m["j"] = n - 1 - m["j"], n - 1 - m["i"]
+        salida.append(m)
+    return salida
+
+
+def _coincidencias_l33t(password: str, tablas: dict) -> list:
+    #Prueba las combinaciones de sustitución presentes en la contraseña (acotadas) y busca en los diccionarios.
+    presentes = {}
+    for letra, subs in L33T.items():
+        for s in subs:
+            if s in password:
+                presentes.setdefault(s, []).append(letra)
+    if not presentes:
+        return []
+    simbolos = list(presentes)
+    salida = []
+    vistos = set()
+    for k, opciones in enumerate(product(*(presentes[s] for s in simbolos))):
+        if k >= MAX_COMBINACIONES_L33T:
+            break
+        sub = dict(zip(simbolos, opciones))
+        traducida = password.translate(str.maketrans(sub))
+        for m in _coincidencias_diccionario(traducida, tablas):
+            token = password[m["i"]:m["j"] + 1]
+            if token.lower() == m["palabra"]:
+                continue
+            usados = {s: l for s, l in sub.items() if s in token}
+            clave = (m["i"], m["j"], m["palabra"], m["diccionario"])
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+            m.update({"token": token, "l33t": True, "sub": usados})
+            salida.append(m)
+    return salida
+
+
+def _coincidencias_teclado(password: str, tablas: dict) -> list:
+    salida = []
+    for nombre, grafo in tablas["grafos"].items():
+        i = 0
+        n = len(password)
+        while i < n - 1:
+            j = i + 1
+            ultima_direccion = None
+            giros = 0
+            shifted = 1 if nombre == "qwerty" and _RE_SHIFTED.match(password[i]) else 0
+            while True:
+                encontrada = False
+                if j < n:
+                    actual = password[j]
+                    for direccion, adyacente in enumerate(grafo.get(password[j - 1]) or []):
+                        if adyacente and actual in adyacente:
+                            encontrada = True
+                            if adyacente.index(actual) == 1:
+                                shifted += 1
+                            if ultima_direccion != direccion:
+                                giros += 1
+                                ultima_direccion = direccion
+                            break
+                if encontrada:
+                    j += 1
+                else:
+                    if j - i > 2:
+                        salida.append({"patron": "teclado", "i": i, "j": j - 1, "token": password[i:j],
+                                       "grafo": nombre, "giros": giros, "shifted": shifted})
+                    i = j
+                    break
+    return salida
+
+
+def _coincidencias_repeticion(password: str) -> list:
+    salida = []
+    for patron in (re.compile(r"(.+)\1+", re.DOTALL), re.compile(r"(.+?)\1+", re.DOTALL)):
+        pos = 0
+        while pos < len(password):
+            m = patron.search(password, pos)
+            if not m:
+                break
+            salida.append({"patron": "repeticion", "i": m.start(), "j": m.end() - 1, "token": m.group(0),
+                           "base": m.group(1), "repeticiones": len(m.group(0)) // len(m.group(1))})
+            pos = m.end()
+    return salida
+
+
+def _coincidencias_secuencia(password: str) -> list:
+    salida = []
+    if len(password) <= 1:
+        return salida
+
+    def agregar(i, j, delta):
+        if (j - i > 1 or abs(delta) == 1) and 0 < abs(delta) <= MAX_DELTA_SECUENCIA:
+            token = password[i:j + 1]
+            if token.islower() and token.isalpha():
+                espacio = 26
+            elif token.isupper() and token.isalpha():
+                espacio = 26
+            elif token.isdigit():
+                espacio = 10
+            else:
+                espacio = 26
+            salida.append({"patron": "secuencia", "i": i, "j": j, "token": token,
+                           "espacio": espacio, "ascendente": delta > 0})
+
+    i = 0
+    ultimo = None
+    for k in range(1, len(password)):
+        delta = ord(password[k]) - ord(password[k - 1])
+        if ultimo is None:
+            ultimo = delta
+        if delta == ultimo:
+            continue
+        agregar(i, k - 1, ultimo)
+        i = k - 1
+        ultimo = delta
+    agregar(i, len(password) - 1, ultimo)
+    return salida
+
+
+def _anio_valido(a: int) -> bool:
+    return 1900 <= a <= 2050
+
+
+def _fecha_de_digitos(d: str):
+    #Busca una división día/mes/año válida de una cadena de 4 a 8 dígitos; devuelve el año o None.
+    n = len(d)
+    divisiones = {4: [(1, 2), (2, 3)], 5: [(1, 3), (2, 3)], 6: [(1, 2), (2, 4), (4, 5)],
+                  7: [(1, 3), (2, 3), (4, 5), (4, 6)], 8: [(2, 4), (4, 6)]}[n]
+    for k, l in divisiones:
+        partes = (int(d[:k]), int(d[k:l]), int(d[l:]))
+        for anio, a, b in ((partes[2], partes[0], partes[1]), (partes[0], partes[1], partes[2])):
+            if anio < 100:
+                anio += 1900 if anio > 50 else 2000
+            if _anio_valido(anio) and ((1 <= a <= 31 and 1 <= b <= 12) or (1 <= b <= 31 and 1 <= a <= 12)):
+                return anio
+    return None
+
+
+def _coincidencias_fecha(password: str) -> list:
+    salida = []
+    for i in range(len(password)):
+        for j in range(i + 3, min(len(password), i + 8)):
+            token = password[i:j + 1]
+            if token.isdigit():
+                anio = _fecha_de_digitos(token)
+                if anio is not None:
+                    salida.append({"patron": "fecha", "i": i, "j": j, "token": token, "anio": anio, "separador": ""})
+    for m in _RE_FECHA_SEP.finditer(password):
+        partes = [int(m.group(1)), int(m.group(3)), int(m.group(4))]
+        for anio, a, b in ((partes[2], partes[0], partes[1]), (partes[0], partes[1], partes[2])):
+            if anio < 100:
+                anio += 1900 if anio > 50 else 2000
+            if _anio_valido(anio) and ((1 <= a <= 31 and 1 <= b <= 12) or (1 <= b <= 31 and 1 <= a <= 12)):
+                salida.append({"patron": "fecha", "i": m.start(), "j": m.end() - 1, "token": m.group(0),
+                               "anio": anio, "separador": m.group(2)})
+                break
+    for m in _RE_ANIO.finditer(password):
+        salida.append({"patron": "anio", "i": m.start(), "j": m.end() - 1, "token": m.group(0)})
+    return salida
+
+
+# --- Estimación de intentos ------------------------------------------------------------------------
+
+def _ncr(n: int, k: int) -> int:
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+
+def _variaciones_mayusculas(token: str) -> int:
+    if _RE_ALL_LOWER.match(token) or token.lower() == token:
+        return 1
+    for r in (_RE_START_UPPER, _RE_END_UPPER, _RE_ALL_UPPER):
+        if r.match(token):
+            return 2
+    u = sum(1 for c in token if c.isupper())
+    l = sum(1 for c in token if c.islower())
+    return sum(_ncr(u + l, i) for i in range(1, min(u, l) + 1))
+
+
+def _variaciones_l33t(m: dict) -> int:
+    if not m["l33t"]:
+        return 1
+    variaciones = 1
+    bajo = m["token"].lower()
+    for simbolo, letra in m["sub"].items():
+        s = bajo.count(simbolo)
+        u = bajo.count(letra)
+        if s == 0 or u == 0:
+            variaciones *= 2
+        else:
+            variaciones *= sum(_ncr(u + s, i) for i in range(1, min(u, s) + 1))
+    return variaciones
+
+
+def _intentos_patron(m: dict, tablas: dict) -> float:
+    p = m["patron"]
+    if p == "fuerza_bruta":
+        return float(BRUTEFORCE_CARDINALITY) ** len(m["token"]) if len(m["token"]) < 300 else sys.float_info.max
+    if p == "diccionario":
+        return m["rango"] * _variaciones_mayusculas(m["token"]) * _variaciones_l33t(m) * (2 if m["invertida"] else 1)
+    if p == "teclado":
+        s, d = tablas["grafos_stats"][m["grafo"]]
+        largo, giros = len(m["token"]), m["giros"]
+        intentos = 0
+        for i in range(2, largo + 1):
+            for j in range(1, min(giros, i - 1) + 1):
+                intentos += _ncr(i - 1, j - 1) * s * d ** j
+        if m["shifted"]:
+            sh, un = m["shifted"], largo - m["shifted"]
+            if sh == 0 or un == 0:
+                intentos *= 2
+            else:
+                intentos *= sum(_ncr(sh + un, i) for i in range(1, min(sh, un) + 1))
+        return intentos
+    if p == "repeticion":
+        return _estimar(m["base"], tablas)["intentos"] * m["repeticiones"]
+    if p == "secuencia":
+        primero = m["token"][0]
+        base = 4 if primero in "aAzZ019" else (10 if primero.isdigit() else 26)
+        return base * (1 if m["ascendente"] else 2) * len(m["token"])
+    if p == "anio":
+        return max(abs(int(m["token"]) - REFERENCE_YEAR), MIN_YEAR_SPACE)
+    if p == "fecha":
+        return max(abs(m["anio"] - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365 * (4 if m["separador"] else 1)
+    return float(BRUTEFORCE_CARDINALITY) ** len(m["token"])
+
+
+def _intentos(m: dict, password: str, tablas: dict) -> float:
+    if "intentos" in m:
+        return m["intentos"]
+    minimo = 1
+    if len(m["token"]) < len(password):
+        minimo = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if len(m["token"]) == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+    m["intentos"] = max(_intentos_patron(m, tablas), minimo)
+    return m["intentos"]
+
+
+def _secuencia_optima(password: str, coincidencias: list, tablas: dict):
+    """
+    Programación dinámica de zxcvbn: para cada posición final k y cantidad de patrones l guarda la mejor
+    combinación (mínimo l! * prod(intentos) + 10000^(l-1)); los huecos se cubren con fuerza bruta.
+    """
+    n = len(password)
+    por_fin = [[] for _ in range(n)]
+    for m in coincidencias:
+        por_fin[m["j"]].append(m)
+    for lista in por_fin:
+        lista.sort(key=lambda m: m["i"])
+    opt_m = [{} for _ in range(n)]
+    opt_pi = [{} for _ in range(n)]
+    opt_g = [{} for _ in range(n)]
+
+    def actualizar(m, l):
+        k = m["j"]
+        pi = _intentos(m, password, tablas)
+        if l > 1:
+            pi *= opt_pi[m["i"] - 1][l - 1]
+        g = math.factorial(l) * pi + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (l - 1)
+        for l2, g2 in opt_g[k].items():
+            if l2 <= l and g2 <= g:
+                return
+        opt_g[k][l] = g
+        opt_m[k][l] = m
+        opt_pi[k][l] = pi
+
+    def fuerza_bruta(i, k):
+        return {"patron": "fuerza_bruta", "i": i, "j": k, "token": password[i:k + 1]}
+
+    for k in range(n):
+        for m in por_fin[k]:
+            if m["i"] > 0:
+                for l in list(opt_m[m["i"] - 1]):
+                    actualizar(m, l + 1)
+            else:
+                actualizar(m, 1)
+        actualizar(fuerza_bruta(0, k), 1)
+        for i in range(1, k + 1):
+            m = fuerza_bruta(i, k)
+            for l, anterior in list(opt_m[i - 1].items()):
+                if anterior["patron"] != "fuerza_bruta":
+                    actualizar(m, l + 1)
+
+    if n == 0:
+        return [], 1
+    k = n - 1
+    l, g = min(opt_g[k].items(), key=lambda item: item[1])
+    secuencia = []
+    while k >= 0:
+        m = opt_m[k][l]
+        secuencia.insert(0, m)
+        k = m["i"] - 1
+        l -= 1
+    return secuencia, g
+
+
+def _estimar(password: str, tablas: dict) -> dict:
+    coincidencias = (_coincidencias_diccionario(password, tablas) + _coincidencias_invertidas(password, tablas)
+                     + _coincidencias_l33t(password, tablas) + _coincidencias_teclado(password, tablas)
+                     + _coincidencias_secuencia(password) + _coincidencias_fecha(password))
+    coincidencias += [m for m in _coincidencias_repeticion(password) if m["base"] != password]
+    secuencia, intentos = _secuencia_optima(password, coincidencias, tablas)
+    return {"intentos": intentos, "secuencia": secuencia}
+
+
+def _nivel(intentos: float) -> int:
+    delta = 5
+    if intentos < 1e3 + delta:
+        return 0
+    if intentos < 1e6 + delta:
+        return 1
+    if intentos < 1e8 + delta:
+        return 2
+    if intentos < 1e10 + delta:
+        return 3
+    return 4
+
+
+def estimar_entropia(password: str) -> dict:
+    """
+    Estima cuántos intentos necesitaría un atacante que prueba primero patrones humanos comunes.
+    Devuelve:
+    - intentos / log10_intentos / bits (log2 de intentos)
+    - nivel: 0 (trivial) a 4 (muy fuerte), mismos cortes que zxcvbn
+    - patrones: lista de (patrón, token) de la segmentación elegida
+    """
+    tablas = _obtener_tablas()
+    r = _estimar(password, tablas)
+    intentos = r["intentos"]
+    return {
+        "intentos": intentos,
+        "log10_intentos": math.log10(intentos) if intentos > 0 else 0.0,
+        "bits": math.log2(intentos) if intentos > 0 else 0.0,
+        "nivel": _nivel(intentos),
+        "patrones": [(m["patron"], m["token"]) for m in r["secuencia"]],
+    }
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compilar"]:
+        tablas = compilar_tablas()
+        total = sum(len(d) for d in tablas["diccionarios"].values())
+        print(f"Tablas compiladas en {PATRONES_BIN}: {total} palabras, {len(tablas['grafos'])} teclados.")
+        return 0
+    if argv[:1] == ["estimar"] and len(argv) == 2:
+        r = estimar_entropia(argv[1])
+        print(f"{r['bits']:.1f} bits (nivel {r['nivel']}/4): {r['patrones']}")
+        return 0
+    print("Uso: python entropia.py compilar | estimar <contraseña>")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,23 @@ Módulo generator: generación de contraseñas seguras usando RNG criptográfico
 #Dependencias:
 import secrets
 import string
+from dataclasses import dataclass
+
+from perfilado import medido
 
 MAX_LONGITUD = 128
 #Se define un límite máximo de longitud para prevenir abusos o condiciones de denegación de servicio
 
-def generar_contrasena(longitud: int, uso_may: bool, uso_min: bool, uso_dig: bool, uso_sim: bool) -> str:
-    """
-    Genera una contraseña segura usando secrets (aleatoriedad criptográfica).
-    Construye el pool de caracteres según la selección del usuario, genera aleatoriamente cada carácter y retorna la contraseña final.
-    """
+SIMBOLOS = "!@#$%^&*()-_=+[]{};:,.<>?/\\|"
+BLOQUE_ENTROPIA = 64 * 1024
+#Tamaño máximo (en bytes) de cada lectura al CSPRNG; pedidos chicos (una contraseña) leen solo lo necesario
+AMBIGUOS = "Il1O0o|"
+#Caracteres que se confunden fácilmente al leerlos o dictarlos
+SECUENCIAS = "abcdefghijklmnopqrstuvwxyz0123456789"
+#Misma tabla que usa validator.evaluar_fuerza para detectar secuencias de 3
+
+def _construir_pool(uso_may: bool, uso_min: bool, uso_dig: bool, uso_sim: bool) -> str:
+    #Une los conjuntos seleccionados. Si no hay ninguno, levanta ValueError.
     caracteres = ""
     if uso_may:
         caracteres += string.ascii_uppercase
@@ -21,13 +29,193 @@ def generar_contrasena(longitud: int, uso_may: bool, uso_min: bool, uso_dig: boo
     if uso_dig:
         caracteres += string.digits
     if uso_sim:
-        caracteres += "!@#$%^&*()-_=+[]{};:,.<>?/\\|"
+        caracteres += SIMBOLOS
 
-    if not caracteres: #Si no hay conjuntos seleccionados, levanta ValueError.
+    if not caracteres:
         raise ValueError("Debe seleccionar al menos un conjunto de caracteres.")
+    return caracteres
 
+@medido("generacion.contrasena")
+def generar_contrasena(longitud: int, uso_may: bool, uso_min: bool, uso_dig: bool, uso_sim: bool) -> str:
+    """
+    Genera una contraseña segura usando secrets (aleatoriedad criptográfica).
+    Construye el pool de caracteres según la selección del usuario, genera aleatoriamente cada carácter y retorna la contraseña final.
+    """
+    caracteres = _construir_pool(uso_may, uso_min, uso_dig, uso_sim)
     return "".join(secrets.choice(caracteres) for _ in range(longitud))
 
 def generar_variantes(longitud: int, uso_may: bool, uso_min: bool, uso_dig: bool, uso_sim: bool, n: int = 3):
     #Genera varias contraseñas
-    return [generar_contrasena(longitud, uso_may, uso_min, uso_dig, uso_sim) for _ in range(n)]
+    return generar_lote(n, longitud, uso_may, uso_min, uso_dig, uso_sim)
+
+def _tablas_rechazo(caracteres: str):
+    """
+    Prepara las tablas para bytes.translate: cada byte aceptado se mapea a un carácter del pool
+    (b % len(pool)) y los bytes >= limite se descartan para que la distribución sea uniforme.
+    """
+    n_pool = len(caracteres)
+    limite = 256 - (256 % n_pool)
+    tabla = bytes(ord(caracteres[b % n_pool]) if b < limite else 0 for b in range(256))
+    descartar = bytes(range(limite, 256))
+    return tabla, descartar, limite
+
+def _caracteres_aleatorios(caracteres: str, cantidad: int) -> str:
+    """
+    Devuelve 'cantidad' caracteres uniformes del pool leyendo el CSPRNG en bloques grandes
+    (una llamada a secrets.token_bytes por bloque en lugar de una por carácter) y aplicando muestreo por rechazo.
+    """
+    tabla, descartar, limite = _tablas_rechazo(caracteres)
+    partes = []
+    faltan = cantidad
+    while faltan > 0:
+        # Se pide un margen extra según la tasa de aceptación para evitar lecturas adicionales
+        pedir = min(BLOQUE_ENTROPIA, (faltan * 256) // limite + 64)
+        aceptados = secrets.token_bytes(pedir).translate(tabla, descartar)[:faltan]
+        partes.append(aceptados)
+        faltan -= len(aceptados)
+    return b"".join(partes).decode("ascii")
+
+@medido("generacion.lote")
+def generar_lote(n: int, longitud: int, uso_may: bool = True, uso_min: bool = True,
+                 uso_dig: bool = True, uso_sim: bool = True) -> list:
+    """
+    Genera n contraseñas de la longitud indicada en una sola pasada.
+    Lee la entropía en bloques grandes y la reparte entre las contraseñas, con la misma distribución que generar_contrasena.
+    """
+    if n <= 0:
+        return []
+    caracteres = _construir_pool(uso_may, uso_min, uso_dig, uso_sim)
+    if longitud <= 0:
+        return [""] * n  # igual que generar_contrasena: range(longitud) vacío
+    bruto = _caracteres_aleatorios(caracteres, n * longitud)
+    return [bruto[i:i + longitud] for i in range(0, n * longitud, longitud)]
+
+def generar_flujo(longitud: int, uso_may: bool = True, uso_min: bool = True, uso_dig: bool = True,
+                  uso_sim: bool = True, total: int = None, tamano_lote: int = 1024):
+    """
+    Iterador perezoso de contraseñas: produce un lote de 'tamano_lote' solo cuando el consumidor agotó el anterior,
+    por lo que la memoria es constante. Si total es None el flujo es infinito.
+    Los parámetros se validan al llamar (no en el primer next()).
+    """
+    if tamano_lote <= 0:
+        raise ValueError("El tamaño de lote debe ser mayor a 0.")
+    _construir_pool(uso_may, uso_min, uso_dig, uso_sim)
+    return _flujo(longitud, uso_may, uso_min, uso_dig, uso_sim, total, tamano_lote)
+
+def _flujo(longitud, uso_may, uso_min, uso_dig, uso_sim, total, tamano_lote):
+    restantes = total
+    while restantes is None or restantes > 0:
+        cantidad = tamano_lote if restantes is None else min(tamano_lote, restantes)
+        yield from generar_lote(cantidad, longitud, uso_may, uso_min, uso_dig, uso_sim)
+        if restantes is not None:
+            restantes -= cantidad
+
+
+@dataclass
+class PoliticaContrasena:
+    """
+    Política corporativa que la contraseña debe cumplir por construcción:
+    - min_*: cantidad mínima de caracteres de cada clase (0 = opcional; la clase se usa si uso_* es True).
+    - excluir / excluir_ambiguos: caracteres que nunca deben aparecer.
+    - sin_repeticiones / sin_secuencias: mismas reglas que evaluar_fuerza (3 iguales seguidos, "abc", "123").
+    """
+    longitud: int = 16
+    uso_may: bool = True
+    uso_min: bool = True
+    uso_dig: bool = True
+    uso_sim: bool = True
+    min_may: int = 1
+    min_min: int = 1
+    min_dig: int = 1
+    min_sim: int = 1
+    excluir: str = ""
+    excluir_ambiguos: bool = False
+    sin_repeticiones: bool = True
+    sin_secuencias: bool = True
+
+    def pools(self) -> dict:
+        #Devuelve {clase: (caracteres permitidos, mínimo)} para las clases habilitadas, ya sin exclusiones.
+        excluidos = set(self.excluir) | (set(AMBIGUOS) if self.excluir_ambiguos else set())
+        clases = {
+            "may": (self.uso_may, string.ascii_uppercase, self.min_may),
+            "min": (self.uso_min, string.ascii_lowercase, self.min_min),
+            "dig": (self.uso_dig, string.digits, self.min_dig),
+            "sim": (self.uso_sim, SIMBOLOS, self.min_sim),
+        }
+        salida = {}
+        for nombre, (uso, base, minimo) in clases.items():
+            if not uso:
+                continue
+            salida[nombre] = ("".join(c for c in base if c not in excluidos), max(0, minimo))
+        return salida
+
+    def validar(self):
+        #Levanta ValueError si la política no puede cumplirse (así la generación nunca necesita reintentos).
+        pools = self.pools()
+        if not pools:
+            raise ValueError("Debe seleccionar al menos un conjunto de caracteres.")
+        if self.longitud <= 0 or self.longitud > MAX_LONGITUD:
+            raise ValueError(f"La longitud debe estar entre 1 y {MAX_LONGITUD}.")
+        if sum(minimo for _, minimo in pools.values()) > self.longitud:
+            raise ValueError("La suma de mínimos por clase supera la longitud.")
+        # Cada posición puede tener hasta 3 caracteres prohibidos (repetición + secuencia en may/min),
+        # por eso cada pool en uso necesita al menos 4 caracteres disponibles.
+        for nombre, (pool, minimo) in pools.items():
+            if minimo > 0 and len(pool) < 4:
+                raise ValueError(f"La clase '{nombre}' tiene muy pocos caracteres tras las exclusiones.")
+        if len("".join(p for p, _ in pools.values())) < 4:
+            raise ValueError("El conjunto de caracteres permitido es demasiado pequeño.")
+
+def _indice_uniforme(n: int, fuente) -> int:
+    #Toma bytes de "fuente" con muestreo por rechazo hasta obtener un índice uniforme en [0, n) (n <= 256).
+    limite = 256 - (256 % n)
+    for b in fuente:
+        if b < limite:
+            return b % n
+
+def _bytes_aleatorios():
+    #Iterador infinito de bytes del CSPRNG leídos en bloques.
+    while True:
+        yield from secrets.token_bytes(512)
+
+def _prohibidos(anterior2: str, anterior1: str, politica: PoliticaContrasena) -> set:
+    #Caracteres que, puestos a continuación, romperían las reglas de repetición o secuencia.
+    prohibidos = set()
+    if not anterior1:
+        return prohibidos
+    if politica.sin_repeticiones and anterior2 == anterior1:
+        prohibidos.add(anterior1)
+    if politica.sin_secuencias and anterior2:
+        j = SECUENCIAS.find(anterior1.lower())
+        if 0 < j < len(SECUENCIAS) - 1 and SECUENCIAS[j - 1] == anterior2.lower():
+            siguiente = SECUENCIAS[j + 1]
+            prohibidos.update((siguiente, siguiente.upper()))
+    return prohibidos
+
+@medido("generacion.politica")
+def generar_con_politica(politica: PoliticaContrasena) -> str:
+    """
+    Genera una contraseña que cumple la política en una sola pasada, sin regenerar:
+      1. Reserva el mínimo de posiciones para cada clase y el resto para el pool combinado.
+      2. Baraja las posiciones (Fisher-Yates con bytes del CSPRNG).
+      3. Elige cada carácter de su pool descartando los que formarían repetición o secuencia con los dos anteriores.
+    """
+    politica.validar()
+    pools = politica.pools()
+    combinado = "".join(p for p, _ in pools.values())
+    etiquetas = [nombre for nombre, (_, minimo) in pools.items() for _ in range(minimo)]
+    etiquetas += [None] * (politica.longitud - len(etiquetas))
+
+    fuente = _bytes_aleatorios()
+    for i in range(len(etiquetas) - 1, 0, -1):
+        j = _indice_uniforme(i + 1, fuente)
+        etiquetas[i], etiquetas[j] = etiquetas[j], etiquetas[i]
+
+    salida = []
+    for etiqueta in etiquetas:
+        pool = combinado if etiqueta is None else pools[etiqueta][0]
+        prohibidos = _prohibidos(salida[-2] if len(salida) > 1 else "", salida[-1] if salida else "", politica)
+        if prohibidos:
+            pool = "".join(c for c in pool if c not in prohibidos)
+        salida.append(pool[_indice_uniforme(len(pool), fuente)])
+    return "".join(salida)
@@ -0,0 +1,609 @@
+"""
+Módulo hibp: consulta de Pwned Passwords (API por rangos k-anonymity con caché, o base offline).
+
+Modo online: cada prefijo de 5 hex descargado se guarda como arreglo ordenado de sufijos (caché en memoria
+LRU con TTL), así contraseñas que comparten prefijo no vuelven a la red. La caché en disco es opcional
+(HIBP_CACHE_DISCO=1 usa el directorio de caché del usuario, o HIBP_CACHE_DISCO=<ruta>): los prefijos guardados
+revelan qué contraseñas se consultaron a quien pueda leerlos, por eso el directorio se crea con permisos 0700.
+
+Modo offline (hosts sin red): convierte el volcado SHA-1 descargado (líneas "HASH:CONTEO") en un archivo binario con registros de
+20 bytes de hash + 4 bytes de conteo, ordenados y agrupados por los 2 primeros bytes del hash.
+La consulta salta directo al bucket con la tabla de offsets y hace búsqueda binaria sobre mmap.
+
+Compilar:  python hibp.py compilar pwned-passwords-sha1.txt -o hibp.db
+"""
+#Dependencias
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from perfilado import medido
+# asyncio (cliente por lotes), tempfile (compilar) y requests (modo online) se importan al usarse:
+# la consulta offline y la importación desde main_generador_final no cargan la pila de red.
+
+HIBP_OFFLINE_DB = "hibp.db"
+MAGIC = b"HIBPDB01"
+CABECERA = struct.Struct("<8sQ")  # magic, cantidad de registros
+N_BUCKETS = 1 << 16
+#Buckets por los 2 primeros bytes del hash: con cientos de millones de hashes quedan unos miles por bucket
+REGISTRO = struct.Struct(">20sI")
+ANCHO_REGISTRO = REGISTRO.size
+BUCKETS_TEMPORALES = 256
+
+HIBP_API_URL = os.environ.get("HIBP_API_URL", "https://api.pwnedpasswords.com/range/")
+#Configurable para apuntar a un servidor de pruebas local
+HIBP_CACHE_DISCO = os.environ.get("HIBP_CACHE_DISCO", "")
+#Caché en disco: vacío o '0' la desactiva (solo memoria), '1' usa el directorio de caché del usuario, otro valor es la ruta
+HIBP_CACHE_TTL = 24 * 3600
+MAGIC_RANGO = b"HIBPRG01"
+CABECERA_RANGO = struct.Struct("<8sd")  # magic, timestamp de descarga
+SUFIJO = struct.Struct(">18sI")
+#Sufijo de 35 hex (se antepone un 0 para obtener 18 bytes) + conteo
+ANCHO_SUFIJO = SUFIJO.size
+
+
+def _sha1(password: str) -> bytes:
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+def compilar_base(dump_file: str, db_file: str = HIBP_OFFLINE_DB) -> int:
+    """
+    Compila el volcado en dos pasadas con memoria acotada:
+      1. Parsea cada línea, cuenta registros por bucket y los reparte en 256 archivos temporales por primer byte.
+      2. Concatena los archivos temporales (ordenando solo los que llegaron desordenados; el volcado oficial ya viene ordenado).
+    Escribe en un archivo temporal y lo renombra al final. Devuelve la cantidad de registros.
+    """
+    import tempfile
+    conteos = array("Q", bytes(8 * N_BUCKETS))
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = [os.path.join(tmp, f"{i:02x}") for i in range(BUCKETS_TEMPORALES)]
+        archivos = [open(r, "wb") for r in rutas]
+        ultimo = [b""] * BUCKETS_TEMPORALES
+        ordenado = [True] * BUCKETS_TEMPORALES
+        total = 0
+        try:
+            with open(dump_file, "r", encoding="ascii", errors="ignore") as f:
+                for line in f:
+                    hsh, _, cnt = line.strip().partition(":")
+                    if len(hsh) != 40:
+                        continue
+                    try:
+                        h = bytes.fromhex(hsh)
+                        n = min(int(cnt or 0), 0xFFFFFFFF)
+                    except ValueError:
+                        continue
+                    b = h[0]
+                    if h < ultimo[b]:
+                        ordenado[b] = False
+                    ultimo[b] = h
+                    archivos[b].write(REGISTRO.pack(h, n))
+                    conteos[(h[0] << 8) | h[1]] += 1
+                    total += 1
+        finally:
+            for a in archivos:
+                a.close()
+
+        offsets = array("Q", [0]) * (N_BUCKETS + 1)
+        acumulado = 0
+        for i in range(N_BUCKETS):
+            offsets[i] = acumulado
+            acumulado += conteos[i]
+        offsets[N_BUCKETS] = acumulado
+        if sys.byteorder != "little":
+            offsets.byteswap()
+
+        destino = db_file + ".tmp"
+        with open(destino, "wb") as out:
+            out.write(CABECERA.pack(MAGIC, total))
+            out.write(offsets.tobytes())
+            for b, ruta in enumerate(rutas):
+                with open(ruta, "rb") as t:
+                    if ordenado[b]:
+                        while True:
+                            bloque = t.read(1 << 20)
+                            if not bloque:
+                                break
+                            out.write(bloque)
+                    else:
+                        datos = t.read()
+                        registros = [datos[i:i + ANCHO_REGISTRO] for i in range(0, len(datos), ANCHO_REGISTRO)]
+                        registros.sort()
+                        out.write(b"".join(registros))
+        os.replace(destino, db_file)
+    return total
+
+
+class BaseHIBPOffline:
+    """Base offline abierta en modo lectura sobre mmap. Usar como context manager o llamar a cerrar()."""
+
+    def __init__(self, db_file: str = HIBP_OFFLINE_DB):
+        self.ruta = db_file
+        self._f = open(db_file, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise ValueError("Base HIBP offline vacía o corrupta.")
+        magic, self.cantidad = CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.cerrar()
+            raise ValueError("Formato de base HIBP offline no reconocido.")
+        self._offsets_inicio = CABECERA.size
+        self._datos_inicio = self._offsets_inicio + 8 * (N_BUCKETS + 1)
+        self.mtime = os.stat(db_file).st_mtime_ns
+
+    def contar_hash(self, h: bytes) -> int:
+        #Devuelve el conteo de brechas de un SHA-1 binario (0 si no figura).
+        mm = self._mm
+        bucket = (h[0] << 8) | h[1]
+        lo, hi = struct.unpack_from("<QQ", mm, self._offsets_inicio + 8 * bucket)
+        base = self._datos_inicio
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = base + mid * ANCHO_REGISTRO
+            actual = mm[pos:pos + 20]
+            if actual < h:
+                lo = mid + 1
+            elif actual > h:
+                hi = mid
+            else:
+                return REGISTRO.unpack_from(mm, pos)[1]
+        return 0
+
+    def contar(self, password: str) -> int:
+        return self.contar_hash(_sha1(password))
+
+    def cerrar(self):
+        try:
+            self._mm.close()
+        finally:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+_bases_abiertas = {}
+
+
+def abrir_base(db_file: str = HIBP_OFFLINE_DB):
+    """Devuelve la base abierta (reutilizada entre llamadas) o None si no existe. Se reabre si fue recompilada."""
+    try:
+        mtime = os.stat(db_file).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    base = _bases_abiertas.get(db_file)
+    if base is not None and base.mtime == mtime:
+        return base
+    if base is not None:
+        base.cerrar()
+    base = BaseHIBPOffline(db_file)
+    _bases_abiertas[db_file] = base
+    return base
+
+
+@medido("hibp.offline")
+def contar_offline(password: str, db_file: str = HIBP_OFFLINE_DB):
+    #Conteo de brechas según la base local; None si la base no existe o no se puede leer.
+    try:
+        base = abrir_base(db_file)
+    except (OSError, ValueError):
+        return None
+    if base is None:
+        return None
+    return base.contar(password)
+
+
+def _sufijo_binario(sufijo_hex: str) -> bytes:
+    return bytes.fromhex("0" + sufijo_hex)
+
+
+def parsear_rango(texto: str) -> bytes:
+    """Convierte la respuesta de /range/{prefijo} ("SUFIJO:CONTEO" por línea) en registros binarios ordenados."""
+    registros = []
+    for line in texto.splitlines():
+        sufijo, _, cnt = line.strip().partition(":")
+        if len(sufijo) != 35:
+            continue
+        try:
+            registros.append(SUFIJO.pack(_sufijo_binario(sufijo), min(int(cnt or 0), 0xFFFFFFFF)))
+        except ValueError:
+            continue
+    registros.sort()
+    return b"".join(registros)
+
+
+def buscar_en_rango(rango: bytes, sufijo_hex: str) -> int:
+    #Búsqueda binaria del sufijo en los registros ordenados; devuelve el conteo (0 si no figura).
+    objetivo = _sufijo_binario(sufijo_hex)
+    lo, hi = 0, len(rango) // ANCHO_SUFIJO
+    while lo < hi:
+        mid = (lo + hi) // 2
+        pos = mid * ANCHO_SUFIJO
+        actual = rango[pos:pos + 18]
+        if actual < objetivo:
+            lo = mid + 1
+        elif actual > objetivo:
+            hi = mid
+        else:
+            return SUFIJO.unpack_from(rango, pos)[1]
+    return 0
+
+
+def _directorio_cache_usuario() -> str:
+    #~/.cache (o XDG_CACHE_HOME / LOCALAPPDATA en Windows), nunca el directorio de trabajo.
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "generador-seguro-contrasenas", "hibp")
+
+
+def directorio_cache_disco(valor: str = None):
+    """Directorio de la caché en disco según HIBP_CACHE_DISCO (o `valor`); None si está desactivada."""
+    valor = HIBP_CACHE_DISCO if valor is None else valor
+    if valor in ("", "0"):
+        return None
+    return _directorio_cache_usuario() if valor == "1" else valor
+
+
+class CacheRangos:
+    """
+    Caché de rangos HIBP por prefijo:
+    - memoria: LRU acotado a 'max_memoria' prefijos.
+    - disco (opcional, por defecto desactivado): un archivo por prefijo en 'directorio' (creado con permisos 0700),
+      acotado a 'max_disco' archivos; al superarlo se eliminan los de acceso más antiguo.
+    Las entradas con más de 'ttl' segundos se consideran vencidas en ambos niveles.
+    """
+
+    def __init__(self, directorio: str = None, ttl: float = HIBP_CACHE_TTL,
+                 max_memoria: int = 4096, max_disco: int = 65536):
+        self.directorio = directorio
+        self.ttl = ttl
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self._memoria = OrderedDict()  # prefijo -> (timestamp, rango)
+        self._lock = threading.Lock()
+        self._escrituras_disco = 0
+        self._directorio_listo = False
+        self.stats = {"hits_memoria": 0, "hits_disco": 0, "misses": 0, "vencidos": 0}
+
+    def _ruta(self, prefijo: str) -> str:
+        return os.path.join(self.directorio, prefijo + ".bin")
+
+    def obtener(self, prefijo: str):
+        #Devuelve el rango (bytes) si está en caché y vigente; None si no.
+        ahora = time.time()
+        with self._lock:
+            item = self._memoria.get(prefijo)
+            if item is not None:
+                if ahora - item[0] <= self.ttl:
+                    self._memoria.move_to_end(prefijo)
+                    self.stats["hits_memoria"] += 1
+                    return item[1]
+                del self._memoria[prefijo]
+                self.stats["vencidos"] += 1
+        if self.directorio:
+            ruta = self._ruta(prefijo)
+            try:
+                with open(ruta, "rb") as f:
+                    datos = f.read()
+                magic, ts = CABECERA_RANGO.unpack_from(datos, 0)
+            except (OSError, struct.error):
+                magic, ts = None, 0
+            if magic == MAGIC_RANGO:
+                if ahora - ts <= self.ttl:
+                    rango = datos[CABECERA_RANGO.size:]
+                    try:
+                        os.utime(ruta)  # marca de acceso para la expulsión LRU en disco
+                    except OSError:
+                        pass
+                    with self._lock:
+                        self._guardar_memoria(prefijo, ts, rango)
+                        self.stats["hits_disco"] += 1
+                    return rango
+                with self._lock:
+                    self.stats["vencidos"] += 1
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def _guardar_memoria(self, prefijo: str, ts: float, rango: bytes):
+        self._memoria[prefijo] = (ts, rango)
+        self._memoria.move_to_end(prefijo)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def guardar(self, prefijo: str, rango: bytes):
+        ts = time.time()
+        with self._lock:
+            self._guardar_memoria(prefijo, ts, rango)
+        if not self.directorio:
+            return
+        try:
+            if not self._directorio_listo:
+                os.makedirs(self.directorio, mode=0o700, exist_ok=True)
+                os.chmod(self.directorio, 0o700)
+                self._directorio_listo = True
+            ruta = self._ruta(prefijo)
+            tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                f.write(CABECERA_RANGO.pack(MAGIC_RANGO, ts))
+                f.write(rango)
+            os.replace(tmp, ruta)
+        except OSError:
+            return
+        with self._lock:
+            self._escrituras_disco += 1
+            revisar = self._escrituras_disco % 256 == 0
+        if revisar:
+            self._expulsar_disco()
+
+    def _expulsar_disco(self):
+        #Elimina los archivos de acceso más antiguo hasta quedar en max_disco.
+        try:
+            entradas = [e for e in os.scandir(self.directorio) if e.name.endswith(".bin")]
+        except OSError:
+            return
+        exceso = len(entradas) - self.max_disco
+        if exceso <= 0:
+            return
+        entradas.sort(key=lambda e: e.stat().st_mtime)
+        for e in entradas[:exceso]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+    def ratio_aciertos(self) -> float:
+        hits = self.stats["hits_memoria"] + self.stats["hits_disco"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+_cache = None
+
+
+def obtener_cache() -> CacheRangos:
+    #Caché compartida del proceso (se crea en el primer uso); en disco solo si HIBP_CACHE_DISCO lo pide.
+    global _cache
+    if _cache is None:
+        _cache = CacheRangos(directorio_cache_disco())
+    return _cache
+
+
+@medido("hibp.red")
+def descargar_rango(prefijo: str, timeout: float = 5, sesion=None):
+    """Descarga /range/{prefijo} y lo devuelve como registros ordenados; None si la respuesta no es 200."""
+    import requests  # solo se necesita en modo online
+    cliente = sesion or requests
+    resp = cliente.get(HIBP_API_URL + prefijo, timeout=timeout)
+    if resp.status_code != 200:
+        return None
+    return parsear_rango(resp.text)
+
+
+@medido("hibp.online")
+def contar_online(password: str, cache: CacheRangos = None, timeout: float = 5, sesion=None):
+    """
+    Conteo de brechas vía API por rangos, usando la caché por prefijo.
+    Devuelve None si no se pudo consultar (sin red, error HTTP, etc.).
+    """
+    h = hashlib.sha1(password.encode("utf-8")).hexdigest().upper()
+    prefijo, sufijo = h[:5], h[5:]
+    cache = cache if cache is not None else obtener_cache()
+    rango = cache.obtener(prefijo)
+    if rango is None:
+        try:
+            rango = descargar_rango(prefijo, timeout=timeout, sesion=sesion)
+        except Exception:
+            return None
+        if rango is None:
+            return None
+        cache.guardar(prefijo, rango)
+    return buscar_en_rango(rango, sufijo)
+
+
+class _ConexionHTTP:
+    """Conexión HTTP/1.1 keep-alive sobre asyncio (solo GET), reutilizada por un worker del lote."""
+
+    def __init__(self, url_base: str, timeout: float):
+        partes = urlsplit(url_base)
+        self.tls = partes.scheme == "https"
+        self.host = partes.hostname
+        self.port = partes.port or (443 if self.tls else 80)
+        self.ruta = partes.path
+        self.timeout = timeout
+        self._lector = None
+        self._escritor = None
+
+    async def _conectar(self):
+        import asyncio
+        self._lector, self._escritor = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.tls or None), self.timeout)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+        self._lector = self._escritor = None
+
+    async def get(self, prefijo: str):
+        #Devuelve (status, cuerpo). Reintenta una vez si la conexión reutilizada fue cerrada por el servidor.
+        import asyncio
+        for intento in range(2):
+            reutilizada = self._escritor is not None
+            if not reutilizada:
+                await self._conectar()
+            try:
+                return await asyncio.wait_for(self._get(prefijo), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.cerrar()
+                if not reutilizada or intento:
+                    raise
+            except BaseException:
+                self.cerrar()
+                raise
+
+    async def _get(self, prefijo: str):
+        peticion = (f"GET {self.ruta}{prefijo} HTTP/1.1\r\nHost: {self.host}\r\n"
+                    "User-Agent: generador-seguro-contrasenas\r\nConnection: keep-alive\r\n\r\n")
+        self._escritor.write(peticion.encode("ascii"))
+        await self._escritor.drain()
+        linea = await self._lector.readuntil(b"\r\n")
+        status = int(linea.split()[1])
+        cabeceras = {}
+        while True:
+            linea = await self._lector.readuntil(b"\r\n")
+            if linea == b"\r\n":
+                break
+            k, _, v = linea.decode("latin-1").partition(":")
+            cabeceras[k.strip().lower()] = v.strip()
+        if cabeceras.get("transfer-encoding", "").lower() == "chunked":
+            partes = []
+            while True:
+                tam = int((await self._lector.readuntil(b"\r\n")).split(b";")[0], 16)
+                if tam == 0:
+                    await self._lector.readuntil(b"\r\n")
+                    break
+                partes.append(await self._lector.readexactly(tam))
+                await self._lector.readexactly(2)
+            cuerpo = b"".join(partes)
+        elif "content-length" in cabeceras:
+            cuerpo = await self._lector.readexactly(int(cabeceras["content-length"]))
+        else:
+            cuerpo = await self._lector.read()
+            self.cerrar()
+        if cabeceras.get("connection", "").lower() == "close":
+            self.cerrar()
+        return status, cuerpo
+
+
+def _usa_proxy(url: str) -> bool:
+    #True si HTTPS_PROXY/HTTP_PROXY (o ALL_PROXY) aplican a la URL y NO_PROXY no la excluye.
+    from urllib.request import getproxies, proxy_bypass
+    partes = urlsplit(url)
+    proxies = getproxies()
+    if not (proxies.get(partes.scheme) or proxies.get("all")):
+        return False
+    return not proxy_bypass(partes.hostname or "")
+
+
+async def contar_lote_async(passwords, concurrencia: int = 8, cache: CacheRangos = None, timeout: float = 5) -> dict:
+    """
+    Chequea muchas contraseñas a la vez:
+      1. Agrupa por prefijo SHA-1 (cada prefijo se pide una sola vez aunque lo compartan varias contraseñas).
+      2. Resuelve desde la caché los prefijos ya conocidos (la caché en disco se lee en un hilo, fuera del loop).
+      3. Descarga el resto con a lo sumo 'concurrencia' conexiones keep-alive simultáneas.
+    Con un proxy configurado (HTTPS_PROXY/HTTP_PROXY, respetando NO_PROXY) las descargas van por requests,
+    que atraviesa el proxy, en 'concurrencia' hilos.
+    Devuelve {password: conteo} con None para las que no se pudieron consultar.
+    """
+    import asyncio
+    cache = cache if cache is not None else obtener_cache()
+    grupos = {}
+    for pw in passwords:
+        h = hashlib.sha1(pw.encode("utf-8")).hexdigest().upper()
+        grupos.setdefault(h[:5], []).append((pw, h[5:]))
+
+    def consultar_cache():
+        return {prefijo: cache.obtener(prefijo) for prefijo in grupos}
+
+    loop = asyncio.get_running_loop()
+    en_cache = await loop.run_in_executor(None, consultar_cache) if cache.directorio else consultar_cache()
+    rangos = {prefijo: rango for prefijo, rango in en_cache.items() if rango is not None}
+    pendientes = asyncio.Queue()
+    for prefijo in grupos:
+        if prefijo not in rangos:
+            pendientes.put_nowait(prefijo)
+
+    async def guardar(prefijo: str, rango: bytes):
+        rangos[prefijo] = rango
+        if cache.directorio:
+            await loop.run_in_executor(None, cache.guardar, prefijo, rango)
+        else:
+            cache.guardar(prefijo, rango)
+
+    async def worker():
+        conexion = _ConexionHTTP(HIBP_API_URL, timeout)
+        try:
+            while True:
+                try:
+                    prefijo = pendientes.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    status, cuerpo = await conexion.get(prefijo)
+                except Exception:
+                    continue
+                if status == 200:
+                    await guardar(prefijo, parsear_rango(cuerpo.decode("ascii", errors="ignore")))
+        finally:
+            conexion.cerrar()
+
+    async def worker_proxy():
+        import requests
+        with requests.Session() as sesion:
+            while True:
+                try:
+                    prefijo = pendientes.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    rango = await loop.run_in_executor(None, descargar_rango, prefijo, timeout, sesion)
+                except Exception:
+                    continue
+                if rango is not None:
+                    await guardar(prefijo, rango)
+
+    n_workers = min(max(1, concurrencia), pendientes.qsize())
+    if n_workers and _usa_proxy(HIBP_API_URL):
+        await asyncio.gather(*(worker_proxy() for _ in range(n_workers)))
+    elif n_workers:
+        await asyncio.gather(*(worker() for _ in range(n_workers)))
+
+    resultado = {}
+    for prefijo, items in grupos.items():
+        rango = rangos.get(prefijo)
+        for pw, sufijo in items:
+            resultado[pw] = None if rango is None else buscar_en_rango(rango, sufijo)
+    return resultado
+
+
+def contar_lote(passwords, concurrencia: int = 8, cache: CacheRangos = None, timeout: float = 5) -> dict:
+    #Versión síncrona de contar_lote_async (no usar dentro de un event loop en ejecución).
+    import asyncio
+    return asyncio.run(contar_lote_async(passwords, concurrencia=concurrencia, cache=cache, timeout=timeout))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Base offline de Pwned Passwords.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    comp = sub.add_parser("compilar", help="compila el volcado SHA-1 (HASH:CONTEO por línea)")
+    comp.add_argument("dump")
+    comp.add_argument("-o", "--salida", default=HIBP_OFFLINE_DB)
+    cons = sub.add_parser("consultar", help="consulta una contraseña (leída de stdin si no se indica)")
+    cons.add_argument("-d", "--db", default=HIBP_OFFLINE_DB)
+    cons.add_argument("password", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.comando == "compilar":
+        n = compilar_base(args.dump, args.salida)
+        print(f"Base {args.salida} compilada: {n} hashes.")
+        return 0
+    password = args.password if args.password is not None else sys.stdin.readline().rstrip("\n")
+    with BaseHIBPOffline(args.db) as base:
+        conteo = base.contar(password)
+    print(f"Comprometida ({conteo} apariciones)" if conteo else "no encontrada")
+    return 1 if conteo else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
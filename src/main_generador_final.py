@@ -5,24 +5,32 @@ chequear blacklist/HIBP, registrar eventos, gestionar renovaciones y CRUD simple
 """
 
 #Dependencias:
-from generator import generar_contrasena, generar_variantes, MAX_LONGITUD
-from validator import validar_parametros, evaluar_fuerza, es_demasiado_similar
+from generator import generar_contrasena, generar_variantes, generar_flujo, MAX_LONGITUD
+from validator import validar_parametros, evaluar_fuerza, evaluar_fuerza_lote, evaluar_entropia, ConsultaSimilitud, UMBRAL_SIMILITUD
 from ui import pedir_longitud, pedir_bool, mostrar_ayuda
-from storage import generar_key, guardar_contrasena_cifrada, leer_todas, eliminar_alias, KEY_FILE, existe_alias
+from storage import generar_key, guardar_contrasena_cifrada, eliminar_alias, KEY_FILE, existe_alias, buscar_candidatos_similares, listar_metadatos, vencimientos
+from storage import lote_boveda, leer_todas_perezoso, exportar_csv, version_boveda, FiltroSimilitud, _epoch
+from renovacion import renovar, DIAS_AVISO, CONCURRENCIA_RENOVACION, TAMANO_LOTE_RENOVACION
+from revision import revisar_boveda
 from audit import registrar_evento
-import storage
-import requests   # usado solo si se quiere chequear HIBP; puede fallar si no hay red
-import hashlib
+from blacklist import abrir_indice, BLACKLIST_INDEX
+from hibp import contar_offline, contar_online, HIBP_OFFLINE_DB
+from perfilado import medido, activar as activar_perfilado, exportar as exportar_perfilado, perfil_cprofile
 import os
 import sys
-import getpass
 import time
+import argparse
+import json
 from typing import Optional
 
 BLACKLIST_FILE = "blacklist.txt"
+# Modo HIBP: 'online' (API), 'offline' (base local compilada con hibp.py) o 'auto' (offline si existe la base)
+HIBP_MODO = os.environ.get('HIBP_MODO', 'auto')
 # Parámetros recomendados por política (12 para casos críticos)
 MIN_ALLOWED_LENGTH = 8
 MIN_RECOMMENDED_LENGTH = 12
+# Límite de variantes en el menú interactivo; para volúmenes grandes usar el modo flujo (--stream)
+MAX_VARIANTES = 100
 
 
 def limpiar_pantalla():
@@ -36,11 +44,31 @@ def limpiar_pantalla():
         pass
 
 
+_pyperclip_modulo = None
+#pyperclip cargado (o False si no está instalado)
+
+
+def _pyperclip():
+    """
+    pyperclip se importa recién al usar el portapapeles y queda guardado; si no está instalado también se recuerda,
+    porque un import fallido vuelve a recorrer sys.path en cada intento. Lanza ImportError si no está disponible.
+    """
+    global _pyperclip_modulo
+    if _pyperclip_modulo is None:
+        try:
+            import pyperclip
+            _pyperclip_modulo = pyperclip
+        except ImportError:
+            _pyperclip_modulo = False
+    if _pyperclip_modulo is False:
+        raise ImportError('pyperclip no disponible')
+    return _pyperclip_modulo
+
+
 def limpiar_portapapeles():
     """Intenta limpiar el portapapeles si pyperclip está disponible. Registra auditoria"""
     try:
-        import pyperclip
-        pyperclip.copy('')
+        _pyperclip().copy('')
         registrar_evento('clipboard_cleared')
         print('(Portapapeles limpiado)')
     except Exception:
@@ -62,8 +90,7 @@ def mostrar_contrasena_temporal(password: str, segundos: int = 10,
     try:
         if copiar_clipboard:
             try:
-                import pyperclip
-                pyperclip.copy(password)
+                _pyperclip().copy(password)
                 registrar_evento('copied_clipboard')
                 print('(Contraseña copiada al portapapeles)')
             except Exception:
@@ -85,8 +112,7 @@ def mostrar_contrasena_temporal(password: str, segundos: int = 10,
     finally:
         if copiar_clipboard and limpiar_clipboard_despues:
             try:
-                import pyperclip
-                pyperclip.copy('')
+                _pyperclip().copy('')
                 registrar_evento('clipboard_cleared')
             except Exception:
                 pass
@@ -97,9 +123,23 @@ def mostrar_contrasena_temporal(password: str, segundos: int = 10,
             pass
 
 
-def chequear_blacklist_local(password: str, blacklist_file: str = BLACKLIST_FILE) -> bool:
-    """Devuelve True si password aparece en blacklist local (archivo con una password por linea). Si no existe, devuelve false"""
-    if not os.path.exists(blacklist_file):
+@medido("blacklist")
+def chequear_blacklist_local(password: str, blacklist_file: str = BLACKLIST_FILE,
+                             index_file: str = BLACKLIST_INDEX) -> bool:
+    """
+    Devuelve True si password aparece en blacklist local (archivo con una password por linea). Si no existe, devuelve false.
+    Si hay un índice compilado (python blacklist.py compilar) al menos tan reciente como el archivo de texto,
+    se consulta por búsqueda binaria sobre mmap; si no, se recorre el archivo línea por línea.
+    """
+    txt_mtime = os.stat(blacklist_file).st_mtime_ns if os.path.exists(blacklist_file) else None
+    try:
+        indice = abrir_indice(index_file)
+    except Exception:
+        indice = None
+        registrar_evento('blacklist_index_unreadable', params={'index': index_file})
+    if indice is not None and (txt_mtime is None or indice.mtime >= txt_mtime):
+        return indice.contiene(password)
+    if txt_mtime is None:
         return False
     with open(blacklist_file, 'r', encoding='utf-8', errors='ignore') as f:
         for line in f:
@@ -108,31 +148,27 @@ def chequear_blacklist_local(password: str, blacklist_file: str = BLACKLIST_FILE
     return False
 
 
-def chequear_hibp(password: str) -> Optional[bool]:
+@medido("hibp")
+def chequear_hibp(password: str, modo: str = None) -> Optional[bool]:
     """
     Consulta HIBP usando k-anonymity:
       1. Calcula SHA-1 de la contraseña (hex en mayúsculas).
       2. Envía los primeros 5 caracteres a la API.
-      3. Busca el sufijo en la respuesta.
+      3. Busca el sufijo en la respuesta (los rangos descargados quedan en caché, ver hibp.CacheRangos).
+    En modo 'offline' (o 'auto' con hibp.db presente) busca en la base local sin salir a la red.
     Devuelve True si está comprometida, False si no, None si error.
     """
-    try:
-        h = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
-        prefix, suffix = h[:5], h[5:]
-        url = f"https://api.pwnedpasswords.com/range/{prefix}"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code != 200:
+    modo = modo or HIBP_MODO
+    if modo in ('offline', 'auto'):
+        conteo = contar_offline(password, HIBP_OFFLINE_DB)
+        if conteo is not None:
+            return conteo > 0
+        if modo == 'offline':
             return None
-        hashes = resp.text.splitlines()
-        for line in hashes:
-            if ':' not in line:
-                continue
-            hsh, count = line.split(':')
-            if hsh.strip() == suffix:
-                return True
-        return False
-    except Exception:
+    conteo = contar_online(password)
+    if conteo is None:
         return None
+    return conteo > 0
 
 def confirmar_longitud_recomendada(longitud: int) -> bool: #Si longitud < recomendada, pide confirmación.
     if longitud >= MIN_RECOMMENDED_LENGTH:
@@ -141,35 +177,47 @@ def confirmar_longitud_recomendada(longitud: int) -> bool: #Si longitud < recome
     return pedir_bool("Desea continuar con esta longitud menos a la recomendada?")
 
 
-def puede_guardar_password(password: str) -> bool:
+@medido("validacion.reutilizacion")
+def motivo_rechazo_guardado(password: str, filtro: FiltroSimilitud = None) -> Optional[str]:
     """
-    Comprueba antes de guardar:
-      1. Lee todas las contraseñas existentes.
-      2. Si coincide exactamente, bloquea y registra.
-      3. Si es demasiado similar, bloquea y registra.
-    Retorna True si puede guardarse.
+    Comprueba antes de guardar, sin imprimir (lo usan el menú y los subcomandos):
+      1. Obtiene de la bóveda solo los candidatos que pueden ser similares (índice de similitud en storage;
+         en lotes, un FiltroSimilitud ya cargado).
+      2. Si coincide exactamente devuelve 'reuse_exact'; si es demasiado similar, 'reuse_similar'.
+    Retorna None si puede guardarse. Registra el evento del bloqueo.
     """
     try:
-        items = leer_todas()
+        if filtro is not None:
+            candidatos = filtro.candidatos(password)
+        else:
+            candidatos = buscar_candidatos_similares(password, UMBRAL_SIMILITUD)
     except Exception:
         registrar_evento('error_read_store_before_save')
-        return True
-    for it in items:
+        return None
+    consulta = ConsultaSimilitud(password, UMBRAL_SIMILITUD)
+    for stored in candidatos:
         try:
-            stored = it.get('password_plain') or it.get('password') or ''
             if not stored:
                 continue
             if password == stored:
-                print('Advertencia: la contraseña coincide exactamente con una ya almacenada.')
                 registrar_evento('save_blocked_reuse_exact')
-                return False
-            if es_demasiado_similar(password, stored):
-                print('Advertencia: la contraseña es demasiado similar a una almacenada previamente.')
+                return 'reuse_exact'
+            if consulta.demasiado_similar(stored):
                 registrar_evento('save_blocked_reuse_similar')
-                return False
+                return 'reuse_similar'
         except Exception:
             continue
-    return True
+    return None
+
+
+def puede_guardar_password(password: str) -> bool:
+    #Versión interactiva de motivo_rechazo_guardado: avisa por pantalla. Retorna True si puede guardarse.
+    motivo = motivo_rechazo_guardado(password)
+    if motivo == 'reuse_exact':
+        print('Advertencia: la contraseña coincide exactamente con una ya almacenada.')
+    elif motivo == 'reuse_similar':
+        print('Advertencia: la contraseña es demasiado similar a una almacenada previamente.')
+    return motivo is None
 
 
 def pedir_alias_unico() -> str: #Itera hasta alias no vacío y no existente, o preguntar para sobrescribir
@@ -194,37 +242,37 @@ def pedir_alias_unico() -> str: #Itera hasta alias no vacío y no existente, o p
 def procesar_renovaciones():
     """
     Gestiona renovaciones:
-      1. Carga todas las entradas.
-      2. Separa en próximas (<=7 días) y vencidas.
+      1. Consulta el índice de vencimientos (próximos 7 días y vencidas) sin descifrar la bóveda.
+      2. Separa en próximas y vencidas.
       3. Muestra listados y ofrece regenerar para vencidas.
-      4. Guarda nuevas contraseñas y registra eventos.
+      4. Regenera con los parámetros guardados en meta de cada entrada y guarda por lotes (ver renovacion.py).
     """
-    from datetime import datetime, timezone
+    from datetime import datetime
     try:
-        items = storage.leer_todas()
+        items = vencimientos(DIAS_AVISO)
     except Exception as e:
         print('No se pudo leer el almacén:', e)
         registrar_evento('error_read_store_for_renew', params={'error': str(e)})
         return
-    ahora = datetime.utcnow()
+    ahora = _epoch(datetime.utcnow())
     proximas = []
     vencidas = []
     for it in items:
-        try:
-            exp = datetime.fromisoformat(it.get('expires_at').replace('Z', ''))
-        except Exception:
+        expira = _epoch(it.get('expires_at'))  # acepta '...Z', sin zona o con desplazamiento
+        if expira is None:
+            registrar_evento('renewal_invalid_date', params={'alias': it.get('alias')})
             continue
-        dias = (exp - ahora).days
+        dias = (expira - ahora) // 86400
         if dias < 0:
             vencidas.append(it)
-        elif dias <= 7:
+        else:
             proximas.append((it, dias))
     if not proximas and not vencidas:
         print('No hay renovaciones pendientes.')
         registrar_evento('renewals_none')
         return
     if proximas:
-        print('Próximas a vencer (<=7 días):')
+        print(f'Próximas a vencer (<={DIAS_AVISO} días):')
         for it, d in proximas:
             print(f"- {it.get('alias')} expira en {d} días")
             registrar_evento('renewal_upcoming', params={'alias': it.get('alias'), 'days': d})
@@ -234,21 +282,11 @@ def procesar_renovaciones():
             print(f"- {it.get('alias')} expiró el {it.get('expires_at')}")
             registrar_evento('renewal_overdue', params={'alias': it.get('alias')})
         if pedir_bool('Desea generar nuevas contraseñas para las entradas vencidas y reemplazarlas (automatizar)?'):
-            for it in vencidas:
-                alias = it.get('alias')
-                params = it.get('meta', {})
-                longitud = params.get('length', max(MIN_RECOMMENDED_LENGTH, 16))
-                uso_may = params.get('upper', True)
-                uso_min = params.get('lower', True)
-                uso_dig = params.get('digits', True)
-                uso_sim = params.get('symbols', True)
-                nueva = generar_contrasena(longitud, uso_may, uso_min, uso_dig, uso_sim)
-                try:
-                    guardar_contrasena_cifrada(nueva, alias, meta={'replaced_for_expiry': True})
-                    registrar_evento('auto_replaced_expired', params={'alias': alias})
-                    print(f'Alias {alias} reemplazado.')
-                except Exception as e:
-                    registrar_evento('error_auto_replace', params={'alias': alias, 'error': str(e)})
+            resultado = renovar(vencidas, verificar=lambda pw: chequear_blacklist_local(pw) or chequear_hibp(pw) is True)
+            for alias in resultado['renovadas']:
+                print(f'Alias {alias} reemplazado.')
+            for alias, error in resultado['errores'].items():
+                print(f'Alias {alias} no se pudo reemplazar: {error}')
 
 
 def main_menu():
@@ -296,7 +334,10 @@ def main_menu():
                 print('Evaluación:', reporte['recomendacion'], f"(score {reporte['score']}/100)")
                 if reporte['issues'].get('repeticiones_largas') or reporte['issues'].get('secuencias'):
                     print('Issues detectados:', reporte['issues'])
-                registrar_evento('evaluacion', params={'score': reporte['score'], 'issues': reporte['issues']})
+                estimacion = evaluar_entropia(contr)
+                print(f"Entropía estimada (patrones): {estimacion['bits']:.1f} bits (nivel {estimacion['nivel']}/4)")
+                registrar_evento('evaluacion', params={'score': reporte['score'], 'issues': reporte['issues'],
+                                                       'bits': round(estimacion['bits'], 1)})
 
                 if chequear_blacklist_local(contr):
                     print('ADVERTENCIA: la contraseña figura en la lista negra local.')
@@ -317,7 +358,10 @@ def main_menu():
                         print('Por seguridad no se guardará esta contraseña. Genere otra.')
                     else:
                         try:
-                            guardar_contrasena_cifrada(contr, alias)
+                            #Los parámetros quedan en meta para que las renovaciones regeneren con los mismos
+                            guardar_contrasena_cifrada(contr, alias, meta={'length': longitud, 'upper': uso_may,
+                                                                           'lower': uso_min, 'digits': uso_dig,
+                                                                           'symbols': uso_sim})
                             print('Guardada (cifrada).')
                             registrar_evento('saved_encrypted', params={'alias': alias})
                         except Exception as e:
@@ -326,8 +370,7 @@ def main_menu():
                 else:
                     if pedir_bool('Desea copiar al portapapeles?'):
                         try:
-                            import pyperclip
-                            pyperclip.copy(contr)
+                            _pyperclip().copy(contr)
                             print('Copiada al portapapeles.')
                             registrar_evento('copied_clipboard')
                             if pedir_bool('Desea limpiar el portapapeles ahora (recomendado)?'):
@@ -349,9 +392,13 @@ def main_menu():
                 uso_dig = pedir_bool('Incluir números?')
                 uso_sim = pedir_bool('Incluir símbolos especiales?')
                 n = int(input('¿Cuántas variantes desea generar? (ej 3): ').strip() or '3')
+                if n < 1 or n > MAX_VARIANTES:
+                    print(f'Cantidad fuera de rango (1-{MAX_VARIANTES}). Para volúmenes grandes use --stream.')
+                    registrar_evento('variants_rejected_count', params={'count': n})
+                    continue
                 variantes = generar_variantes(longitud, uso_may, uso_min, uso_dig, uso_sim, n=n)
-                for i, v in enumerate(variantes, 1):
-                    print(f"{i}) {v}  -> score: {evaluar_fuerza(v)['score']}")
+                for i, (v, rep) in enumerate(zip(variantes, evaluar_fuerza_lote(variantes)), 1):
+                    print(f"{i}) {v}  -> score: {rep['score']}")
                 registrar_evento('variants_generated', params={'count': n})
             except Exception as e:
                 print('Error:', e)
@@ -359,11 +406,11 @@ def main_menu():
 
         elif opt == '3': #Ver contraseñas cifradas almacenadas
             try:
-                items = leer_todas()
+                items = listar_metadatos()
                 if not items:
                     print('No hay contraseñas almacenadas.')
                 else:
-                    print('Contraseñas (descifradas) - alias / created / expires:')
+                    print('Contraseñas (cifradas) - alias / created / expires:')
                     for it in items:
                         print(f"- {it.get('alias')} | created: {it.get('created_at')} | expires: {it.get('expires_at')}")
                 registrar_evento('view_store', params={'count': len(items)})
@@ -395,5 +442,398 @@ def main_menu():
             print('Opción inválida.')
 
 
+def escribir_flujo(salida, flujo, tamano_bloque: int = 1024) -> int:
+    """
+    Escribe las contraseñas de "flujo" en "salida" (una por línea) en bloques de "tamano_bloque".
+    El siguiente bloque solo se genera cuando la escritura anterior terminó, así que un consumidor lento
+    (pipe lleno) frena la producción en lugar de acumular memoria. Devuelve la cantidad escrita.
+    """
+    escritas = 0
+    bloque = []
+    for pw in flujo:
+        bloque.append(pw)
+        if len(bloque) >= tamano_bloque:
+            salida.write("\n".join(bloque) + "\n")
+            escritas += len(bloque)
+            bloque = []
+    if bloque:
+        salida.write("\n".join(bloque) + "\n")
+        escritas += len(bloque)
+    salida.flush()
+    return escritas
+
+
+def modo_flujo(argv) -> int:
+    """Modo no interactivo: genera contraseñas sin menú y las envía a stdout o a un archivo."""
+    parser = argparse.ArgumentParser(description='Genera contraseñas en flujo (una por línea).')
+    parser.add_argument('--stream', action='store_true', help='activa el modo flujo no interactivo')
+    parser.add_argument('-n', '--cantidad', type=int, default=None, help='cantidad a generar (por defecto infinito)')
+    parser.add_argument('-l', '--longitud', type=int, default=16)
+    parser.add_argument('-o', '--salida', default='-', help="archivo destino o '-' para stdout")
+    parser.add_argument('--bloque', type=int, default=1024, help='contraseñas por bloque de escritura')
+    parser.add_argument('--sin-mayusculas', action='store_true')
+    parser.add_argument('--sin-minusculas', action='store_true')
+    parser.add_argument('--sin-digitos', action='store_true')
+    parser.add_argument('--sin-simbolos', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.longitud < MIN_ALLOWED_LENGTH or args.longitud > MAX_LONGITUD:
+        parser.error(f'longitud fuera de rango ({MIN_ALLOWED_LENGTH}-{MAX_LONGITUD})')
+    uso_may, uso_min = not args.sin_mayusculas, not args.sin_minusculas
+    uso_dig, uso_sim = not args.sin_digitos, not args.sin_simbolos
+    try:
+        validar_parametros(args.longitud, uso_may, uso_min, uso_dig, uso_sim)
+    except ValueError as e:
+        parser.error(str(e))
+
+    flujo = generar_flujo(args.longitud, uso_may, uso_min, uso_dig, uso_sim,
+                          total=args.cantidad, tamano_lote=args.bloque)
+    try:
+        if args.salida == '-':
+            escritas = escribir_flujo(sys.stdout, flujo, args.bloque)
+        else:
+            with open(args.salida, 'w', encoding='utf-8') as f:
+                escritas = escribir_flujo(f, flujo, args.bloque)
+    except (BrokenPipeError, KeyboardInterrupt):
+        # El consumidor cerró el pipe (ej. "| head"): se termina sin traza
+        registrar_evento('stream_interrupted')
+        return 0
+    registrar_evento('stream_generated', params={'count': escritas, 'len': args.longitud})
+    return 0
+
+
+# --- Subcomandos no interactivos (generate, check, store, list, renew, export, audit-vault) ---
+# Pensados para scripts y pipelines de aprovisionamiento: sin menú, sin mostrar/esperar, salida JSON o NDJSON
+# (un objeto por línea, en streaming) y entrada por lotes desde stdin.
+SUBCOMANDOS = ('generate', 'check', 'store', 'list', 'renew', 'export', 'audit-vault')
+TAMANO_LOTE_CLI = 1000
+
+
+def _emitir(registros, formato: str, salida=None) -> int:
+    #Escribe registros (dicts) como NDJSON a medida que llegan, o como un único arreglo JSON al final.
+    salida = salida or sys.stdout
+    if formato == 'json':
+        registros = list(registros)
+        json.dump(registros, salida, ensure_ascii=False)
+        salida.write('\n')
+        salida.flush()
+        return len(registros)
+    n = 0
+    bloque = []
+    for r in registros:
+        bloque.append(json.dumps(r, ensure_ascii=False))
+        n += 1
+        if len(bloque) >= TAMANO_LOTE_CLI:
+            salida.write('\n'.join(bloque) + '\n')
+            bloque = []
+    if bloque:
+        salida.write('\n'.join(bloque) + '\n')
+    salida.flush()
+    return n
+
+
+def _lineas_entrada(valores, entrada=None):
+    #Valores de la línea de comandos o, si no hay, una línea de stdin por valor (se ignoran las vacías).
+    if valores:
+        yield from valores
+        return
+    for linea in entrada or sys.stdin:
+        linea = linea.rstrip('\r\n')
+        if linea:
+            yield linea
+
+
+def _en_lotes(iterable, tamano: int = TAMANO_LOTE_CLI):
+    bloque = []
+    for x in iterable:
+        bloque.append(x)
+        if len(bloque) >= tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def _parametros_generacion(args, parser):
+    if args.longitud < MIN_ALLOWED_LENGTH or args.longitud > MAX_LONGITUD:
+        parser.error(f'longitud fuera de rango ({MIN_ALLOWED_LENGTH}-{MAX_LONGITUD})')
+    params = (args.longitud, not args.sin_mayusculas, not args.sin_minusculas,
+              not args.sin_digitos, not args.sin_simbolos)
+    try:
+        validar_parametros(*params)
+    except ValueError as e:
+        parser.error(str(e))
+    return params
+
+
+def _chequear_hibp_lote(passwords, modo: str = None) -> dict:
+    """
+    {password: True/False/None} para un lote. Offline (o auto con hibp.db) consulta la base local;
+    online usa el cliente asíncrono por lotes (rangos deduplicados, conexiones keep-alive).
+    """
+    modo = modo or HIBP_MODO
+    if modo in ('offline', 'auto') and os.path.exists(HIBP_OFFLINE_DB):
+        return {pw: chequear_hibp(pw, 'offline') for pw in passwords}
+    if modo == 'offline':
+        return {pw: None for pw in passwords}
+    from hibp import contar_lote
+    return {pw: (None if c is None else c > 0) for pw, c in contar_lote(passwords).items()}
+
+
+def _cmd_generate(args, parser) -> int:
+    params = _parametros_generacion(args, parser)
+    if args.formato == 'texto' and not args.evaluar:
+        escritas = escribir_flujo(sys.stdout, generar_flujo(*params, total=args.cantidad), TAMANO_LOTE_CLI)
+        registrar_evento('cli_generated', params={'count': escritas, 'len': args.longitud})
+        return 0
+
+    def registros():
+        for lote in _en_lotes(generar_flujo(*params, total=args.cantidad)):
+            if not args.evaluar:
+                for pw in lote:
+                    yield {'password': pw}
+                continue
+            for pw, rep in zip(lote, evaluar_fuerza_lote(lote)):
+                yield {'password': pw, 'score': rep['score'], 'recomendacion': rep['recomendacion']}
+
+    if args.formato == 'texto':
+        for r in registros():
+            sys.stdout.write(f"{r['password']}\t{r['score']}\n")
+        sys.stdout.flush()
+        n = args.cantidad
+    else:
+        n = _emitir(registros(), args.formato)
+    registrar_evento('cli_generated', params={'count': n, 'len': args.longitud})
+    return 0
+
+
+def _cmd_check(args, parser) -> int:
+    encontradas = 0
+
+    def registros():
+        nonlocal encontradas
+        indice = 0
+        for lote in _en_lotes(_lineas_entrada(args.passwords)):
+            hibp = {} if args.sin_hibp else _chequear_hibp_lote(lote, args.hibp_modo)
+            for pw, rep in zip(lote, evaluar_fuerza_lote(lote)):
+                r = {'indice': indice, 'score': rep['score'], 'recomendacion': rep['recomendacion'],
+                     'issues': rep['issues']}
+                if args.mostrar:
+                    r['password'] = pw
+                if args.entropia:
+                    est = evaluar_entropia(pw)
+                    r['bits'] = round(est['bits'], 1)
+                    r['nivel'] = est['nivel']
+                if not args.sin_blacklist:
+                    r['blacklist'] = chequear_blacklist_local(pw)
+                if not args.sin_hibp:
+                    r['hibp'] = hibp.get(pw)
+                if r.get('blacklist') or r.get('hibp'):
+                    encontradas += 1
+                indice += 1
+                yield r
+
+    n = _emitir(registros(), args.formato)
+    registrar_evento('cli_checked', params={'count': n, 'hits': encontradas})
+    return 1 if encontradas else 0
+
+
+def _cmd_store(args, parser) -> int:
+    """
+    Entrada NDJSON: {"alias": ..., "password": ..., "meta": {...}} por línea.
+    Con --generar, un alias por línea: se genera la contraseña con -l/--sin-* y los parámetros quedan en meta.
+    Cada lote de TAMANO_LOTE_CLI entradas se guarda en un único commit.
+    """
+    params = _parametros_generacion(args, parser) if args.generar else None
+    if not os.path.exists(KEY_FILE):
+        generar_key()
+        registrar_evento('key_generated', params={'action': 'generate_key'})
+    rechazadas = 0
+
+    def entradas():
+        for linea in _lineas_entrada(None):
+            if params is not None:
+                meta = {'length': params[0], 'upper': params[1], 'lower': params[2],
+                        'digits': params[3], 'symbols': params[4]}
+                yield {'alias': linea.strip(), 'password': generar_contrasena(*params), 'meta': meta}
+                continue
+            try:
+                e = json.loads(linea)
+                yield {'alias': str(e['alias']).strip(), 'password': str(e['password']), 'meta': e.get('meta') or {}}
+            except (ValueError, KeyError, TypeError):
+                yield {'alias': None, 'error': 'entrada_invalida'}
+
+    def registros():
+        nonlocal rechazadas
+        filtro, version = None, None
+        for lote in _en_lotes(entradas()):
+            resultados = []
+            with lote_boveda():
+                # El filtro (bóveda descifrada una vez) se conserva entre lotes mientras nadie más escriba en ella
+                if not args.forzar and (filtro is None or version_boveda() != version):
+                    filtro, version = FiltroSimilitud(UMBRAL_SIMILITUD), version_boveda()
+                for e in lote:
+                    motivo = e.get('error')
+                    if motivo is None and not e['alias']:
+                        motivo = 'alias_vacio'
+                    if motivo is None and not args.sobrescribir and existe_alias(e['alias']):
+                        motivo = 'alias_existente'
+                    if motivo is None and filtro is not None:
+                        motivo = motivo_rechazo_guardado(e['password'], filtro)
+                    if motivo is None:
+                        guardar_contrasena_cifrada(e['password'], e['alias'], meta=e['meta'])
+                        if filtro is not None:
+                            filtro.agregar(e['password'], e['alias'])
+                    r = {'alias': e['alias'], 'guardada': motivo is None}
+                    if motivo is not None:
+                        r['motivo'] = motivo
+                        rechazadas += 1
+                    elif args.mostrar and params is not None:
+                        r['password'] = e['password']
+                    resultados.append(r)
+            yield from resultados
+
+    n = _emitir(registros(), args.formato)
+    registrar_evento('cli_stored', params={'count': n - rechazadas, 'rejected': rechazadas})
+    return 1 if rechazadas else 0
+
+
+def _cmd_list(args, parser) -> int:
+    items = vencimientos(args.vencen) if args.vencen is not None else listar_metadatos()
+    n = _emitir(items, args.formato)
+    registrar_evento('view_store', params={'count': n})
+    return 0
+
+
+def _cmd_renew(args, parser) -> int:
+    pendientes = vencimientos(args.dias)
+    verificar = None if args.sin_verificar else (lambda pw: chequear_blacklist_local(pw) or chequear_hibp(pw) is True)
+    resultado = renovar(pendientes, verificar=verificar, concurrencia=args.concurrencia, tamano_lote=args.lote)
+    registros = [{'alias': a, 'renovada': True} for a in resultado['renovadas']]
+    registros += [{'alias': a, 'renovada': False, 'error': err} for a, err in resultado['errores'].items()]
+    _emitir(registros, args.formato)
+    return 1 if resultado['errores'] else 0
+
+
+def _cmd_export(args, parser) -> int:
+    if args.salida:
+        n = exportar_csv(args.salida, trabajadores=args.trabajadores)
+        _emitir([{'exportadas': n, 'archivo': args.salida}], args.formato)
+    else:
+        n = _emitir(({'alias': e['alias'], 'password': e['password_plain'], 'created_at': e['created_at'],
+                      'expires_at': e['expires_at'], 'meta': e['meta']} for e in leer_todas_perezoso()),
+                    args.formato)
+    registrar_evento('cli_exported', params={'count': n})
+    return 0
+
+
+def _cmd_audit_vault(args, parser) -> int:
+    informe = revisar_boveda(args.trabajadores, similitud=not args.sin_similitud,
+                             blacklist_file=None if args.sin_blacklist else BLACKLIST_FILE,
+                             hibp_modo=None if args.sin_hibp else (args.hibp_modo or HIBP_MODO))
+    if args.formato == 'json':
+        json.dump(informe, sys.stdout, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        # Un hallazgo por línea y al final el resumen (todo el informe salvo los hallazgos)
+        resumen = {k: v for k, v in informe.items() if k != 'hallazgos'}
+        _emitir(informe['hallazgos'] + [{'resumen': resumen}], 'ndjson')
+    return 1 if informe['hallazgos'] else 0
+
+
+def construir_parser_comandos() -> argparse.ArgumentParser:
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument('--formato', choices=('ndjson', 'json'), default='ndjson',
+                       help='ndjson: un objeto por línea (por defecto); json: un arreglo')
+    generacion = argparse.ArgumentParser(add_help=False)
+    generacion.add_argument('-l', '--longitud', type=int, default=16)
+    generacion.add_argument('--sin-mayusculas', action='store_true')
+    generacion.add_argument('--sin-minusculas', action='store_true')
+    generacion.add_argument('--sin-digitos', action='store_true')
+    generacion.add_argument('--sin-simbolos', action='store_true')
+    perfil = argparse.ArgumentParser(add_help=False)
+    perfil.add_argument('--perfil', default=None, metavar='RUTA',
+                        help="mide tiempos por tramo y exporta el resumen: '-' (texto en stderr), .json o .prom")
+    perfil.add_argument('--cprofile', default=None, metavar='RUTA',
+                        help='perfila el comando con cProfile y guarda las estadísticas (python -m pstats RUTA)')
+
+    parser = argparse.ArgumentParser(prog='main_generador_final.py',
+                                     description='Generador seguro de contraseñas (modo no interactivo).')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    gen = sub.add_parser('generate', parents=[generacion, perfil], help='genera contraseñas')
+    gen.add_argument('-n', '--cantidad', type=int, default=1)
+    gen.add_argument('--evaluar', action='store_true', help='incluye score y recomendación')
+    gen.add_argument('--formato', choices=('ndjson', 'json', 'texto'), default='ndjson')
+    gen.set_defaults(funcion=_cmd_generate)
+
+    chk = sub.add_parser('check', parents=[comun, perfil], help='evalúa contraseñas (argumentos o una por línea en stdin)')
+    chk.add_argument('passwords', nargs='*')
+    chk.add_argument('--entropia', action='store_true', help='incluye la estimación por patrones')
+    chk.add_argument('--sin-blacklist', action='store_true')
+    chk.add_argument('--sin-hibp', action='store_true')
+    chk.add_argument('--hibp-modo', choices=('online', 'offline', 'auto'), default=None)
+    chk.add_argument('--mostrar', action='store_true', help='repite la contraseña en la salida')
+    chk.set_defaults(funcion=_cmd_check)
+
+    sto = sub.add_parser('store', parents=[comun, generacion, perfil],
+                         help='guarda entradas NDJSON {alias, password, meta} leídas de stdin')
+    sto.add_argument('--generar', action='store_true', help='stdin trae solo alias; genera las contraseñas')
+    sto.add_argument('--sobrescribir', action='store_true', help='reemplaza alias existentes')
+    sto.add_argument('--forzar', action='store_true', help='no bloquear por reutilización/similitud')
+    sto.add_argument('--mostrar', action='store_true', help='incluye las contraseñas generadas en la salida')
+    sto.set_defaults(funcion=_cmd_store)
+
+    lis = sub.add_parser('list', parents=[comun, perfil], help='lista metadatos de la bóveda (sin descifrar)')
+    lis.add_argument('--vencen', type=float, default=None, metavar='DIAS',
+                     help='solo lo que vence dentro de DIAS días (incluye vencidas)')
+    lis.set_defaults(funcion=_cmd_list)
+
+    ren = sub.add_parser('renew', parents=[comun, perfil], help='renueva las entradas vencidas')
+    ren.add_argument('--dias', type=float, default=0, help='renovar también lo que vence dentro de N días')
+    ren.add_argument('-c', '--concurrencia', type=int, default=CONCURRENCIA_RENOVACION)
+    ren.add_argument('--lote', type=int, default=TAMANO_LOTE_RENOVACION)
+    ren.add_argument('--sin-verificar', action='store_true')
+    ren.set_defaults(funcion=_cmd_renew)
+
+    exp = sub.add_parser('export', parents=[comun, perfil], help='exporta la bóveda descifrada (NDJSON o CSV con -o)')
+    exp.add_argument('-o', '--salida', default=None, help='archivo CSV (permisos 600)')
+    exp.add_argument('-j', '--trabajadores', type=int, default=None)
+    exp.set_defaults(funcion=_cmd_export)
+
+    aud = sub.add_parser('audit-vault', parents=[comun, perfil],
+                         help='audita la bóveda: débiles, reutilizadas, parecidas y comprometidas')
+    aud.add_argument('-j', '--trabajadores', type=int, default=None, help='procesos (por defecto, uno por núcleo)')
+    aud.add_argument('--sin-similitud', action='store_true', help='no buscar contraseñas parecidas')
+    aud.add_argument('--sin-blacklist', action='store_true')
+    aud.add_argument('--sin-hibp', action='store_true')
+    aud.add_argument('--hibp-modo', choices=('online', 'offline', 'auto'), default=None)
+    aud.set_defaults(funcion=_cmd_audit_vault)
+    return parser
+
+
+def modo_comandos(argv) -> int:
+    """Punto de entrada de los subcomandos. Código de salida 1 si hubo hallazgos/rechazos/errores por entrada."""
+    parser = construir_parser_comandos()
+    args = parser.parse_args(argv)
+    if args.perfil:
+        activar_perfilado()
+    try:
+        if args.cprofile:
+            with perfil_cprofile(args.cprofile):
+                return args.funcion(args, parser)
+        return args.funcion(args, parser)
+    except (BrokenPipeError, KeyboardInterrupt):
+        registrar_evento('cli_interrupted', params={'command': args.comando})
+        return 0
+    finally:
+        if args.perfil:
+            exportar_perfilado(args.perfil)
+
+
 if __name__ == '__main__':
+    if '--stream' in sys.argv[1:] and sys.argv[1] not in SUBCOMANDOS:
+        sys.exit(modo_flujo(sys.argv[1:]))
+    if len(sys.argv) > 1:
+        # Subcomandos; cualquier otro argumento lo rechaza su parser con la lista de subcomandos válidos
+        sys.exit(modo_comandos(sys.argv[1:]))
     main_menu()
\ No newline at end of file
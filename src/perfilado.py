@@ -0,0 +1,219 @@
+"""
+Módulo perfilado: medición opcional de tiempos por tramos en los caminos calientes (generación, validación,
+lista negra, HIBP, cifrado/descifrado y E/S de la bóveda) con histogramas en memoria.
+Desactivado por defecto: un tramo desactivado cuesta una consulta a una variable global.
+Se activa con la variable de entorno PERFILADO=1 (el resumen se escribe al terminar el proceso en PERFILADO_SALIDA,
+o en stderr si no está definida), con activar(), o con --perfil en los subcomandos de main_generador_final.py.
+
+Exportar: texto (tabla), JSON (.json) o formato de texto de Prometheus (.prom, para el textfile collector).
+cProfile: perfil_cprofile(ruta) envuelve un comando completo y guarda las estadísticas para pstats/snakeviz.
+Los tiempos medidos en procesos hijos (ProcessPoolExecutor) no se agregan al proceso principal.
+"""
+#Dependencias
+import atexit
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ACTIVO = os.environ.get("PERFILADO", "") not in ("", "0")
+PERFILADO_SALIDA = os.environ.get("PERFILADO_SALIDA")
+LIMITES = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+#Límites superiores (segundos) de las cubetas de los histogramas, de 1 µs a 10 s; más allá va a +Inf
+PREFIJO_PROMETHEUS = "generador_tramo_segundos"
+CUANTILES = (0.5, 0.9, 0.99)
+
+_candado = threading.Lock()
+_histogramas = {}
+_exportado = False
+
+
+class _Histograma:
+    __slots__ = ("cuenta", "suma", "minimo", "maximo", "cubetas")
+
+    def __init__(self):
+        self.cuenta = 0
+        self.suma = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+        self.cubetas = [0] * (len(LIMITES) + 1)
+
+    def cuantil(self, q: float) -> float:
+        #Estimación por cubetas: límite superior de la cubeta que contiene el cuantil (acotado por el máximo).
+        objetivo = q * self.cuenta
+        acumulado = 0
+        for i, n in enumerate(self.cubetas):
+            acumulado += n
+            if acumulado >= objetivo and n:
+                return min(LIMITES[i], self.maximo) if i < len(LIMITES) else self.maximo
+        return self.maximo
+
+
+def registrar(nombre: str, segundos: float):
+    with _candado:
+        h = _histogramas.get(nombre)
+        if h is None:
+            h = _histogramas[nombre] = _Histograma()
+        h.cuenta += 1
+        h.suma += segundos
+        if segundos < h.minimo:
+            h.minimo = segundos
+        if segundos > h.maximo:
+            h.maximo = segundos
+        h.cubetas[bisect.bisect_left(LIMITES, segundos)] += 1
+
+
+class _Tramo:
+    __slots__ = ("nombre", "_t0")
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nombre, time.perf_counter() - self._t0)
+
+
+class _TramoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NULO = _TramoNulo()
+
+
+def tramo(nombre: str):
+    #Contexto que mide el bloque: `with tramo("cifrado.descifrar"): ...`. Desactivado devuelve un contexto vacío.
+    return _Tramo(nombre) if ACTIVO else _NULO
+
+
+def medido(nombre: str):
+    #Decorador: mide cada llamada a la función bajo `nombre` (también si termina con excepción).
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not ACTIVO:
+                return funcion(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registrar(nombre, time.perf_counter() - t0)
+        return envoltura
+    return decorador
+
+
+def activar(valor: bool = True):
+    global ACTIVO
+    ACTIVO = valor
+
+
+def reiniciar():
+    with _candado:
+        _histogramas.clear()
+
+
+def resumen() -> dict:
+    #{nombre: {cuenta, total_s, media_s, min_s, max_s, p50_s, p90_s, p99_s}} ordenado por tiempo total.
+    with _candado:
+        copia = sorted(_histogramas.items(), key=lambda kv: -kv[1].suma)
+        salida = {}
+        for nombre, h in copia:
+            r = {"cuenta": h.cuenta, "total_s": h.suma, "media_s": h.suma / h.cuenta, "min_s": h.minimo,
+                 "max_s": h.maximo}
+            for q in CUANTILES:
+                r[f"p{int(q * 100)}_s"] = h.cuantil(q)
+            salida[nombre] = r
+    return salida
+
+
+def texto() -> str:
+    filas = resumen()
+    if not filas:
+        return "Perfilado: sin tramos registrados (¿PERFILADO=1?).\n"
+    lineas = [f"{'tramo':34} {'llamadas':>9} {'total ms':>11} {'media µs':>11} {'p50 µs':>10} {'p99 µs':>10} "
+              f"{'máx µs':>11}"]
+    for nombre, r in filas.items():
+        lineas.append(f"{nombre:34} {r['cuenta']:>9,} {r['total_s'] * 1e3:>11,.2f} {r['media_s'] * 1e6:>11,.1f} "
+                      f"{r['p50_s'] * 1e6:>10,.1f} {r['p99_s'] * 1e6:>10,.1f} {r['max_s'] * 1e6:>11,.1f}")
+    return "\n".join(lineas) + "\n"
+
+
+def prometheus() -> str:
+    #Formato de texto de exposición de Prometheus: un histograma con la etiqueta tramo="...".
+    lineas = [f"# HELP {PREFIJO_PROMETHEUS} Duracion de los tramos instrumentados del generador.",
+              f"# TYPE {PREFIJO_PROMETHEUS} histogram"]
+    with _candado:
+        for nombre, h in sorted(_histogramas.items()):
+            etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+            acumulado = 0
+            for limite, n in zip(LIMITES + (float("inf"),), h.cubetas):
+                acumulado += n
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                lineas.append(f'{PREFIJO_PROMETHEUS}_bucket{{tramo="{etiqueta}",le="{le}"}} {acumulado}')
+            lineas.append(f'{PREFIJO_PROMETHEUS}_sum{{tramo="{etiqueta}"}} {h.suma!r}')
+            lineas.append(f'{PREFIJO_PROMETHEUS}_count{{tramo="{etiqueta}"}} {h.cuenta}')
+    return "\n".join(lineas) + "\n"
+
+
+def exportar(ruta: str = None):
+    """
+    Escribe el resumen según la extensión de `ruta`: .prom (Prometheus), .json (JSON), otra (texto).
+    Sin ruta o con '-' escribe el texto en stderr. El archivo se reemplaza de forma atómica
+    (el textfile collector nunca lee uno a medio escribir).
+    """
+    global _exportado
+    _exportado = True
+    if not ruta or ruta == "-":
+        sys.stderr.write(texto())
+        return
+    if ruta.endswith(".prom"):
+        contenido = prometheus()
+    elif ruta.endswith(".json"):
+        contenido = json.dumps({"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "pid": os.getpid(),
+                                "tramos": resumen()}, indent=2)
+    else:
+        contenido = texto()
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    os.replace(tmp, ruta)
+
+
+@contextmanager
+def perfil_cprofile(ruta: str, lineas: int = 25):
+    """
+    Perfila con cProfile todo lo que corre dentro del bloque y guarda las estadísticas en `ruta`
+    (abrir con python -m pstats ruta). Imprime en stderr las `lineas` funciones con más tiempo acumulado.
+    """
+    import cProfile
+    import pstats
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+        perfil.dump_stats(ruta)
+        if lineas:
+            pstats.Stats(perfil, stream=sys.stderr).sort_stats("cumulative").print_stats(lineas)
+
+
+def _exportar_al_salir():
+    if ACTIVO and _histogramas and not _exportado:
+        exportar(PERFILADO_SALIDA)
+
+
+atexit.register(_exportar_al_salir)
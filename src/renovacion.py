@@ -0,0 +1,156 @@
+"""
+Módulo renovacion: motor de renovación de contraseñas vencidas.
+Consulta el índice de vencimientos de la bóveda (storage.vencimientos) sin descifrar nada, regenera cada
+contraseña con los parámetros guardados en su `meta` y guarda los reemplazos por lotes (un commit por lote).
+
+Listar:   python renovacion.py listar --dias 7
+Demonio:  python renovacion.py demonio --intervalo 3600 --concurrencia 4 [--una-vez]
+"""
+#Dependencias
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from generator import generar_contrasena, MAX_LONGITUD
+from storage import vencimientos, proximo_vencimiento, guardar_contrasena_cifrada, lote_boveda
+from audit import registrar_evento
+
+LONGITUD_POR_DEFECTO = 16
+DIAS_AVISO = 7
+INTERVALO_DEMONIO = 3600
+#Segundos máximos entre dos revisiones del demonio (antes si el próximo vencimiento llega primero)
+TAMANO_LOTE_RENOVACION = 50
+CONCURRENCIA_RENOVACION = 4
+#Generaciones/verificaciones simultáneas; la verificación puede salir a la red (HIBP), por eso se usan hilos
+MAX_INTENTOS = 5
+
+
+def parametros_de_meta(meta: dict) -> dict:
+    #Parámetros de generación guardados en meta (length/upper/lower/digits/symbols), con los valores por defecto.
+    meta = meta or {}
+    longitud = meta.get("length", LONGITUD_POR_DEFECTO)
+    if not isinstance(longitud, int) or not 1 <= longitud <= MAX_LONGITUD:
+        longitud = LONGITUD_POR_DEFECTO
+    return {"length": longitud, "upper": meta.get("upper", True), "lower": meta.get("lower", True),
+            "digits": meta.get("digits", True), "symbols": meta.get("symbols", True)}
+
+
+def generar_reemplazo(meta: dict, verificar=None) -> str:
+    """
+    Genera una contraseña con los mismos parámetros que la original.
+    `verificar(password)` devuelve True si debe descartarse (lista negra, brecha); se reintenta hasta MAX_INTENTOS.
+    """
+    p = parametros_de_meta(meta)
+    for _ in range(MAX_INTENTOS):
+        nueva = generar_contrasena(p["length"], p["upper"], p["lower"], p["digits"], p["symbols"])
+        if verificar is None or not verificar(nueva):
+            return nueva
+    raise ValueError("No se pudo generar un reemplazo que pase las verificaciones.")
+
+
+def _meta_renovada(meta: dict) -> dict:
+    #Conserva la meta original (parámetros incluidos) y agrega los datos de la renovación.
+    nueva = dict(meta or {})
+    nueva.update(parametros_de_meta(meta))
+    nueva["replaced_for_expiry"] = True
+    nueva["renewals"] = int(nueva.get("renewals", 0)) + 1
+    nueva["renewed_at"] = datetime.utcnow().isoformat() + "Z"
+    return nueva
+
+
+def renovar(entradas: list, verificar=None, concurrencia: int = CONCURRENCIA_RENOVACION,
+            tamano_lote: int = TAMANO_LOTE_RENOVACION) -> dict:
+    """
+    Regenera y guarda reemplazos para `entradas` ({alias, meta, ...}, p. ej. el resultado de vencimientos()).
+    Cada lote se genera con hasta `concurrencia` hilos y se guarda en un único commit (lote_boveda).
+    Devuelve {'renovadas': [...alias], 'errores': {alias: mensaje}}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    renovadas, errores = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrencia)) as ex:
+        for inicio in range(0, len(entradas), tamano_lote):
+            lote = entradas[inicio:inicio + tamano_lote]
+            futuros = [ex.submit(generar_reemplazo, e.get("meta"), verificar) for e in lote]
+            generadas = []
+            for e, fut in zip(lote, futuros):
+                try:
+                    generadas.append((e, fut.result()))
+                except Exception as exc:
+                    errores[e.get("alias")] = str(exc)
+                    registrar_evento('error_auto_replace', params={'alias': e.get("alias"), 'error': str(exc)})
+            with lote_boveda():
+                for e, nueva in generadas:
+                    guardar_contrasena_cifrada(nueva, e.get("alias"), meta=_meta_renovada(e.get("meta")))
+            for e, _ in generadas:
+                renovadas.append(e.get("alias"))
+                registrar_evento('auto_replaced_expired', params={'alias': e.get("alias")})
+    return {"renovadas": renovadas, "errores": errores}
+
+
+def verificacion_local(password: str) -> bool:
+    #Verificación sin red para el demonio: índice de lista negra y base HIBP offline, si existen.
+    from blacklist import abrir_indice
+    from hibp import contar_offline
+    indice = abrir_indice()
+    if indice is not None and indice.contiene(password):
+        return True
+    return bool(contar_offline(password))
+
+
+def ejecutar_demonio(intervalo: float = INTERVALO_DEMONIO, dias: float = 0, verificar=verificacion_local,
+                     concurrencia: int = CONCURRENCIA_RENOVACION, tamano_lote: int = TAMANO_LOTE_RENOVACION,
+                     una_vez: bool = False, dormir=time.sleep) -> int:
+    """
+    Bucle no interactivo: renueva lo que vence dentro de `dias` días y duerme hasta el próximo vencimiento
+    (como máximo `intervalo` segundos). Con una_vez=True hace una sola pasada. Devuelve el total renovado.
+    """
+    total = 0
+    while True:
+        pendientes = vencimientos(dias)
+        if pendientes:
+            resultado = renovar(pendientes, verificar, concurrencia, tamano_lote)
+            total += len(resultado["renovadas"])
+            registrar_evento('renewal_daemon_pass', params={'renewed': len(resultado["renovadas"]),
+                                                            'errors': len(resultado["errores"])})
+        if una_vez:
+            return total
+        espera = intervalo
+        proximo = proximo_vencimiento()
+        if proximo is not None:
+            #Si lo más próximo ya venció (reemplazo fallido) se reintenta en el siguiente intervalo
+            restante = proximo - dias * 86400 - (datetime.utcnow() - datetime(1970, 1, 1)).total_seconds()
+            if restante > 0:
+                espera = min(intervalo, max(1.0, restante))
+        dormir(espera)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Renovación de contraseñas vencidas de la bóveda.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    lis = sub.add_parser("listar", help="lista las entradas que vencen en los próximos días (sin descifrar)")
+    lis.add_argument("--dias", type=float, default=DIAS_AVISO)
+    dem = sub.add_parser("demonio", help="renueva automáticamente las entradas vencidas")
+    dem.add_argument("--dias", type=float, default=0, help="renovar también lo que vence dentro de N días")
+    dem.add_argument("--intervalo", type=float, default=INTERVALO_DEMONIO)
+    dem.add_argument("-c", "--concurrencia", type=int, default=CONCURRENCIA_RENOVACION)
+    dem.add_argument("--lote", type=int, default=TAMANO_LOTE_RENOVACION)
+    dem.add_argument("--una-vez", action="store_true", help="una sola pasada y salir")
+    dem.add_argument("--sin-verificar", action="store_true", help="no consultar lista negra ni base HIBP offline")
+    args = parser.parse_args(argv)
+
+    if args.comando == "listar":
+        for e in vencimientos(args.dias):
+            print(f"{e['alias']}\t{e['expires_at']}")
+        return 0
+    try:
+        total = ejecutar_demonio(args.intervalo, args.dias, None if args.sin_verificar else verificacion_local,
+                                 args.concurrencia, args.lote, args.una_vez)
+    except KeyboardInterrupt:
+        return 0
+    print(f"{total} entradas renovadas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Módulo revision: auditoría de la bóveda completa (contraseñas débiles, reutilizadas, parecidas o comprometidas).
+  1. Descifra por bloques en un pool de procesos y en cada bloque puntúa la fuerza y calcula el SHA-1.
+  2. Duplicadas exactas: agrupa por SHA-1 (cada contraseña distinta se analiza una sola vez en lo que sigue).
+  3. Parecidas (mismo criterio que es_demasiado_similar): en lugar de comparar todos los pares, un índice invertido
+     de bigramas con filtrado por prefijos propone candidatas y solo esas se verifican. Sin falsos negativos:
+     si 2M/T > umbral, los M caracteres emparejados forman a lo sumo T-2M+1 bloques, así que las dos comparten al
+     menos o = 3M-T-1 bigramas; dos conjuntos que comparten o elementos tienen en común al menos l de sus primeros
+     |A|-o+l (ordenados del más raro al más frecuente), con l = COINCIDENCIAS_PREFIJO.
+  4. Brechas: lista negra local y HIBP con una consulta por contraseña distinta (online, una por prefijo SHA-1).
+
+Revisar:  python revision.py -j 8 --hibp-modo offline -o informe.json
+"""
+#Dependencias
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from validator import evaluar_fuerza_lote, ConsultaSimilitud, UMBRAL_SIMILITUD
+from storage import mapear_descifradas
+from audit import registrar_evento
+
+TAMANO_BLOQUE_SIMILITUD = 2000
+#Contraseñas consultadas por tarea en la búsqueda de parecidas (cada una se compara con las anteriores)
+COINCIDENCIAS_PREFIJO = 2
+#Bigramas de prefijo en común que se exigen a una candidata (prefijos de |A|-o+2 en lugar de |A|-o+1)
+_EPSILON = 1e-9
+
+_contexto = {}
+#En cada proceso de la búsqueda de parecidas: contraseñas, prefijos, índice invertido (ver _preparar_similitud)
+
+
+def _analizar_bloque(planos: list) -> list:
+    #Se ejecuta en el pool, junto al descifrado: (texto plano, SHA-1 hex, score, recomendación) o None.
+    validos = [p for p in planos if p is not None]
+    fuerzas = iter(evaluar_fuerza_lote(validos))
+    salida = []
+    for p in planos:
+        if p is None:
+            salida.append(None)
+            continue
+        f = next(fuerzas)
+        salida.append((p, hashlib.sha1(p.encode("utf-8")).hexdigest().upper(), f["score"], f["recomendacion"]))
+    return salida
+
+
+def _solapamiento_minimo(largo: int, umbral: float):
+    """
+    Bigramas (como multiconjunto) que una contraseña de `largo` caracteres comparte como mínimo con cualquier otra
+    con la que supere el umbral: min sobre los largos posibles de la otra de 3M-T-1, con M el mínimo de caracteres
+    emparejados para que 2M/T > umbral. None si ningún largo puede superarlo. Redondeos siempre hacia abajo.
+    """
+    minimo = None
+    for otro in range(1, int(largo * 2 / umbral) + 2):
+        total = largo + otro
+        if 2 * min(largo, otro) < umbral * total - _EPSILON:
+            continue
+        emparejados = int(umbral * total / 2 - _EPSILON) + 1
+        if emparejados > min(largo, otro):
+            continue
+        o = 3 * emparejados - total - 1
+        minimo = o if minimo is None else min(minimo, o)
+    return minimo
+
+
+def _bigramas(password: str) -> list:
+    #Bigramas con su número de aparición (("ab", 0), ("ab", 1), ...) para tratarlos como multiconjunto.
+    vistos = {}
+    salida = []
+    for i in range(len(password) - 1):
+        g = password[i:i + 2]
+        k = vistos.get(g, 0)
+        vistos[g] = k + 1
+        salida.append((g, k))
+    return salida
+
+
+def _bigramas_requeridos(total: int, umbral: float) -> int:
+    #Bigramas en común necesarios (3M-T-1) entre dos contraseñas cuyos largos suman `total`.
+    return 3 * (int(umbral * total / 2 - _EPSILON) + 1) - total - 1
+
+
+def _preparar_similitud(passwords: list, umbral: float):
+    """
+    Deja en _contexto, por contraseña, sus bigramas como enteros (el rango en el orden global de frecuencia, así
+    el prefijo son los menores), su prefijo y cuántos bigramas de prefijo debe compartir con una candidata
+    (COINCIDENCIAS_PREFIJO, o menos si su o es menor), y el índice invertido bigrama de prefijo -> contraseñas
+    (en orden creciente). Las que no tienen garantía de bigramas en común (muy cortas) van a `sin_prefijo`
+    y se comparan contra todas.
+    """
+    bigramas = [_bigramas(pw) for pw in passwords]
+    frecuencia = Counter(t for b in bigramas for t in b)
+    rango = {t: r for r, t in enumerate(sorted(frecuencia, key=lambda t: (frecuencia[t], t)))}
+    del frecuencia
+    minimos = {}
+    conjuntos, prefijos, exigidos, sin_prefijo, indice = [], [], [], [], {}
+    for i, (pw, b) in enumerate(zip(passwords, bigramas)):
+        ids = sorted(rango[t] for t in b)
+        conjuntos.append(frozenset(ids))
+        if len(pw) not in minimos:
+            minimos[len(pw)] = _solapamiento_minimo(len(pw), umbral)
+        o = minimos[len(pw)]
+        exigidos.append(min(COINCIDENCIAS_PREFIJO, o) if o else 0)
+        if o is None:
+            prefijos.append(())
+            continue
+        if o <= 0:
+            prefijos.append(())
+            sin_prefijo.append(i)
+            continue
+        prefijo = ids[:len(ids) - o + exigidos[-1]]
+        prefijos.append(prefijo)
+        for t in prefijo:
+            indice.setdefault(t, []).append(i)
+    largo_maximo = max(map(len, passwords), default=0)
+    requeridos = [_bigramas_requeridos(total, umbral) for total in range(2 * largo_maximo + 1)]
+    _contexto.update(passwords=passwords, umbral=umbral, conjuntos=conjuntos, prefijos=prefijos, exigidos=exigidos,
+                     indice=indice, sin_prefijo=sin_prefijo, es_sin_prefijo=set(sin_prefijo), requeridos=requeridos)
+
+
+def _similares_rango(inicio: int, fin: int) -> list:
+    """
+    Pares (j, i) con j < i, inicio <= i < fin, que superan el umbral. Requiere _preparar_similitud en el proceso.
+    Las coincidencias de prefijo se cuentan en C (Counter sobre tramos del índice); las candidatas pasan después
+    por las cotas baratas (largos y bigramas en común, una intersección de conjuntos) y solo las que las superan
+    se comparan con ConsultaSimilitud.
+    """
+    c = _contexto
+    passwords, umbral, conjuntos, prefijos, exigidos, indice = (c["passwords"], c["umbral"], c["conjuntos"],
+                                                                c["prefijos"], c["exigidos"], c["indice"])
+    sin_prefijo, es_sin_prefijo, requeridos = c["sin_prefijo"], c["es_sin_prefijo"], c["requeridos"]
+    pares = []
+    for i in range(inicio, fin):
+        if i in es_sin_prefijo:
+            candidatas = range(i)
+        else:
+            coincidencias = Counter()
+            for t in prefijos[i]:
+                lista = indice[t]
+                coincidencias.update(lista[:bisect.bisect_left(lista, i)])
+            propio = exigidos[i]
+            # Alcanza con el mínimo exigido de los dos: k >= min(propio, exigidos[j])
+            candidatas = [j for j, k in coincidencias.items() if k >= propio or k >= exigidos[j]]
+            candidatas += sin_prefijo[:bisect.bisect_left(sin_prefijo, i)]
+        if not candidatas:
+            continue
+        a = passwords[i]
+        la = len(a)
+        propios = conjuntos[i]
+        consulta = None
+        for j in candidatas:
+            b = passwords[j]
+            lb = len(b)
+            if 2 * min(la, lb) < umbral * (la + lb) - _EPSILON:
+                continue
+            if len(propios & conjuntos[j]) < requeridos[la + lb]:
+                continue
+            if consulta is None:
+                consulta = ConsultaSimilitud(a, umbral)
+            if consulta.demasiado_similar(b):
+                pares.append((j, i))
+    return pares
+
+
+def pares_similares(passwords: list, umbral: float = UMBRAL_SIMILITUD, trabajadores: int = None) -> list:
+    """
+    Pares (j, i), j < i, de contraseñas distintas de `passwords` con es_demasiado_similar (al umbral dado),
+    sin comparar todos los pares. Con varios trabajadores cada proceso arma el índice y revisa un tramo.
+    """
+    n = len(passwords)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    if trabajadores <= 1 or n <= TAMANO_BLOQUE_SIMILITUD:
+        _preparar_similitud(passwords, umbral)
+        try:
+            return _similares_rango(0, n)
+        finally:
+            _contexto.clear()
+    from concurrent.futures import ProcessPoolExecutor
+    # Las últimas contraseñas tienen más anteriores con quienes compararse: tareas chicas para repartir parejo
+    rangos = [(i, min(n, i + TAMANO_BLOQUE_SIMILITUD)) for i in range(0, n, TAMANO_BLOQUE_SIMILITUD)]
+    with ProcessPoolExecutor(max_workers=min(trabajadores, len(rangos)), initializer=_preparar_similitud,
+                             initargs=(passwords, umbral)) as ex:
+        futuros = [ex.submit(_similares_rango, inicio, fin) for inicio, fin in reversed(rangos)]
+        return sorted(p for f in futuros for p in f.result())
+
+
+def _en_lista_negra(passwords: list, blacklist_file: str, index_file: str = None) -> set:
+    #Índice compilado si está al día con el archivo de texto (como chequear_blacklist_local); si no, un set del texto.
+    from blacklist import abrir_indice, BLACKLIST_INDEX
+    index_file = index_file or BLACKLIST_INDEX
+    txt_mtime = os.stat(blacklist_file).st_mtime_ns if os.path.exists(blacklist_file) else None
+    try:
+        indice = abrir_indice(index_file)
+    except Exception:
+        indice = None
+    if indice is not None and (txt_mtime is None or indice.mtime >= txt_mtime):
+        return {pw for pw in passwords if indice.contiene(pw)}
+    if txt_mtime is None:
+        return set()
+    with open(blacklist_file, "r", encoding="utf-8", errors="ignore") as f:
+        lista = {line.strip() for line in f}
+    return {pw for pw in passwords if pw.strip() in lista}
+
+
+def _brechas(por_hash: dict, modo: str) -> tuple:
+    """
+    Conteos HIBP {sha1 hex: conteo o None} de las contraseñas distintas ({sha1 hex: texto plano}).
+    offline/auto con base local: búsqueda por hash en hibp.db; online: contar_lote (un pedido por prefijo).
+    """
+    from hibp import abrir_base, HIBP_OFFLINE_DB
+    info = {"modo": modo, "consultadas": len(por_hash), "prefijos": len({h[:5] for h in por_hash})}
+    if modo in ("offline", "auto"):
+        try:
+            base = abrir_base(HIBP_OFFLINE_DB)
+        except (OSError, ValueError):
+            base = None
+        if base is not None:
+            info["modo"] = "offline"
+            return {h: base.contar_hash(bytes.fromhex(h)) for h in por_hash}, info
+        if modo == "offline":
+            info["sin_base"] = True
+            return {h: None for h in por_hash}, info
+    from hibp import contar_lote
+    info["modo"] = "online"
+    conteos = contar_lote(list(por_hash.values()))
+    return {h: conteos.get(pw) for h, pw in por_hash.items()}, info
+
+
+def revisar_boveda(trabajadores: int = None, modo: str = "procesos", similitud: bool = True,
+                   umbral: float = UMBRAL_SIMILITUD, blacklist_file: str = None, hibp_modo: str = None) -> dict:
+    """
+    Revisa todas las entradas de la bóveda y devuelve un informe:
+      entradas, no_descifradas, fuerza {Débil, Media, Fuerte}, duplicadas (grupos de alias), pares_similares,
+      lista_negra, hibp {modo, consultadas, prefijos, comprometidas, sin_respuesta}, tiempos_s y
+      hallazgos: [{alias, score, recomendacion, motivos, duplicada_con, similar_a, hibp}] solo de las entradas
+      con algún motivo (debil, duplicada, similar, lista_negra, hibp).
+    blacklist_file / hibp_modo en None omiten esa verificación.
+    """
+    tiempos = {}
+    t0 = time.perf_counter()
+    filas = mapear_descifradas(_analizar_bloque, trabajadores, modo)
+    tiempos["descifrado_y_fuerza"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    no_descifradas = [alias for alias, r in filas if r is None]
+    filas = [(alias, r) for alias, r in filas if r is not None]
+    grupos = {}
+    for alias, (_, h, _, _) in filas:
+        grupos.setdefault(h, []).append(alias)
+    por_hash = {}
+    for _, (pw, h, _, _) in filas:
+        por_hash.setdefault(h, pw)
+    duplicadas = [aliases for aliases in grupos.values() if len(aliases) > 1]
+    tiempos["duplicadas"] = time.perf_counter() - t0
+
+    similares_de = {}
+    n_pares = None
+    if similitud:
+        t0 = time.perf_counter()
+        hashes = list(por_hash)
+        pares = pares_similares([por_hash[h] for h in hashes], umbral, trabajadores)
+        for j, i in pares:
+            similares_de.setdefault(hashes[i], set()).add(hashes[j])
+            similares_de.setdefault(hashes[j], set()).add(hashes[i])
+        n_pares = len(pares)
+        tiempos["similares"] = time.perf_counter() - t0
+
+    negra = set()
+    if blacklist_file:
+        t0 = time.perf_counter()
+        negra = _en_lista_negra(list(por_hash.values()), blacklist_file)
+        tiempos["lista_negra"] = time.perf_counter() - t0
+
+    conteos, info_hibp = {}, None
+    if hibp_modo:
+        t0 = time.perf_counter()
+        conteos, info_hibp = _brechas(por_hash, hibp_modo)
+        info_hibp["sin_respuesta"] = sum(1 for c in conteos.values() if c is None)
+        tiempos["hibp"] = time.perf_counter() - t0
+
+    fuerza = {"Débil": 0, "Media": 0, "Fuerte": 0}
+    hallazgos = []
+    comprometidas = 0
+    for alias, (pw, h, score, recomendacion) in filas:
+        fuerza[recomendacion] += 1
+        motivos = []
+        r = {"alias": alias, "score": score, "recomendacion": recomendacion}
+        if recomendacion == "Débil":
+            motivos.append("debil")
+        if len(grupos[h]) > 1:
+            motivos.append("duplicada")
+            r["duplicada_con"] = [a for a in grupos[h] if a != alias]
+        if h in similares_de:
+            motivos.append("similar")
+            r["similar_a"] = [a for otro in sorted(similares_de[h]) for a in grupos[otro]]
+        if pw in negra:
+            motivos.append("lista_negra")
+        if conteos.get(h):
+            motivos.append("hibp")
+            r["hibp"] = conteos[h]
+            comprometidas += 1
+        if motivos:
+            r["motivos"] = motivos
+            hallazgos.append(r)
+    if info_hibp is not None:
+        info_hibp["comprometidas"] = comprometidas
+
+    informe = {"entradas": len(filas) + len(no_descifradas), "no_descifradas": no_descifradas, "fuerza": fuerza,
+               "duplicadas": duplicadas, "pares_similares": n_pares,
+               "lista_negra": sum(1 for _, (pw, _, _, _) in filas if pw in negra) if blacklist_file else None,
+               "hibp": info_hibp, "tiempos_s": {k: round(v, 3) for k, v in tiempos.items()},
+               "hallazgos": hallazgos}
+    registrar_evento('vault_audited', params={'entries': informe["entradas"], 'findings': len(hallazgos),
+                                              'duplicate_groups': len(duplicadas), 'similar_pairs': n_pares,
+                                              'breached': comprometidas})
+    return informe
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Auditoría de la bóveda: débiles, reutilizadas, parecidas y comprometidas.")
+    parser.add_argument("-j", "--trabajadores", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--sin-similitud", action="store_true", help="no buscar contraseñas parecidas")
+    parser.add_argument("--blacklist", default="blacklist.txt", help="lista negra local ('' para omitir)")
+    parser.add_argument("--hibp-modo", choices=("online", "offline", "auto", "no"), default="auto")
+    parser.add_argument("-o", "--salida", default=None, help="archivo JSON del informe (por defecto stdout)")
+    args = parser.parse_args(argv)
+    informe = revisar_boveda(args.trabajadores, similitud=not args.sin_similitud, blacklist_file=args.blacklist,
+                             hibp_modo=None if args.hibp_modo == "no" else args.hibp_modo)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(informe, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    return 1 if informe["hallazgos"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,567 @@
+"""
+Módulo servicio: servicio HTTP/JSON local (asyncio, sin dependencias extra) sobre generator, validator, storage y hibp.
+Pensado para servicios que hoy llaman a main_generador_final.py como subproceso: el proceso queda vivo, así que
+el intérprete, cryptography, la clave, el cifrador, el índice de lista negra, la base HIBP y la bóveda descifrada
+para el filtro de similitud se cargan una sola vez.
+
+Toda operación sobre la bóveda corre en un único hilo ("hilo de bóveda"): las lecturas se encolan en él y las
+escrituras pendientes se agrupan en un solo commit (lote_boveda) mientras el anterior se confirma.
+
+Iniciar:  python servicio.py --host 127.0.0.1 --puerto 8765
+
+Autenticación: toda ruta salvo /salud exige "Authorization: Bearer <token>". El token se toma de SERVICIO_TOKEN o
+del archivo servicio.token junto a key.bin (se genera al primer inicio con permisos 0600). --sin-autenticacion
+solo se acepta escuchando en loopback.
+
+    GET    /salud
+    GET    /perfil             tiempos por tramo (con PERFILADO=1 o --perfil; ver perfilado.py)
+    POST   /generar            {"longitud": 16, "cantidad": 1, "simbolos": true, "evaluar": false}
+    POST   /evaluar            {"password": "..."} o {"passwords": [...], "entropia": true}
+    POST   /brechas            {"passwords": [...], "modo": "offline"}  (lista negra local + HIBP)
+    GET    /boveda             metadatos, sin descifrar (?vencen=7 para las que vencen en 7 días)
+    GET    /boveda/<alias>     entrada descifrada
+    POST   /boveda             {"alias": "...", "password": "..."} (sin password la genera), "sobrescribir", "forzar"
+    DELETE /boveda/<alias>
+"""
+#Dependencias
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from generator import generar_lote, MAX_LONGITUD
+from validator import validar_parametros, evaluar_fuerza_lote, evaluar_entropia, UMBRAL_SIMILITUD
+from storage import (generar_key, guardar_contrasena_cifrada, eliminar_alias, existe_alias, listar_metadatos,
+                     vencimientos, obtener_entrada, lote_boveda, version_boveda, FiltroSimilitud, KEY_FILE)
+from audit import registrar_evento
+from perfilado import resumen as resumen_perfilado, activar as activar_perfilado
+from hibp import contar_lote_async, HIBP_OFFLINE_DB
+from main_generador_final import (chequear_blacklist_local, chequear_hibp, motivo_rechazo_guardado,
+                                  HIBP_MODO, MIN_ALLOWED_LENGTH)
+
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8765
+MAX_CUERPO = 1024 * 1024
+#Bytes máximos del cuerpo de una petición
+MAX_ITEMS_PETICION = 1000
+#Contraseñas máximas por petición (generar/evaluar/brechas); lo que corre en el event loop queda acotado
+TAMANO_LOTE_SERVICIO = 256
+#Escrituras máximas agrupadas en un commit de la bóveda
+TIEMPO_INACTIVIDAD = 60
+#Segundos que se mantiene abierta una conexión keep-alive sin peticiones
+TIEMPO_CABECERAS = 10
+#Segundos para recibir las cabeceras completas una vez llegada la línea de petición
+MAX_CABECERAS = 100
+#Cabeceras máximas por petición (cada línea además está acotada por el límite de 64 KiB del StreamReader)
+TOKEN_ARCHIVO = "servicio.token"
+#Token de acceso, en el mismo directorio que key.bin
+RUTAS_PUBLICAS = {("GET", "/salud")}
+#Rutas que no exigen el token (chequeos de vida de orquestadores)
+
+RAZONES = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 408: "Request Timeout", 409: "Conflict", 413: "Payload Too Large",
+           431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, status: int, mensaje: str):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class BovedaServicio:
+    """
+    Dueño único de la bóveda dentro del servicio. Todas las llamadas a storage corren en un hilo dedicado
+    (la conexión sqlite es de un solo hilo y así tampoco hay dos escritores del mismo proceso compitiendo por el
+    bloqueo). escribir() encola la operación; el bucle toma todo lo pendiente (hasta TAMANO_LOTE_SERVICIO) y lo
+    confirma en un único lote_boveda(). El FiltroSimilitud se conserva entre lotes mientras version_boveda()
+    indique que nadie más modificó la bóveda.
+    """
+
+    def __init__(self, tamano_lote: int = TAMANO_LOTE_SERVICIO):
+        self.tamano_lote = tamano_lote
+        self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="boveda")
+        self._cola = asyncio.Queue()
+        self._tarea = None
+        self._filtro = None
+        self._version = None
+        self.lotes = 0
+        self.escrituras = 0
+
+    def iniciar(self):
+        self._tarea = asyncio.get_running_loop().create_task(self._bucle())
+
+    async def leer(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._hilo, funcion, *args)
+
+    async def escribir(self, tipo: str, datos):
+        futuro = asyncio.get_running_loop().create_future()
+        self._cola.put_nowait((tipo, datos, futuro))
+        return await futuro
+
+    def pendientes(self) -> int:
+        return self._cola.qsize()
+
+    async def _bucle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            while len(lote) < self.tamano_lote and not self._cola.empty():
+                lote.append(self._cola.get_nowait())
+            try:
+                resultados = await loop.run_in_executor(self._hilo, self._aplicar, [(t, d) for t, d, _ in lote])
+            except Exception as exc:
+                resultados = [exc] * len(lote)
+            for (_, _, futuro), r in zip(lote, resultados):
+                if futuro.done():
+                    continue
+                if isinstance(r, Exception):
+                    futuro.set_exception(r)
+                else:
+                    futuro.set_result(r)
+
+    async def cerrar(self):
+        #Espera a que se confirme lo encolado y detiene el hilo de bóveda.
+        while not self._cola.empty():
+            await asyncio.sleep(0.01)
+        if self._tarea is not None:
+            self._tarea.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self._hilo.shutdown)
+
+    # --- Lo que sigue corre en el hilo de bóveda ---
+
+    def _aplicar(self, operaciones: list) -> list:
+        resultados = []
+        try:
+            with lote_boveda():
+                version = version_boveda()
+                if version != self._version:
+                    self._filtro = None
+                    self._version = version
+                for tipo, datos in operaciones:
+                    try:
+                        resultados.append(self._guardar(datos) if tipo == "guardar" else self._eliminar(datos))
+                    except Exception as exc:
+                        resultados.append(exc)
+        except BaseException:
+            # Nada se confirmó: el filtro puede tener entradas que no llegaron a la bóveda
+            self._filtro = None
+            raise
+        guardadas = sum(1 for r in resultados if isinstance(r, dict) and r.get("guardada"))
+        self.lotes += 1
+        self.escrituras += len(operaciones)
+        registrar_evento('service_vault_batch', params={'ops': len(operaciones), 'saved': guardadas})
+        return resultados
+
+    def _filtro_vigente(self) -> FiltroSimilitud:
+        if self._filtro is None:
+            self._filtro = FiltroSimilitud(UMBRAL_SIMILITUD)
+        return self._filtro
+
+    def _guardar(self, datos: dict) -> dict:
+        alias, password = datos["alias"], datos["password"]
+        motivo = None
+        if not datos.get("sobrescribir") and existe_alias(alias):
+            motivo = "alias_existente"
+        elif not datos.get("forzar"):
+            motivo = motivo_rechazo_guardado(password, self._filtro_vigente())
+        if motivo is not None:
+            return {"alias": alias, "guardada": False, "motivo": motivo}
+        guardar_contrasena_cifrada(password, alias, meta=datos.get("meta"))
+        if self._filtro is not None:
+            self._filtro.agregar(password, alias)
+        return {"alias": alias, "guardada": True}
+
+    def _eliminar(self, alias: str) -> dict:
+        eliminada = eliminar_alias(alias)
+        if eliminada and self._filtro is not None:
+            self._filtro.quitar(alias)
+        return {"alias": alias, "eliminada": eliminada}
+
+
+def _bool(datos: dict, campo: str, defecto: bool) -> bool:
+    valor = datos.get(campo, defecto)
+    if not isinstance(valor, bool):
+        raise ErrorHTTP(400, f"'{campo}' debe ser booleano")
+    return valor
+
+
+def _entero(datos: dict, campo: str, defecto: int, minimo: int, maximo: int) -> int:
+    valor = datos.get(campo, defecto)
+    if not isinstance(valor, int) or isinstance(valor, bool) or not minimo <= valor <= maximo:
+        raise ErrorHTTP(400, f"'{campo}' debe ser un entero entre {minimo} y {maximo}")
+    return valor
+
+
+def _parametros(datos: dict) -> tuple:
+    #(longitud, mayúsculas, minúsculas, dígitos, símbolos) validados, con los mismos valores por defecto que el CLI.
+    params = (_entero(datos, "longitud", 16, MIN_ALLOWED_LENGTH, MAX_LONGITUD), _bool(datos, "mayusculas", True),
+              _bool(datos, "minusculas", True), _bool(datos, "digitos", True), _bool(datos, "simbolos", True))
+    try:
+        validar_parametros(*params)
+    except ValueError as e:
+        raise ErrorHTTP(400, str(e))
+    return params
+
+
+def _passwords(datos: dict) -> list:
+    if "passwords" in datos:
+        lista = datos["passwords"]
+    elif "password" in datos:
+        lista = [datos["password"]]
+    else:
+        raise ErrorHTTP(400, "falta 'password' o 'passwords'")
+    if not isinstance(lista, list) or not all(isinstance(p, str) for p in lista):
+        raise ErrorHTTP(400, "'passwords' debe ser una lista de cadenas")
+    if len(lista) > MAX_ITEMS_PETICION:
+        raise ErrorHTTP(413, f"máximo {MAX_ITEMS_PETICION} contraseñas por petición")
+    return lista
+
+
+def _entropias(passwords: list) -> list:
+    salida = []
+    for pw in passwords:
+        est = evaluar_entropia(pw)
+        salida.append((round(est["bits"], 1), est["nivel"]))
+    return salida
+
+
+def ruta_token() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(KEY_FILE)), TOKEN_ARCHIVO)
+
+
+def obtener_token() -> str:
+    """
+    Token de acceso del servicio: SERVICIO_TOKEN si está definida; si no, el de servicio.token (junto a key.bin),
+    que se genera la primera vez con permisos 0600 para que los clientes locales lo lean de ahí.
+    """
+    token = os.environ.get("SERVICIO_TOKEN")
+    if token:
+        return token
+    ruta = ruta_token()
+    try:
+        with open(ruta, "r", encoding="ascii") as f:
+            token = f.read().strip()
+    except FileNotFoundError:
+        token = ""
+    if not token:
+        token = secrets.token_urlsafe(32)
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="ascii") as f:
+            f.write(token + "\n")
+        os.replace(tmp, ruta)
+    if os.name != "nt":
+        os.chmod(ruta, 0o600)
+    return token
+
+
+def es_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _chequeos_locales(passwords: list, modo: str) -> list:
+    #Lista negra y HIBP offline (mmap); corre en el pool por defecto para no frenar el event loop.
+    salida = []
+    for pw in passwords:
+        r = {"blacklist": chequear_blacklist_local(pw)}
+        if modo != "online":
+            r["hibp"] = chequear_hibp(pw, "offline")
+        salida.append(r)
+    return salida
+
+
+class ServicioContrasenas:
+    def __init__(self, tamano_lote: int = TAMANO_LOTE_SERVICIO, token: str = None):
+        self.boveda = BovedaServicio(tamano_lote)
+        self.peticiones = 0
+        self._autorizacion = None if token is None else f"Bearer {token}".encode("utf-8")
+        self._rutas = {
+            ("GET", "/salud"): self._salud,
+            ("GET", "/perfil"): self._perfil,
+            ("POST", "/generar"): self._generar,
+            ("POST", "/evaluar"): self._evaluar,
+            ("POST", "/brechas"): self._brechas,
+            ("GET", "/boveda"): self._listar,
+            ("POST", "/boveda"): self._guardar,
+        }
+        self._rutas_alias = {"GET": self._obtener, "DELETE": self._eliminar}
+
+    # --- Manejadores: reciben (datos del cuerpo, consulta, alias) y devuelven (status, respuesta) ---
+
+    async def _salud(self, datos, consulta, alias):
+        return 200, {"ok": True, "peticiones": self.peticiones, "escrituras_pendientes": self.boveda.pendientes(),
+                     "lotes_boveda": self.boveda.lotes, "escrituras_boveda": self.boveda.escrituras}
+
+    async def _perfil(self, datos, consulta, alias):
+        return 200, {"tramos": resumen_perfilado()}
+
+    async def _generar(self, datos, consulta, alias):
+        params = _parametros(datos)
+        cantidad = _entero(datos, "cantidad", 1, 1, MAX_ITEMS_PETICION)
+        passwords = generar_lote(cantidad, *params)
+        if not _bool(datos, "evaluar", False):
+            return 200, {"passwords": passwords}
+        return 200, {"passwords": [{"password": pw, "score": r["score"], "recomendacion": r["recomendacion"]}
+                                   for pw, r in zip(passwords, evaluar_fuerza_lote(passwords))]}
+
+    async def _evaluar(self, datos, consulta, alias):
+        passwords = _passwords(datos)
+        resultados = evaluar_fuerza_lote(passwords)
+        if _bool(datos, "entropia", False):
+            # El estimador por patrones puede tardar milisegundos por contraseña: fuera del event loop
+            estimaciones = await asyncio.get_running_loop().run_in_executor(None, _entropias, passwords)
+            for r, (bits, nivel) in zip(resultados, estimaciones):
+                r["bits"] = bits
+                r["nivel"] = nivel
+        return 200, {"resultados": resultados}
+
+    async def _brechas(self, datos, consulta, alias):
+        """
+        Igual que el subcomando check: offline (o auto con hibp.db) consulta la base local;
+        online usa el cliente asíncrono de hibp en el mismo event loop (prefijos deduplicados, caché de rangos).
+        """
+        passwords = _passwords(datos)
+        modo = datos.get("modo") or HIBP_MODO
+        if modo not in ("online", "offline", "auto"):
+            raise ErrorHTTP(400, "'modo' debe ser online, offline o auto")
+        if modo == "auto":
+            modo = "offline" if os.path.exists(HIBP_OFFLINE_DB) else "online"
+        loop = asyncio.get_running_loop()
+        resultados = await loop.run_in_executor(None, _chequeos_locales, passwords, modo)
+        if modo == "online":
+            conteos = await contar_lote_async(passwords)
+            for pw, r in zip(passwords, resultados):
+                c = conteos.get(pw)
+                r["hibp"] = None if c is None else c > 0
+        encontradas = sum(1 for r in resultados if r["blacklist"] or r.get("hibp"))
+        if encontradas:
+            registrar_evento('service_breach_hits', params={'count': encontradas})
+        return 200, {"resultados": resultados}
+
+    async def _listar(self, datos, consulta, alias):
+        if "vencen" in consulta:
+            try:
+                dias = float(consulta["vencen"][0])
+            except ValueError:
+                raise ErrorHTTP(400, "'vencen' debe ser un número de días")
+            return 200, {"entradas": await self.boveda.leer(vencimientos, dias)}
+        return 200, {"entradas": await self.boveda.leer(listar_metadatos)}
+
+    async def _obtener(self, datos, consulta, alias):
+        def leer():
+            e = obtener_entrada(alias)
+            return None if e is None else dict(e)
+        entrada = await self.boveda.leer(leer)
+        if entrada is None:
+            raise ErrorHTTP(404, "alias inexistente")
+        registrar_evento('service_entry_read', params={'alias': alias})
+        return 200, entrada
+
+    async def _guardar(self, datos, consulta, alias):
+        alias = datos.get("alias")
+        if not isinstance(alias, str) or not alias.strip():
+            raise ErrorHTTP(400, "falta 'alias'")
+        meta = datos.get("meta") or {}
+        if not isinstance(meta, dict):
+            raise ErrorHTTP(400, "'meta' debe ser un objeto")
+        generada = "password" not in datos
+        if generada:
+            params = _parametros(datos)
+            password = generar_lote(1, *params)[0]
+            meta = dict(meta, length=params[0], upper=params[1], lower=params[2], digits=params[3], symbols=params[4])
+        else:
+            password = datos["password"]
+            if not isinstance(password, str) or not password:
+                raise ErrorHTTP(400, "'password' debe ser una cadena no vacía")
+        r = await self.boveda.escribir("guardar", {"alias": alias.strip(), "password": password, "meta": meta,
+                                                   "sobrescribir": _bool(datos, "sobrescribir", False),
+                                                   "forzar": _bool(datos, "forzar", False)})
+        if r["guardada"] and generada and _bool(datos, "mostrar", True):
+            r["password"] = password
+        return (201 if r["guardada"] else 409), r
+
+    async def _eliminar(self, datos, consulta, alias):
+        r = await self.boveda.escribir("eliminar", alias)
+        if not r["eliminada"]:
+            raise ErrorHTTP(404, "alias inexistente")
+        registrar_evento('delete_alias', params={'alias': alias})
+        return 200, r
+
+    # --- HTTP/1.1 mínimo (keep-alive, Content-Length) ---
+
+    def _autorizada(self, metodo: str, ruta: str, cabeceras: dict) -> bool:
+        if self._autorizacion is None or (metodo, ruta) in RUTAS_PUBLICAS:
+            return True
+        return hmac.compare_digest(cabeceras.get("authorization", "").encode("utf-8"), self._autorizacion)
+
+    async def _despachar(self, metodo: str, destino: str, cuerpo: bytes, cabeceras: dict):
+        partes = urlsplit(destino)
+        ruta = partes.path.rstrip("/") or "/"
+        if not self._autorizada(metodo, ruta, cabeceras):
+            raise ErrorHTTP(401, "falta el token de acceso (Authorization: Bearer ...)")
+        alias = None
+        manejador = self._rutas.get((metodo, ruta))
+        if manejador is None and ruta.startswith("/boveda/"):
+            alias = unquote(ruta[len("/boveda/"):])
+            manejador = self._rutas_alias.get(metodo)
+            if manejador is None:
+                raise ErrorHTTP(405, "método no permitido")
+        if manejador is None:
+            if any(r == ruta for _, r in self._rutas):
+                raise ErrorHTTP(405, "método no permitido")
+            raise ErrorHTTP(404, "ruta inexistente")
+        datos = {}
+        if cuerpo:
+            try:
+                datos = json.loads(cuerpo)
+            except ValueError:
+                raise ErrorHTTP(400, "cuerpo JSON inválido")
+            if not isinstance(datos, dict):
+                raise ErrorHTTP(400, "el cuerpo debe ser un objeto JSON")
+        return await manejador(datos, parse_qs(partes.query), alias)
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        #Atiende una conexión: peticiones en secuencia mientras el cliente la mantenga abierta.
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), TIEMPO_INACTIVIDAD)
+                except asyncio.TimeoutError:
+                    return
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Línea de petición de más de 64 KiB
+                    await self._responder(escritor, 400, {"error": "línea de petición demasiado larga"}, False)
+                    return
+                if not linea:
+                    return
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(escritor, 400, {"error": "línea de petición inválida"}, False)
+                    return
+                try:
+                    cabeceras = await asyncio.wait_for(self._leer_cabeceras(lector), TIEMPO_CABECERAS)
+                except asyncio.TimeoutError:
+                    await self._responder(escritor, 408, {"error": "cabeceras incompletas"}, False)
+                    return
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._responder(escritor, 431, {"error": "cabeceras demasiado grandes"}, False)
+                    return
+                conexion = cabeceras.get("connection", "").lower()
+                mantener = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+                try:
+                    largo = int(cabeceras.get("content-length", 0))
+                except ValueError:
+                    largo = -1
+                if not 0 <= largo <= MAX_CUERPO:
+                    await self._responder(escritor, 413 if largo > 0 else 400, {"error": "Content-Length inválido"},
+                                          False)
+                    return
+                cuerpo = await lector.readexactly(largo) if largo else b""
+                self.peticiones += 1
+                try:
+                    status, respuesta = await self._despachar(metodo.upper(), destino, cuerpo, cabeceras)
+                except ErrorHTTP as e:
+                    status, respuesta = e.status, {"error": str(e)}
+                except Exception as e:
+                    registrar_evento('service_error', params={'path': destino.split("?")[0], 'error': repr(e)})
+                    status, respuesta = 500, {"error": "error interno"}
+                await self._responder(escritor, status, respuesta, mantener)
+                if not mantener:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _leer_cabeceras(lector: asyncio.StreamReader) -> dict:
+        #Hasta la línea vacía. ValueError si una línea supera el límite del lector o si hay más de MAX_CABECERAS.
+        cabeceras = {}
+        for _ in range(MAX_CABECERAS + 1):
+            linea = await lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                return cabeceras
+            k, _, v = linea.decode("latin-1").partition(":")
+            cabeceras[k.strip().lower()] = v.strip()
+        raise ValueError("demasiadas cabeceras")
+
+    @staticmethod
+    async def _responder(escritor: asyncio.StreamWriter, status: int, respuesta, mantener: bool):
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+        escritor.write((f"HTTP/1.1 {status} {RAZONES.get(status, '')}\r\n"
+                        "Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(cuerpo)}\r\n"
+                        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n").encode("latin-1") + cuerpo)
+        await escritor.drain()
+
+
+async def servir(host: str = HOST_POR_DEFECTO, puerto: int = PUERTO_POR_DEFECTO,
+                 tamano_lote: int = TAMANO_LOTE_SERVICIO, detener: asyncio.Event = None, autenticacion: bool = True):
+    """
+    Inicia el servicio y atiende hasta que se active `detener` (o SIGINT/SIGTERM). Antes de escuchar deja
+    cargados la clave y el cifrador; al terminar confirma las escrituras encoladas.
+    Sin autenticación solo escucha en loopback (GET /boveda/<alias> devuelve contraseñas descifradas).
+    """
+    if not autenticacion and not es_loopback(host):
+        raise ValueError(f"Sin autenticación el servicio solo puede escuchar en loopback, no en {host}.")
+    if not os.path.exists(KEY_FILE):
+        generar_key()
+        registrar_evento('key_generated', params={'action': 'generate_key'})
+    servicio = ServicioContrasenas(tamano_lote, obtener_token() if autenticacion else None)
+    servicio.boveda.iniciar()
+    await servicio.boveda.leer(version_boveda)
+    detener = detener or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    if os.name != "nt":
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, detener.set)
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    puerto_real = servidor.sockets[0].getsockname()[1]
+    print(f"Servicio escuchando en http://{host}:{puerto_real}", flush=True)
+    if autenticacion:
+        origen = "SERVICIO_TOKEN" if os.environ.get("SERVICIO_TOKEN") else ruta_token()
+        print(f"Token de acceso (Authorization: Bearer ...) en {origen}", flush=True)
+    registrar_evento('service_started', params={'host': host, 'port': puerto_real, 'auth': autenticacion})
+    try:
+        await detener.wait()
+    finally:
+        servidor.close()
+        await servicio.boveda.cerrar()
+        registrar_evento('service_stopped', params={'requests': servicio.peticiones})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local del generador de contraseñas.")
+    parser.add_argument("--host", default=HOST_POR_DEFECTO)
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO, help="0 elige un puerto libre")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE_SERVICIO, help="escrituras máximas por commit")
+    parser.add_argument("--perfil", action="store_true", help="mide tiempos por tramo (GET /perfil)")
+    parser.add_argument("--sin-autenticacion", action="store_true",
+                        help="no exige token (solo con --host de loopback)")
+    args = parser.parse_args(argv)
+    if args.sin_autenticacion and not es_loopback(args.host):
+        parser.error("--sin-autenticacion solo se permite con un --host de loopback (127.0.0.1, ::1, localhost)")
+    if args.perfil:
+        activar_perfilado()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.lote, autenticacion=not args.sin_autenticacion))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,180 @@
 """
 Módulo storage: almacenamiento cifrado de contraseñas
+Dos formatos de bóveda con las mismas funciones públicas:
+- sqlite (vault.db): tabla indexada por alias; leer/insertar/eliminar un alias no recorre la bóveda.
+- json (vault.json): formato original, se reescribe completo en cada cambio. Se sigue usando mientras no se migre.
+Migrar:  python storage.py migrar
 """
 
 #Dependencias
+import bisect
 import json
 import os
-from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
+import sqlite3
+import sys
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from perfilado import medido, tramo
+# cryptography, csv y concurrent.futures se importan dentro de las funciones que los usan: listar, consultar
+# vencimientos o solo generar (main_generador_final importa este módulo) no cargan la pila de cifrado.
 
 KEY_FILE = "key.bin"
 VAULT_FILE = "vault.json"
+VAULT_DB = "vault.db"
+VAULT_BACKEND = os.environ.get("VAULT_BACKEND", "auto")
+#'sqlite', 'json' o 'auto' (sqlite salvo que solo exista un vault.json sin migrar)
+KEY_FILE_ANTERIOR_SUFIJO = ".anterior"
+#Durante una rotación de clave la anterior queda en key.bin.anterior hasta que toda la bóveda fue recifrada
+KEY_FILE_NUEVA_SUFIJO = ".nueva"
+#Clave pendiente de una rotación (key.bin.nueva): permite retomarla con la misma clave si se interrumpe
+TAMANO_BLOQUE_CIFRADO = 2000
+#Entradas por tarea en las operaciones masivas (importar, exportar, rotar clave)
+SIM_BUCKETS = 16
+#Cantidad de buckets del sketch de similitud (solo en memoria, ver _sketch): pocos buckets ya filtran bien
+VENCIMIENTOS_SUFIJO = ".vence"
+#Índice de vencimientos de la bóveda json (vault.json.vence): (fecha, alias) ordenados, se regenera en cada escritura
 
 def generar_key():
     """Genera un archivo de clave simétrica para cifrar/descifrar contraseñas y escribe key.bin en binario."""
+    from cryptography.fernet import Fernet
     key = Fernet.generate_key()
     with open(KEY_FILE, "wb") as f:
         f.write(key)
+    invalidar_cache_cifrado()
 
-def _get_cipher():
-    #Lee key.bin y devuelve Fernet(key). Lanza FileNotFoundError si no existe.
-    if not os.path.exists(KEY_FILE):
+# Caché de la clave y del objeto Fernet para todo el proceso. Se valida con la firma (ruta, inodo, mtime, tamaño)
+# de key.bin y de key.bin.anterior, así un cambio de archivo (otro proceso, rotación) se detecta en el siguiente uso.
+_cache_cifrado = {"firma": None, "key": None, "cipher": None}
+_cache_lock = threading.Lock()
+_sesion = threading.local()
+
+def _firma_archivo(ruta: str):
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def invalidar_cache_cifrado():
+    #Descarta la clave y el cifrador cacheados (se llama al generar o rotar la clave).
+    with _cache_lock:
+        _cache_cifrado.update(firma=None, key=None, cipher=None)
+
+def _material_clave():
+    """
+    Devuelve (key, cipher) desde la caché. Fuera de una sesión valida la caché con un stat por llamada;
+    dentro de sesion_boveda() usa el material fijado al abrir la sesión sin tocar el disco.
+    """
+    fijado = getattr(_sesion, "material", None)
+    if fijado is not None:
+        return fijado
+    firma = (KEY_FILE, _firma_archivo(KEY_FILE), _firma_archivo(KEY_FILE + KEY_FILE_ANTERIOR_SUFIJO))
+    with _cache_lock:
+        if _cache_cifrado["firma"] == firma and _cache_cifrado["cipher"] is not None:
+            return _cache_cifrado["key"], _cache_cifrado["cipher"]
+    if firma[1] is None:
         raise FileNotFoundError("No se encontró el archivo de clave (key.bin).")
+    from cryptography.fernet import Fernet, MultiFernet
     with open(KEY_FILE, "rb") as f:
         key = f.read()
-    return Fernet(key)
+    anterior = _leer_key_anterior()
+    cipher = Fernet(key) if anterior is None else MultiFernet([Fernet(key), Fernet(anterior)])
+    with _cache_lock:
+        _cache_cifrado.update(firma=firma, key=key, cipher=cipher)
+    return key, cipher
+
+@contextmanager
+def sesion_boveda():
+    """
+    Sesión para operaciones por lotes: fija la clave y el cifrador al entrar, así cada operación
+    dentro del bloque evita hasta el stat de key.bin. No rotar la clave dentro de una sesión.
+        with sesion_boveda():
+            for pw, alias in lote:
+                guardar_contrasena_cifrada(pw, alias)
+    """
+    anterior = getattr(_sesion, "material", None)
+    if anterior is None:
+        _sesion.material = _material_clave()
+    try:
+        yield
+    finally:
+        if anterior is None:
+            _sesion.material = None
+
+def _leer_key() -> bytes:
+    #Devuelve el contenido de key.bin (cacheado). Lanza FileNotFoundError si no existe.
+    return _material_clave()[0]
+
+def _leer_key_anterior():
+    ruta = KEY_FILE + KEY_FILE_ANTERIOR_SUFIJO
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "rb") as f:
+        return f.read()
+
+def _get_cipher():
+    """
+    Devuelve Fernet(key) para key.bin (cacheado). Lanza FileNotFoundError si no existe.
+    Si quedó una rotación de clave a medio hacer, devuelve MultiFernet (cifra con la nueva, descifra con ambas).
+    """
+    return _material_clave()[1]
+
+def _sketch(password: str) -> bytes:
+    """
+    Sketch de similitud: histograma de caracteres agrupados en SIM_BUCKETS buckets (un byte por bucket).
+    Se calcula en memoria a partir del texto plano y nunca se guarda en la bóveda: revelaría la longitud exacta
+    de cada contraseña y cuáles se repiten.
+    """
+    conteos = [0] * SIM_BUCKETS
+    for c in password:
+        conteos[ord(c) % SIM_BUCKETS] += 1
+    return bytes(min(n, 255) for n in conteos)
 
+def _cota_similitud(consulta: bytes, sketch: bytes) -> float:
+    """
+    Cota superior de SequenceMatcher.ratio() a partir de dos sketches (la consulta ya decodificada a bytes).
+    ratio = 2*M/T, donde M (caracteres emparejados) nunca supera la intersección de los multiconjuntos de caracteres,
+    y agrupar caracteres en buckets solo puede agrandar esa intersección. Por eso la cota nunca es menor que el ratio real:
+    descartar por cota no produce falsos negativos.
+    """
+    total = sum(consulta) + sum(sketch)
+    if not total:
+        return 1.0
+    return 2.0 * sum(map(min, consulta, sketch)) / total
+
+@medido("boveda.guardar")
 def guardar_contrasena_cifrada(password: str, alias: str, meta: dict = None):
     """
     Crea entrada con created_at y expires_at,
-    Cifra password con Fernet.encrypt, reemplaza alias si ya existía, escribe vault.json
+    Cifra password con Fernet.encrypt, reemplaza alias si ya existía y la guarda en la bóveda
     """
     cipher = _get_cipher()
-    data = _leer_vault()
 
     expires_at = (datetime.utcnow() + timedelta(days=90)).isoformat() + "Z"
     created_at = datetime.utcnow().isoformat() + "Z"
 
+    with tramo("cifrado.cifrar"):
+        token = cipher.encrypt(password.encode()).decode()
     entry = {
         "alias": alias,
-        "password": cipher.encrypt(password.encode()).decode(),
+        "password": token,
         "created_at": created_at,
         "expires_at": expires_at,
         "meta": meta or {}
     }
-
-    # eliminar si ya existía
-    data = [e for e in data if e.get("alias") != alias]
-    data.append(entry)
-    _escribir_vault(data)
+    _insertar(entry)
 
 def leer_todas():
     #Descifra cada "password" con cipher.decrypt y devuelve lista con password_plain.
     cipher = _get_cipher()
-    data = _leer_vault()
     salida = []
-    for e in data:
+    for e in _entradas():
         try:
-            plain = cipher.decrypt(e["password"].encode()).decode()
+            with tramo("cifrado.descifrar"):
+                plain = cipher.decrypt(e["password"].encode()).decode()
         except Exception:
             plain = ""
         salida.append({
@@ -68,24 +186,814 @@ def leer_todas():
         })
     return salida
 
+class RegistroBoveda(Mapping):
+    """
+    Entrada de la bóveda con la misma forma que los dicts de leer_todas, pero "password_plain"
+    se descifra recién al primer acceso y queda guardado para los siguientes.
+    """
+    __slots__ = ("_entrada", "_cipher", "_plain")
+    CAMPOS = ("alias", "password_plain", "created_at", "expires_at", "meta")
+
+    def __init__(self, entrada: dict, cipher):
+        self._entrada = entrada
+        self._cipher = cipher
+        self._plain = None
+
+    def __getitem__(self, campo):
+        if campo == "password_plain":
+            if self._plain is None:
+                try:
+                    with tramo("cifrado.descifrar"):
+                        self._plain = self._cipher.decrypt(self._entrada["password"].encode()).decode()
+                except Exception:
+                    self._plain = ""
+            return self._plain
+        if campo == "meta":
+            return self._entrada.get("meta", {})
+        if campo in self.CAMPOS:
+            return self._entrada.get(campo)
+        raise KeyError(campo)
+
+    def __iter__(self):
+        return iter(self.CAMPOS)
+
+    def __len__(self):
+        return len(self.CAMPOS)
+
+    def descifrado(self) -> bool:
+        return self._plain is not None
+
+def leer_todas_perezoso() -> list:
+    #Como leer_todas pero sin descifrar nada por adelantado (ver RegistroBoveda).
+    cipher = _get_cipher()
+    return [RegistroBoveda(e, cipher) for e in _entradas()]
+
+@medido("boveda.obtener")
+def obtener_entrada(alias: str):
+    #Una entrada por alias como RegistroBoveda (se descifra al acceder a "password_plain"), o None si no existe.
+    if _backend() == "sqlite":
+        fila = _conexion().execute("SELECT alias, password, created_at, expires_at, meta FROM entradas "
+                                   "WHERE alias = ?", (alias,)).fetchone()
+        entrada = _fila_a_entrada(fila) if fila else None
+    else:
+        entrada = next((e for e in _leer_vault() if e.get("alias") == alias), None)
+    return None if entrada is None else RegistroBoveda(entrada, _get_cipher())
+
+@medido("boveda.listar_metadatos")
+def listar_metadatos() -> list:
+    """
+    Lista alias, created_at, expires_at y meta sin descifrar ni leer la clave.
+    Para listados y renovaciones, donde no hace falta la contraseña.
+    """
+    if _backend() == "sqlite":
+        filas = _conexion().execute("SELECT alias, created_at, expires_at, meta FROM entradas ORDER BY rowid")
+        return [{"alias": a, "created_at": c, "expires_at": x, "meta": json.loads(m or "{}")} for a, c, x, m in filas]
+    return [{"alias": e.get("alias"), "created_at": e.get("created_at"), "expires_at": e.get("expires_at"),
+             "meta": e.get("meta", {})} for e in _leer_vault()]
+
+def vencimientos(dias: float = 0, ahora: datetime = None) -> list:
+    """
+    Entradas que vencen dentro de los próximos `dias` días (incluidas las ya vencidas), ordenadas por vencimiento,
+    como {alias, expires_at, meta}. Consulta el índice de vencimientos: no descifra, no lee la clave ni recorre
+    las fechas de toda la bóveda.
+    """
+    limite = _epoch(ahora or datetime.utcnow()) + int(dias * 86400)
+    if _backend() == "sqlite":
+        filas = _conexion().execute(
+            "SELECT alias, expires_at, meta FROM entradas WHERE expira <= ? ORDER BY expira, alias", (limite,))
+        return [{"alias": a, "expires_at": x, "meta": json.loads(m or "{}")} for a, x, m in filas]
+    indice = _indice_vencimientos()
+    fin = bisect.bisect_right(indice["epochs"], limite)
+    return [{"alias": a, "expires_at": x, "meta": m} for _, a, x, m in indice["filas"][:fin]]
+
+def proximo_vencimiento():
+    #Vencimiento más cercano en segundos UTC (epoch), o None si la bóveda no tiene fechas.
+    if _backend() == "sqlite":
+        return _conexion().execute("SELECT MIN(expira) FROM entradas").fetchone()[0]
+    epochs = _indice_vencimientos()["epochs"]
+    return epochs[0] if epochs else None
+
+@medido("boveda.eliminar")
 def eliminar_alias(alias: str) -> bool:
-    data = _leer_vault()
-    nuevo = [e for e in data if e.get("alias") != alias]
-    if len(nuevo) == len(data):
-        return False
-    _escribir_vault(nuevo)
+    if _backend() == "sqlite":
+        with _transaccion() as con:
+            return con.execute("DELETE FROM entradas WHERE alias = ?", (alias,)).rowcount > 0
+    with _bloqueo_vault():
+        data = _leer_vault()
+        nuevo = [e for e in data if e.get("alias") != alias]
+        if len(nuevo) == len(data):
+            return False
+        _escribir_vault(nuevo)
     return True
 
 def existe_alias(alias: str) -> bool:
+    if _backend() == "sqlite":
+        return _conexion().execute("SELECT 1 FROM entradas WHERE alias = ?", (alias,)).fetchone() is not None
     data = _leer_vault()
     return any(e.get("alias") == alias for e in data)
 
+def _backend() -> str:
+    if VAULT_BACKEND in ("sqlite", "json"):
+        return VAULT_BACKEND
+    if os.path.exists(VAULT_DB) or not os.path.exists(VAULT_FILE):
+        return "sqlite"
+    return "json"
+
+_conexiones = {}
+
+def _conexion(db_file: str = None) -> sqlite3.Connection:
+    #Conexión reutilizada por archivo; crea el esquema la primera vez.
+    db_file = db_file or VAULT_DB
+    con = _conexiones.get(db_file)
+    if con is None:
+        con = sqlite3.connect(db_file)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("""CREATE TABLE IF NOT EXISTS entradas (
+            alias TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            created_at TEXT,
+            expires_at TEXT,
+            meta TEXT NOT NULL DEFAULT '{}',
+            sim TEXT,
+            expira INTEGER
+        )""")
+        #sim: columna obsoleta (sketches de similitud en claro); se conserva vacía por compatibilidad de esquema
+        columnas = {c[1] for c in con.execute("PRAGMA table_info(entradas)")}
+        if "expira" not in columnas:
+            #Bóvedas creadas antes del índice de vencimientos: agrega la columna y la completa una vez.
+            con.execute("ALTER TABLE entradas ADD COLUMN expira INTEGER")
+            con.executemany("UPDATE entradas SET expira = ? WHERE alias = ?",
+                            [(_epoch(x), a) for a, x in con.execute("SELECT alias, expires_at FROM entradas")])
+        con.execute("CREATE INDEX IF NOT EXISTS idx_entradas_expira ON entradas(expira)")
+        if con.execute("PRAGMA user_version").fetchone()[0] < 1:
+            #Bóvedas con sketches guardados en claro: se borran una vez, sobrescribiendo las páginas liberadas.
+            con.execute("PRAGMA secure_delete=ON")
+            con.execute("UPDATE entradas SET sim = NULL WHERE sim IS NOT NULL")
+            con.execute("PRAGMA user_version = 1")
+        con.commit()
+        _conexiones[db_file] = con
+    return con
+
+def _fila_a_entrada(fila) -> dict:
+    alias, password, created_at, expires_at, meta = fila
+    return {"alias": alias, "password": password, "created_at": created_at,
+            "expires_at": expires_at, "meta": json.loads(meta or "{}")}
+
+def _entrada_a_fila(e: dict) -> tuple:
+    return (e.get("alias"), e.get("password"), e.get("created_at"), e.get("expires_at"),
+            json.dumps(e.get("meta") or {}), _epoch(e.get("expires_at")))
+
+_INSERTAR_FILA = "INSERT INTO entradas (alias, password, created_at, expires_at, meta, expira) VALUES (?, ?, ?, ?, ?, ?)"
+
+@medido("boveda.leer_entradas")
+def _entradas() -> list:
+    #Entradas crudas (cifradas) en orden de inserción.
+    if _backend() == "sqlite":
+        filas = _conexion().execute(
+            "SELECT alias, password, created_at, expires_at, meta FROM entradas ORDER BY rowid")
+        return [_fila_a_entrada(f) for f in filas]
+    return _leer_vault()
+
+@medido("boveda.insertar")
+def _insertar(entry: dict):
+    #Inserta o reemplaza por alias (el reemplazo queda al final, igual que en el formato json).
+    if _backend() == "sqlite":
+        with _transaccion() as con:
+            con.execute("DELETE FROM entradas WHERE alias = ?", (entry["alias"],))
+            con.execute(_INSERTAR_FILA, _entrada_a_fila(entry))
+        return
+    with _bloqueo_vault():
+        data = [e for e in _leer_vault() if e.get("alias") != entry["alias"]]
+        data.append(entry)
+        _escribir_vault(data)
+
+@medido("boveda.leer_json")
 def _leer_vault():
+    lote = getattr(_lote, "data", None)
+    if lote is not None:
+        return lote
     if not os.path.exists(VAULT_FILE):
         return []
     with open(VAULT_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+        data = json.load(f)
+    for e in data:
+        e.pop("sim", None)  #sketch en claro de versiones anteriores: desaparece con la próxima escritura
+    return data
 
+@medido("boveda.escribir_json")
 def _escribir_vault(data):
-    with open(VAULT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    """
+    Escritura a prueba de caídas: vuelca a un temporal en el mismo directorio, fsync, y lo renombra sobre vault.json
+    (os.replace es atómico), luego fsync del directorio. Ante un corte queda la versión anterior o la nueva, nunca
+    un archivo truncado. Dentro de lote_boveda() solo actualiza la copia en memoria; se escribe una vez al final.
+    """
+    if getattr(_lote, "data", None) is not None:
+        _lote.data = data
+        return
+    directorio = os.path.dirname(os.path.abspath(VAULT_FILE))
+    tmp = f"{VAULT_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        anterior = _firma_archivo(VAULT_FILE)
+        os.replace(tmp, VAULT_FILE)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if os.name != "nt":
+        fd = os.open(directorio, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    _registrar_escritura_propia(anterior)
+    _guardar_vencimientos(data)
+
+_escritura_propia = {"firma": None, "base": None}
+#Firma de vault.json tras la última escritura de este proceso y la firma "ajena" a la que equivale
+
+def _registrar_escritura_propia(anterior):
+    #Se llama con el bloqueo tomado, justo después de reemplazar vault.json.
+    if anterior is not None and anterior == _escritura_propia["firma"]:
+        anterior = _escritura_propia["base"]
+    _escritura_propia.update(firma=_firma_archivo(VAULT_FILE), base=anterior)
+
+def version_boveda():
+    """
+    Marca que cambia solo cuando otro proceso (u otra conexión) modifica la bóveda; las escrituras de este
+    proceso no la cambian. Sirve para saber si una caché construida a partir de la bóveda sigue vigente.
+    - sqlite: PRAGMA data_version.
+    - json: firma de vault.json, con las escrituras propias traducidas a la firma previa.
+    Leerla dentro de lote_boveda() (con el bloqueo tomado) para que no se cuele una escritura ajena entre medio.
+    """
+    if _backend() == "sqlite":
+        return ("sqlite", _conexion().execute("PRAGMA data_version").fetchone()[0])
+    firma = _firma_archivo(VAULT_FILE)
+    if firma is not None and firma == _escritura_propia["firma"]:
+        firma = _escritura_propia["base"]
+    return ("json", firma)
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch(expires_at):
+    """
+    Fecha a segundos desde 1970: acepta datetime o texto ISO. Las fechas sin zona se toman como UTC ('...Z' o sin
+    sufijo); las que tienen zona se convierten a UTC. None si falta o no se puede interpretar.
+    """
+    try:
+        fecha = expires_at if isinstance(expires_at, datetime) else datetime.fromisoformat(expires_at.replace("Z", ""))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((fecha - _EPOCH).total_seconds())
+
+_cache_vencimientos = {"firma": None, "epochs": [], "filas": []}
+
+def _construir_vencimientos(data) -> dict:
+    filas = [(_epoch(e.get("expires_at")), e.get("alias"), e.get("expires_at"), e.get("meta", {})) for e in data]
+    filas = sorted((f for f in filas if f[0] is not None), key=lambda f: (f[0], f[1] or ""))
+    return {"epochs": [f[0] for f in filas], "filas": filas}
+
+def _guardar_vencimientos(data, firma=None):
+    #Reescribe vault.json.vence junto a la bóveda, con la firma del vault.json del que salieron los datos.
+    indice = _construir_vencimientos(data)
+    indice["firma"] = firma or _firma_archivo(VAULT_FILE)
+    ruta = VAULT_FILE + VENCIMIENTOS_SUFIJO
+    tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"firma": indice["firma"], "filas": indice["filas"]}, f)
+        os.replace(tmp, ruta)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _cache_vencimientos.update(indice)
+
+def _indice_vencimientos() -> dict:
+    """
+    Índice de vencimientos de la bóveda json. Se usa la copia en memoria o vault.json.vence mientras su firma
+    coincida con la de vault.json; si otro proceso u otra versión modificó la bóveda, se reconstruye y se intenta
+    guardar (si no se puede escribir se usa el índice en memoria).
+    """
+    lote = getattr(_lote, "data", None)
+    if lote is not None:
+        return _construir_vencimientos(lote)
+    firma = _firma_archivo(VAULT_FILE)
+    if _cache_vencimientos["firma"] == firma:
+        return _cache_vencimientos
+    try:
+        with open(VAULT_FILE + VENCIMIENTOS_SUFIJO, "r", encoding="utf-8") as f:
+            guardado = json.load(f)
+        if guardado.get("firma") is not None and tuple(guardado["firma"]) == firma:
+            filas = [tuple(fila) for fila in guardado["filas"]]
+            _cache_vencimientos.update(firma=firma, epochs=[f[0] for f in filas], filas=filas)
+            return _cache_vencimientos
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        pass
+    if firma is None:
+        return {"firma": None, "epochs": [], "filas": []}
+    data = _leer_vault()
+    try:
+        _guardar_vencimientos(data, firma)
+    except OSError:
+        # Directorio de solo lectura (o sin espacio): el índice queda solo en memoria
+        _cache_vencimientos.update(_construir_vencimientos(data), firma=firma)
+    return _cache_vencimientos
+
+_lote = threading.local()
+_hilo_bloqueo = threading.RLock()
+
+@contextmanager
+def _bloqueo_vault():
+    """
+    Bloqueo consultivo exclusivo sobre vault.json.lock (flock en POSIX, msvcrt en Windows) para que varias
+    instancias del CLI no pierdan cambios al hacer leer-modificar-escribir. Reentrante dentro del mismo hilo.
+    """
+    with _hilo_bloqueo:
+        profundidad = getattr(_lote, "profundidad_bloqueo", 0)
+        if profundidad:
+            _lote.profundidad_bloqueo = profundidad + 1
+            try:
+                yield
+            finally:
+                _lote.profundidad_bloqueo -= 1
+            return
+        with open(VAULT_FILE + ".lock", "a+b") as f:
+            if os.name == "nt":
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            _lote.profundidad_bloqueo = 1
+            try:
+                yield
+            finally:
+                _lote.profundidad_bloqueo = 0
+                if os.name == "nt":
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def _transaccion():
+    #Conexión sqlite dentro de una transacción; dentro de lote_boveda() el commit se hace al cerrar el lote.
+    con = _conexion()
+    if getattr(_lote, "sqlite", False):
+        yield con
+        return
+    with con:
+        yield con
+
+@contextmanager
+def lote_boveda():
+    """
+    Agrupa varias modificaciones (guardar, eliminar, importar...) en un único commit:
+    - json: toma el bloqueo, lee la bóveda una vez, aplica los cambios en memoria y la escribe una sola vez al salir.
+    - sqlite: una sola transacción (BEGIN IMMEDIATE ... COMMIT).
+    Si el bloque lanza una excepción no se guarda ningún cambio. Incluye sesion_boveda().
+        with lote_boveda():
+            for pw, alias in nuevas:
+                guardar_contrasena_cifrada(pw, alias)
+    """
+    if getattr(_lote, "activo", False):
+        yield
+        return
+    _lote.activo = True
+    try:
+        with sesion_boveda():
+            if _backend() == "sqlite":
+                con = _conexion()
+                con.execute("BEGIN IMMEDIATE")
+                _lote.sqlite = True
+                try:
+                    yield
+                except BaseException:
+                    con.rollback()
+                    raise
+                else:
+                    con.commit()
+                finally:
+                    _lote.sqlite = False
+            else:
+                with _bloqueo_vault():
+                    _lote.data = _leer_vault()
+                    try:
+                        yield
+                        data = _lote.data
+                    finally:
+                        _lote.data = None
+                    _escribir_vault(data)
+    finally:
+        _lote.activo = False
+
+def migrar_json_a_sqlite(json_file: str = None, db_file: str = None) -> int:
+    """
+    Copia todas las entradas de vault.json a vault.db en una sola transacción (mismo orden y contenido cifrado)
+    y renombra el json a .bak para que el modo 'auto' pase a usar sqlite. Devuelve la cantidad migrada.
+    """
+    json_file = json_file or VAULT_FILE
+    db_file = db_file or VAULT_DB
+    if not os.path.exists(json_file):
+        return 0
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    with _conexion(db_file) as con:
+        con.executemany("DELETE FROM entradas WHERE alias = ?", [(e.get("alias"),) for e in data])
+        con.executemany(_INSERTAR_FILA.replace("INSERT", "INSERT OR REPLACE", 1),
+                        [_entrada_a_fila(e) for e in data])
+    os.replace(json_file, json_file + ".bak")
+    return len(data)
+
+def buscar_candidatos_similares(password: str, umbral: float = 0.8) -> list:
+    """
+    Devuelve las contraseñas almacenadas (descifradas) que podrían superar el umbral de similitud con "password".
+    Solo se devuelven las entradas cuyo sketch permite superar el umbral (ver _cota_similitud), así el ratio exacto
+    se calcula contra pocas. Falsos negativos respecto a comparar contra toda la bóveda: 0.
+    Descifra toda la bóveda en cada llamada: para comprobar muchas contraseñas seguidas usar FiltroSimilitud
+    (descifra y calcula los sketches una sola vez).
+    """
+    return FiltroSimilitud(umbral).candidatos(password)
+
+_ANCHO_CARRIL = 16
+_BITS_FILA = _ANCHO_CARRIL * SIM_BUCKETS
+#FiltroSimilitud empaqueta cada sketch como una fila de SIM_BUCKETS carriles de 16 bits dentro de un entero de Python
+
+def _patron_fila(valor_carril: int) -> int:
+    #Fila (SIM_BUCKETS carriles) con el mismo valor en cada carril.
+    return sum(valor_carril << (_ANCHO_CARRIL * i) for i in range(SIM_BUCKETS))
+
+_FILA_ALTO = _patron_fila(1 << (_ANCHO_CARRIL - 1))
+_FILA_LLENA = _patron_fila((1 << _ANCHO_CARRIL) - 1)
+_FILA_MITADES = [(ancho, sum(((1 << ancho) - 1) << (2 * ancho * i) for i in range(_BITS_FILA // (2 * ancho))))
+                 for ancho in (16, 32, 64, 128)]
+#Mitades bajas de cada bloque de 2*ancho bits, para sumar los carriles de una fila por mitades
+
+class FiltroSimilitud:
+    """
+    Bóveda descifrada una vez, con el sketch de cada entrada calculado en memoria, para comprobar muchas
+    contraseñas seguidas (lotes de guardado). Los sketches no salen del proceso.
+    candidatos() devuelve lo mismo que buscar_candidatos_similares; agregar() incorpora una contraseña recién
+    guardada para que las siguientes del mismo lote también se comparen con ella.
+    La cota de _cota_similitud se calcula para todas las filas a la vez: los sketches viven en un solo entero
+    (una fila de 16 carriles de 16 bits por entrada) y el mínimo por carril y la suma por fila se hacen con
+    operaciones de bits sobre ese entero (SWAR), sin un bucle de Python por entrada.
+    """
+
+    def __init__(self, umbral: float = 0.8):
+        self.umbral = umbral
+        cipher = _get_cipher()
+        self._filas = []  # [alias, sketch, texto plano]
+        for alias, token in _tokens():
+            try:
+                with tramo("cifrado.descifrar"):
+                    plain = cipher.decrypt(token.encode()).decode()
+            except Exception:
+                continue
+            self._filas.append([alias, _sketch(plain), plain])
+        self._empaquetar()
+
+    @staticmethod
+    def _fila(sketch: bytes) -> int:
+        return int.from_bytes(b"".join(c.to_bytes(2, "little") for c in sketch), "little")
+
+    def _empaquetar(self):
+        n = len(self._filas)
+        self._sumas = int.from_bytes(b"".join(sum(f[1]).to_bytes(_BITS_FILA // 8, "little") for f in self._filas),
+                                     "little")  # suma de cada sketch, en los bits bajos de su fila
+        self._v = int.from_bytes(b"".join(self._fila(f[1]).to_bytes(_BITS_FILA // 8, "little")
+                                          for f in self._filas), "little")
+        self._aliases = {f[0] for f in self._filas}
+        self._repetir = int.from_bytes((b"\x01" + bytes(_BITS_FILA // 8 - 1)) * n, "little")
+        # Máscaras repetidas en todas las filas (patrón de una fila * repetir); agregar() las extiende
+        self._alto = _FILA_ALTO * self._repetir
+        self._llena = _FILA_LLENA * self._repetir
+        self._mitades = [(ancho, patron * self._repetir) for ancho, patron in _FILA_MITADES]
+
+    def _indices_candidatos(self, consulta: bytes):
+        """
+        Filas con _cota_similitud(consulta, sketch) > umbral, evaluando todas a la vez:
+          1. mínimo carril a carril: (q + 2^15) - v nunca pide prestado al carril vecino (q, v < 2^15) y su
+             bit alto queda en 1 exactamente donde q >= v;
+          2. suma de los 16 carriles de cada fila por mitades (16 -> 8 -> 4 -> 2 -> 1), m <= 16*255;
+          3. comparación 2*m/T > umbral como 2048*m > U*T + 1 con U = floor(umbral*1024), también con el bit alto.
+        Redondear el umbral hacia abajo solo puede conservar filas de más, nunca descartar de más.
+        """
+        n = len(self._filas)
+        alto, llena, rep = self._alto, self._llena, self._repetir
+        q = int.from_bytes(self._fila(consulta).to_bytes(_BITS_FILA // 8, "little") * n, "little")
+        mayor_igual = (((q | alto) - self._v) & alto) >> (_ANCHO_CARRIL - 1)
+        mascara = mayor_igual * 0xFFFF
+        minimo = (self._v & mascara) | (q & (llena ^ mascara))
+        for ancho, bajo in self._mitades:
+            minimo = (minimo & bajo) + ((minimo >> ancho) & bajo)
+        suma = sum(consulta)
+        u = int(self.umbral * 1024)
+        diferencia = ((minimo << 11) + (rep << 40)) - (u * (suma * rep + self._sumas) + rep)
+        marcas = ((diferencia >> 40) & rep).to_bytes(n * _BITS_FILA // 8, "little")[::_BITS_FILA // 8]
+        i = marcas.find(1)
+        while i != -1:
+            yield i
+            i = marcas.find(1, i + 1)
+        if suma == 0:
+            # Total 0 (ambas vacías): _cota_similitud devuelve 1.0
+            yield from (i for i, f in enumerate(self._filas) if not any(f[1]))
+
+    @medido("boveda.candidatos_similares")
+    def candidatos(self, password: str) -> list:
+        if not self._filas:
+            return []
+        return [self._filas[i][2] for i in self._indices_candidatos(_sketch(password))]
+
+    def agregar(self, password: str, alias: str = None):
+        sketch = _sketch(password)
+        if alias is not None and alias in self._aliases:
+            self._filas = [f for f in self._filas if f[0] != alias]
+            self._filas.append([alias, sketch, password])
+            self._empaquetar()
+            return
+        desplazamiento = _BITS_FILA * len(self._filas)
+        self._filas.append([alias, sketch, password])
+        self._sumas |= sum(sketch) << desplazamiento
+        self._v |= self._fila(sketch) << desplazamiento
+        self._repetir |= 1 << desplazamiento
+        self._alto |= _FILA_ALTO << desplazamiento
+        self._llena |= _FILA_LLENA << desplazamiento
+        self._mitades = [(ancho, bajo | (patron << desplazamiento))
+                         for (ancho, bajo), (_, patron) in zip(self._mitades, _FILA_MITADES)]
+        self._aliases.add(alias)
+
+    def quitar(self, alias: str):
+        #Olvida una entrada eliminada de la bóveda (para que no siga bloqueando su reutilización).
+        if alias in self._aliases:
+            self._filas = [f for f in self._filas if f[0] != alias]
+            self._empaquetar()
+
+def _tokens():
+    #(alias, token cifrado) de cada entrada, sin parsear meta ni fechas.
+    if _backend() == "sqlite":
+        return _conexion().execute("SELECT alias, password FROM entradas ORDER BY rowid").fetchall()
+    return [(e.get("alias"), e.get("password")) for e in _leer_vault()]
+
+# --- Operaciones masivas en paralelo ---------------------------------------------------------------
+# Las funciones _*_bloque se ejecutan en los procesos del pool: reciben la clave en bytes y un bloque de datos.
+
+def _cifrar_bloque(key: bytes, passwords: list) -> list:
+    from cryptography.fernet import Fernet
+    cipher = Fernet(key)
+    return [cipher.encrypt(pw.encode()).decode() for pw in passwords]
+
+def _descifrar_bloque(keys: list, tokens: list) -> list:
+    from cryptography.fernet import Fernet, MultiFernet
+    cipher = MultiFernet([Fernet(k) for k in keys])
+    salida = []
+    for t in tokens:
+        try:
+            salida.append(cipher.decrypt(t.encode()).decode())
+        except Exception:
+            salida.append(None)
+    return salida
+
+def _recifrar_bloque(keys: list, key_nueva: bytes, tokens: list) -> list:
+    #Descifra con cualquiera de las claves y vuelve a cifrar con la nueva; None si no se pudo.
+    from cryptography.fernet import Fernet, MultiFernet
+    descifrar = MultiFernet([Fernet(k) for k in keys])
+    cifrar = Fernet(key_nueva)
+    salida = []
+    for t in tokens:
+        try:
+            plain = descifrar.decrypt(t.encode()).decode()
+        except Exception:
+            salida.append(None)
+            continue
+        salida.append(cifrar.encrypt(plain.encode()).decode())
+    return salida
+
+def _en_paralelo(funcion, args_fijos: tuple, items: list, trabajadores: int = None, modo: str = "procesos") -> list:
+    """
+    Reparte "items" en bloques de TAMANO_BLOQUE_CIFRADO entre un pool de procesos (o hilos) y devuelve los resultados
+    en el mismo orden. Con un solo bloque o un solo trabajador se ejecuta en el proceso actual.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    bloques = [items[i:i + TAMANO_BLOQUE_CIFRADO] for i in range(0, len(items), TAMANO_BLOQUE_CIFRADO)]
+    trabajadores = trabajadores or os.cpu_count() or 1
+    if len(bloques) <= 1 or trabajadores <= 1:
+        return [r for b in bloques for r in funcion(*args_fijos, b)]
+    pool = ProcessPoolExecutor if modo == "procesos" else ThreadPoolExecutor
+    with pool(max_workers=min(trabajadores, len(bloques))) as ex:
+        futuros = [ex.submit(funcion, *args_fijos, b) for b in bloques]
+        return [r for f in futuros for r in f.result()]
+
+def _mapear_bloque(keys: list, funcion, tokens: list) -> list:
+    return funcion(_descifrar_bloque(keys, tokens))
+
+def mapear_descifradas(funcion, trabajadores: int = None, modo: str = "procesos") -> list:
+    """
+    Descifra toda la bóveda por bloques en paralelo y aplica funcion(textos planos del bloque, None si no se pudo
+    descifrar) en el mismo proceso que descifró el bloque; funcion devuelve un resultado por entrada y debe ser de
+    nivel de módulo (viaja por pickle). Devuelve [(alias, resultado)] en el orden de la bóveda.
+    """
+    filas = _tokens()
+    keys = [_leer_key()] + ([_leer_key_anterior()] if _leer_key_anterior() else [])
+    resultados = _en_paralelo(_mapear_bloque, (keys, funcion), [token for _, token in filas], trabajadores, modo)
+    return [(alias, r) for (alias, _), r in zip(filas, resultados)]
+
+def _reemplazar_entradas(nuevas: list):
+    #Inserta o reemplaza muchas entradas en un único commit.
+    if _backend() == "sqlite":
+        with _transaccion() as con:
+            con.executemany("DELETE FROM entradas WHERE alias = ?", [(e["alias"],) for e in nuevas])
+            con.executemany(_INSERTAR_FILA, [_entrada_a_fila(e) for e in nuevas])
+        return
+    aliases = {e["alias"] for e in nuevas}
+    with _bloqueo_vault():
+        data = [e for e in _leer_vault() if e.get("alias") not in aliases]
+        _escribir_vault(data + nuevas)
+
+def importar_csv(ruta: str, trabajadores: int = None, modo: str = "procesos") -> int:
+    """
+    Importa un CSV con columnas alias,password (y opcionalmente meta en JSON).
+    Cifra en paralelo y confirma todo al final en una sola escritura; si algo falla no se guarda nada.
+    Los alias repetidos reemplazan a los existentes (la última fila gana). Devuelve la cantidad importada.
+    """
+    import csv
+    filas = {}
+    with open(ruta, "r", encoding="utf-8", newline="") as f:
+        for fila in csv.DictReader(f):
+            alias = (fila.get("alias") or "").strip()
+            password = fila.get("password") or ""
+            if not alias or not password:
+                continue
+            filas.pop(alias, None)
+            filas[alias] = (password, json.loads(fila["meta"]) if fila.get("meta") else {})
+    if not filas:
+        return 0
+    key = _leer_key()
+    cifrados = _en_paralelo(_cifrar_bloque, (key,), [pw for pw, _ in filas.values()], trabajadores, modo)
+    created_at = datetime.utcnow().isoformat() + "Z"
+    expires_at = (datetime.utcnow() + timedelta(days=90)).isoformat() + "Z"
+    nuevas = [{"alias": alias, "password": token, "created_at": created_at, "expires_at": expires_at,
+               "meta": meta}
+              for (alias, (_, meta)), token in zip(filas.items(), cifrados)]
+    _reemplazar_entradas(nuevas)
+    return len(nuevas)
+
+def exportar_csv(ruta: str, trabajadores: int = None, modo: str = "procesos") -> int:
+    """
+    Exporta la bóveda DESCIFRADA a CSV (alias,password,created_at,expires_at,meta), descifrando en paralelo.
+    El archivo se crea con permisos 600; protéjalo y bórrelo cuando ya no se necesite.
+    """
+    import csv
+    entradas = _entradas()
+    keys = [_leer_key()] + ([_leer_key_anterior()] if _leer_key_anterior() else [])
+    planos = _en_paralelo(_descifrar_bloque, (keys,), [e["password"] for e in entradas], trabajadores, modo)
+    tmp = ruta + ".tmp"
+    try:
+        os.remove(tmp)  # un .tmp viejo conservaría sus permisos: se crea siempre de cero (O_EXCL)
+    except FileNotFoundError:
+        pass
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with open(fd, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["alias", "password", "created_at", "expires_at", "meta"])
+            for e, plain in zip(entradas, planos):
+                w.writerow([e.get("alias"), plain or "", e.get("created_at"), e.get("expires_at"),
+                            json.dumps(e.get("meta") or {})])
+        os.replace(tmp, ruta)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return len(entradas)
+
+def _escribir_clave(ruta: str, key: bytes):
+    #Escritura atómica y sincronizada de un archivo de clave.
+    with open(ruta + ".tmp", "wb") as f:
+        f.write(key)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta + ".tmp", ruta)
+
+def _leer_archivo_clave(ruta: str):
+    try:
+        with open(ruta, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def rotar_clave(trabajadores: int = None, modo: str = "procesos") -> dict:
+    """
+    Genera una clave nueva y recifra toda la bóveda con ella (en paralelo).
+    Orden pensado para sobrevivir a una interrupción en cualquier punto:
+      1. La clave nueva se guarda en key.bin.nueva, la actual se copia a key.bin.anterior y la nueva reemplaza
+         key.bin (mientras exista la anterior, _get_cipher descifra con ambas, así la bóveda sigue legible).
+      2. Se recifran todas las entradas y se confirman en una sola escritura.
+      3. Se elimina key.bin.anterior.
+    Si se interrumpe, volver a ejecutar rotar_clave completa la misma rotación (usa la clave pendiente de
+    key.bin.nueva; si key.bin.anterior quedó igual a key.bin y no hay pendiente, genera una nueva).
+    Las entradas que no se pueden descifrar con ninguna clave quedan como estaban y key.bin.anterior se conserva
+    hasta que se resuelvan (eliminarlas o volver a guardarlas) y se ejecute rotar_clave otra vez.
+    Devuelve {"recifradas": n, "no_descifradas": [alias]}.
+    """
+    from cryptography.fernet import Fernet
+    if getattr(_sesion, "material", None) is not None:
+        raise RuntimeError("No se puede rotar la clave dentro de sesion_boveda().")
+    ruta_anterior = KEY_FILE + KEY_FILE_ANTERIOR_SUFIJO
+    ruta_nueva = KEY_FILE + KEY_FILE_NUEVA_SUFIJO
+    actual = _leer_archivo_clave(KEY_FILE)
+    if actual is None:
+        raise FileNotFoundError("No se encontró el archivo de clave (key.bin).")
+    anterior = _leer_archivo_clave(ruta_anterior)
+    pendiente = _leer_archivo_clave(ruta_nueva)
+    if anterior is None or anterior == actual:
+        # Rotación nueva, o interrumpida antes de reemplazar key.bin: se completa con la clave pendiente
+        if pendiente is None or pendiente == actual:
+            pendiente = Fernet.generate_key()
+            _escribir_clave(ruta_nueva, pendiente)
+        if anterior is None:
+            _escribir_clave(ruta_anterior, actual)
+            anterior = actual
+        _escribir_clave(KEY_FILE, pendiente)
+        invalidar_cache_cifrado()
+        nueva = pendiente
+    else:
+        nueva = actual  # rotación interrumpida: key.bin ya es la nueva
+    if pendiente is not None:
+        os.remove(ruta_nueva)
+    no_descifradas = []
+
+    def recifrar(entradas):
+        recifrados = _en_paralelo(_recifrar_bloque, ([nueva, anterior], nueva),
+                                  [e["password"] for e in entradas], trabajadores, modo)
+        for e, r in zip(entradas, recifrados):
+            if r is None:
+                no_descifradas.append(e["alias"])
+            else:
+                e["password"] = r
+
+    # La lectura y la escritura quedan dentro del mismo bloqueo/transacción para no pisar cambios concurrentes
+    if _backend() == "sqlite":
+        con = _conexion()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            entradas = _entradas()
+            recifrar(entradas)
+            con.executemany("UPDATE entradas SET password = ? WHERE alias = ?",
+                            [(e["password"], e["alias"]) for e in entradas])
+        except BaseException:
+            con.rollback()
+            raise
+        con.commit()
+    else:
+        with _bloqueo_vault():
+            entradas = _leer_vault()
+            recifrar(entradas)
+            _escribir_vault(entradas)
+    if not no_descifradas:
+        os.remove(ruta_anterior)
+    invalidar_cache_cifrado()
+    return {"recifradas": len(entradas) - len(no_descifradas), "no_descifradas": no_descifradas}
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Operaciones de mantenimiento de la bóveda.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("migrar", help="migra vault.json a vault.db")
+    imp = sub.add_parser("importar", help="importa un CSV alias,password[,meta]")
+    imp.add_argument("csv")
+    exp = sub.add_parser("exportar", help="exporta la bóveda descifrada a CSV")
+    exp.add_argument("csv")
+    rot = sub.add_parser("rotar-clave", help="genera una clave nueva y recifra toda la bóveda")
+    for p in (imp, exp, rot):
+        p.add_argument("-j", "--trabajadores", type=int, default=None, help="procesos (por defecto: núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "migrar":
+        n = migrar_json_a_sqlite()
+        print(f"{n} entradas migradas de {VAULT_FILE} a {VAULT_DB}.")
+    elif args.comando == "importar":
+        print(f"{importar_csv(args.csv, args.trabajadores)} entradas importadas.")
+    elif args.comando == "exportar":
+        print(f"{exportar_csv(args.csv, args.trabajadores)} entradas exportadas a {args.csv} (texto plano).")
+    else:
+        r = rotar_clave(args.trabajadores)
+        print(f"Clave rotada: {r['recifradas']} entradas recifradas.")
+        if r["no_descifradas"]:
+            print(f"No se pudieron descifrar {len(r['no_descifradas'])} entradas; se conserva "
+                  f"{KEY_FILE}{KEY_FILE_ANTERIOR_SUFIJO} hasta resolverlas: {', '.join(r['no_descifradas'])}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
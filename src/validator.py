@@ -2,8 +2,16 @@
 Módulo validator: validación de parámetros y evaluación de fortaleza de contraseñas y similaridad entre contraseñas.
 """
 #Dependencias
+import re
+from collections import Counter
 from difflib import SequenceMatcher
 
+from perfilado import medido
+
+UMBRAL_SIMILITUD = 0.8
+LONGITUD_AUTOJUNK = 200
+#Desde esta longitud difflib aplica la heurística autojunk; ahí se delega en SequenceMatcher para dar el mismo resultado
+
 def validar_parametros(longitud: int, uso_may: bool, uso_min: bool, uso_dig: bool, uso_sim: bool):
     """Valida que los parámetros recibidos cumplan políticas de seguridad:
     - Longitud mínima 
@@ -14,45 +22,28 @@ def validar_parametros(longitud: int, uso_may: bool, uso_min: bool, uso_dig: boo
     if not (uso_may or uso_min or uso_dig or uso_sim):
         raise ValueError("Debe seleccionar al menos un tipo de caracteres.")
 
-def evaluar_fuerza(password: str) -> dict:
-    #Evalúa la fortaleza de una contraseña en base a su longitud y diversidad de caracteres.
-    score = 0
-    issues = {"repeticiones_largas": False, "secuencias": False}
-
-    longitud = len(password)
-    score += min(longitud * 4, 40)  # max 40 puntos por longitud
+SECUENCIAS = "abcdefghijklmnopqrstuvwxyz0123456789"
+_RE_REPETICION = re.compile(r"(.)\1\1", re.DOTALL)
+_RE_SECUENCIA = re.compile("|".join(SECUENCIAS[i:i + 3] for i in range(len(SECUENCIAS) - 2)))
+_RE_DIGITO_ASCII = re.compile(r"[0-9]")
 
-    if any(c.isupper() for c in password):
-        score += 15
-    if any(c.islower() for c in password):
-        score += 15
-    if any(c.isdigit() for c in password):
-        score += 15
-    if any(not c.isalnum() for c in password):
-        score += 15
+def _puntuar(longitud: int, may: bool, minus: bool, dig: bool, sim: bool,
+             solo_digitos: bool, solo_letras: bool, repeticion: bool, secuencia: bool) -> dict:
+    #Reglas de puntuación compartidas por evaluar_fuerza y evaluar_fuerza_lote (así ambas dan el mismo resultado).
+    score = min(longitud * 4, 40)  # max 40 puntos por longitud
+    score += 15 * (may + minus + dig + sim)
 
     # Penalizaciones básicas
     if longitud < 8:
         score -= 20
-    if password.isdigit():
+    if solo_digitos:
         score -= 30
-    if password.isalpha():
+    if solo_letras:
         score -= 20
-
-    # Detectar repeticiones largas (3 iguales seguidas)
-    for i in range(len(password) - 2):
-        if password[i] == password[i+1] == password[i+2]:
-            issues["repeticiones_largas"] = True
-            score -= 10
-            break
-
-    # Detectar secuencias simples (ej. "abc", "123")
-    secuencias = "abcdefghijklmnopqrstuvwxyz0123456789"
-    for i in range(len(secuencias) - 2):
-        if secuencias[i:i+3] in password.lower():
-            issues["secuencias"] = True
-            score -= 10
-            break
+    if repeticion:
+        score -= 10
+    if secuencia:
+        score -= 10
 
     # Normalizar score a 0-100 y devuelve una recomendacion (Débil/Media/Fuerte) segun el score obtenido
     score = max(0, min(score, 100))
@@ -64,9 +55,170 @@ def evaluar_fuerza(password: str) -> dict:
     else:
         recomendacion = "Fuerte"
 
-    return {"score": score, "recomendacion": recomendacion, "issues": issues}
+    return {"score": score, "recomendacion": recomendacion,
+            "issues": {"repeticiones_largas": repeticion, "secuencias": secuencia}}
+
+@medido("validacion.fuerza")
+def evaluar_fuerza(password: str) -> dict:
+    #Evalúa la fortaleza de una contraseña en base a su longitud y diversidad de caracteres.
+    repeticion = False
+    # Detectar repeticiones largas (3 iguales seguidas)
+    for i in range(len(password) - 2):
+        if password[i] == password[i+1] == password[i+2]:
+            repeticion = True
+            break
+
+    # Detectar secuencias simples (ej. "abc", "123")
+    secuencia = False
+    for i in range(len(SECUENCIAS) - 2):
+        if SECUENCIAS[i:i+3] in password.lower():
+            secuencia = True
+            break
+
+    return _puntuar(len(password),
+                    any(c.isupper() for c in password),
+                    any(c.islower() for c in password),
+                    any(c.isdigit() for c in password),
+                    any(not c.isalnum() for c in password),
+                    password.isdigit(), password.isalpha(), repeticion, secuencia)
+
+@medido("validacion.fuerza_lote")
+def evaluar_fuerza_lote(passwords) -> list:
+    """
+    Evalúa muchas contraseñas en una llamada; el resultado de cada una es idéntico a evaluar_fuerza.
+    Para contraseñas ASCII cada prueba es una operación en C sobre la cadena completa
+    (lower/upper para mayúsculas y minúsculas, una expresión regular para dígitos, una para repeticiones
+    y una sola alternancia para las 34 secuencias) en lugar de recorrer carácter por carácter.
+    Las contraseñas no ASCII usan evaluar_fuerza (las reglas Unicode de isupper/isdigit no se simplifican así).
+    """
+    repeticion = _RE_REPETICION.search
+    secuencia = _RE_SECUENCIA.search
+    digito = _RE_DIGITO_ASCII.search
+    # Pocas combinaciones posibles de (longitud, banderas): se puntúa una vez por combinación y se copia
+    plantillas = {}
+    salida = []
+    for pw in passwords:
+        if not pw.isascii():
+            salida.append(evaluar_fuerza(pw))
+            continue
+        bajo = pw.lower()
+        clave = (len(pw), bajo != pw, pw.upper() != pw, digito(pw) is not None,
+                 bool(pw) and not pw.isalnum(), pw.isdigit(), pw.isalpha(),
+                 repeticion(pw) is not None, secuencia(bajo) is not None)
+        r = plantillas.get(clave)
+        if r is None:
+            r = plantillas[clave] = _puntuar(*clave)
+        salida.append({"score": r["score"], "recomendacion": r["recomendacion"], "issues": r["issues"].copy()})
+    return salida
+
+@medido("validacion.entropia")
+def evaluar_entropia(password: str) -> dict:
+    """
+    Modo alternativo al score heurístico: estimación por patrones (diccionarios, teclado, l33t, fechas...).
+    Devuelve bits, nivel 0-4 y los patrones detectados (ver entropia.estimar_entropia).
+    Las tablas se cargan recién en la primera llamada.
+    """
+    from entropia import estimar_entropia
+    return estimar_entropia(password)
+
+def _mas_larga(a: str, b2j: dict, alo: int, ahi: int, blo: int, bhi: int):
+    #Misma búsqueda que SequenceMatcher.find_longest_match sin basura (mismo desempate: primer i, luego primer j).
+    besti, bestj, bestsize = alo, blo, 0
+    j2len = {}
+    for i in range(alo, ahi):
+        newj2len = {}
+        for j in b2j.get(a[i], ()):
+            if j < blo:
+                continue
+            if j >= bhi:
+                break
+            k = newj2len[j] = j2len.get(j - 1, 0) + 1
+            if k > bestsize:
+                besti, bestj, bestsize = i - k + 1, j - k + 1, k
+        j2len = newj2len
+    return besti, bestj, bestsize
+
+def _emparejados(a: str, b: str, umbral: float = None):
+    """
+    Total de caracteres emparejados (suma de get_matching_blocks) con la misma recursión que difflib.
+    Con "umbral" corta apenas el resultado de ratio > umbral queda decidido y devuelve True/False:
+    - True si lo ya emparejado alcanza para superar el umbral,
+    - False si ni emparejando todo lo pendiente (cota min(len) de cada subproblema) se puede superar.
+    """
+    total = len(a) + len(b)
+    b2j = {}
+    for j, c in enumerate(b):
+        b2j.setdefault(c, []).append(j)
+    pila = [(0, len(a), 0, len(b))]
+    cota = min(len(a), len(b))
+    emparejados = 0
+    while pila:
+        alo, ahi, blo, bhi = pila.pop()
+        cota -= min(ahi - alo, bhi - blo)
+        i, j, k = _mas_larga(a, b2j, alo, ahi, blo, bhi)
+        if k:
+            emparejados += k
+            if alo < i and blo < j:
+                pila.append((alo, i, blo, j))
+                cota += min(i - alo, j - blo)
+            if i + k < ahi and j + k < bhi:
+                pila.append((i + k, ahi, j + k, bhi))
+                cota += min(ahi - i - k, bhi - j - k)
+        if umbral is not None:
+            if 2.0 * emparejados / total > umbral:
+                return True
+            if 2.0 * (emparejados + cota) / total <= umbral:
+                return False
+    return emparejados if umbral is None else 2.0 * emparejados / total > umbral
+
+def ratio_similitud(p1: str, p2: str) -> float:
+    """Devuelve exactamente SequenceMatcher(None, p1, p2).ratio(), más rápido para cadenas cortas."""
+    if len(p2) >= LONGITUD_AUTOJUNK:
+        return SequenceMatcher(None, p1, p2).ratio()
+    total = len(p1) + len(p2)
+    if not total:
+        return 1.0
+    if p1 == p2:
+        return 2.0 * len(p1) / total
+    return 2.0 * _emparejados(p1, p2) / total
+
+class ConsultaSimilitud:
+    """
+    Compara una contraseña contra muchas reutilizando su preprocesamiento (conteo de caracteres).
+    Cada comparación aplica primero las cotas baratas de difflib (longitudes y caracteres en común)
+    y solo si pueden superar el umbral hace el emparejamiento completo, con corte temprano.
+    El resultado es el mismo que es_demasiado_similar(consulta, otra).
+    """
+
+    def __init__(self, consulta: str, umbral: float = UMBRAL_SIMILITUD):
+        self.consulta = consulta
+        self.umbral = umbral
+        self._conteo = tuple(Counter(consulta).items())
+
+    @medido("validacion.similitud")
+    def demasiado_similar(self, otra: str) -> bool:
+        a, umbral = self.consulta, self.umbral
+        if len(otra) >= LONGITUD_AUTOJUNK:
+            return SequenceMatcher(None, a, otra).ratio() > umbral
+        total = len(a) + len(otra)
+        if not total:
+            return 1.0 > umbral
+        if 2.0 * min(len(a), len(otra)) / total <= umbral:
+            return False
+        comunes = 0
+        for c, n in self._conteo:
+            m = otra.count(c)
+            comunes += n if n < m else m
+        if 2.0 * comunes / total <= umbral:
+            return False
+        if a == otra:
+            return 2.0 * len(a) / total > umbral
+        return _emparejados(a, otra, umbral)
+
+    def filtrar(self, candidatas) -> list:
+        #Devuelve las candidatas demasiado similares a la consulta.
+        return [c for c in candidatas if self.demasiado_similar(c)]
 
 def es_demasiado_similar(p1: str, p2: str) -> bool:
-    """Determina si dos contraseñas son demasiado similares (umbral 80%)."""
-    ratio = SequenceMatcher(None, p1, p2).ratio()
-    return ratio > 0.8
+    """Determina si dos contraseñas son demasiado similares (umbral 80%, mismo criterio que SequenceMatcher.ratio())."""
+    return ConsultaSimilitud(p1).demasiado_similar(p2)
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+
+@pytest.fixture
+def servidor_hibp(monkeypatch, request):
+    #Servidor local de la API por rangos (benchmarks/servidor_hibp_local.py); request.param: opciones del servidor.
+    import hibp
+    from servidor_hibp_local import ServidorHIBPLocal
+    opciones = getattr(request, "param", {})
+    with ServidorHIBPLocal(entradas_por_rango=50, **opciones) as srv:
+        monkeypatch.setattr(hibp, "HIBP_API_URL", srv.url)
+        monkeypatch.setattr(hibp, "_cache", hibp.CacheRangos())
+        monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+        yield srv
@@ -0,0 +1,29 @@
+"""Escritor de auditoría en segundo plano: si el hilo muere, los eventos se siguen escribiendo sin hilo."""
+import json
+import logging
+
+import audit
+
+
+def test_hilo_caido_escribe_en_forma_directa(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(audit, "AUDIT_FILE", str(tmp_path / "audit.log"))
+    audit.registrar_evento("antes")
+    escritor = audit._obtener_escritor()
+
+    def falla():
+        raise RuntimeError("fallo simulado")
+
+    monkeypatch.setattr(escritor, "_debe_rotar", falla)
+    with caplog.at_level(logging.ERROR, logger="audit"):
+        audit.registrar_evento("mata")
+        audit.vaciar_auditoria()
+        escritor._hilo.join(5)
+    assert not escritor._hilo.is_alive()
+    assert "fallo simulado" in caplog.text
+    for i in range(3):
+        audit.registrar_evento("despues", {"i": i})
+    audit.vaciar_auditoria()
+    with open(audit.AUDIT_FILE, encoding="utf-8") as f:
+        eventos = [json.loads(linea)["evento"] for linea in f]
+    assert eventos == ["antes", "mata", "despues", "despues", "despues"]
+    assert escritor._pendientes == []
@@ -0,0 +1,21 @@
+"""El índice compilado de la lista negra responde igual que el escaneo lineal de blacklist.txt."""
+import os
+
+import pytest
+
+from blacklist import compilar_indice
+from main_generador_final import chequear_blacklist_local
+
+CONSULTAS = ["123456", " 123456 ", "password", "Password", "", "   ", "\t", "qwerty", "no-esta"]
+
+
+@pytest.mark.parametrize("contenido", ["123456\npassword\n\nqwerty\n", "123456\npassword\nqwerty", "  \n123456\n"])
+@pytest.mark.parametrize("bloom", [False, True])
+def test_indice_igual_al_escaneo_lineal(tmp_path, contenido, bloom):
+    texto = tmp_path / "blacklist.txt"
+    texto.write_text(contenido, encoding="utf-8")
+    indice = str(tmp_path / "blacklist.idx")
+    lineal = {pw: chequear_blacklist_local(pw, str(texto), indice) for pw in CONSULTAS}
+    compilar_indice(str(texto), indice, bloom=bloom)
+    assert os.stat(indice).st_mtime_ns >= os.stat(texto).st_mtime_ns
+    assert {pw: chequear_blacklist_local(pw, str(texto), indice) for pw in CONSULTAS} == lineal
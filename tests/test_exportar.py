@@ -0,0 +1,23 @@
+"""Exportación de la bóveda descifrada: el CSV siempre queda con permisos 600."""
+import os
+import stat
+
+import storage
+
+
+def test_tmp_viejo_no_hereda_permisos(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "KEY_FILE", str(tmp_path / "key.bin"))
+    monkeypatch.setattr(storage, "VAULT_FILE", str(tmp_path / "vault.json"))
+    monkeypatch.setattr(storage, "VAULT_BACKEND", "json")
+    storage.generar_key()
+    storage.guardar_contrasena_cifrada("Secreta#123", "a")
+    ruta = str(tmp_path / "export.csv")
+    with open(ruta + ".tmp", "w") as f:
+        f.write("restos")
+    os.chmod(ruta + ".tmp", 0o644)
+    assert storage.exportar_csv(ruta, trabajadores=1) == 1
+    assert stat.S_IMODE(os.stat(ruta).st_mode) == 0o600
+    assert not os.path.exists(ruta + ".tmp")
+    with open(ruta, encoding="utf-8") as f:
+        assert "Secreta#123" in f.read()
+    storage.invalidar_cache_cifrado()
@@ -0,0 +1,59 @@
+"""Caché de rangos HIBP (memoria y disco) en las consultas individuales contra el servidor local de benchmarks/."""
+import hashlib
+
+import pytest
+
+import hibp
+import main_generador_final
+from servidor_hibp_local import ServidorHIBPLocal
+
+
+def _prefijo(password: str) -> str:
+    return hashlib.sha1(password.encode("utf-8")).hexdigest().upper()[:5]
+
+
+@pytest.mark.parametrize("servidor_hibp", [{"comprometidas": ["comprometida"], "relleno": ["relleno"]}],
+                         indirect=True)
+def test_respuesta_con_relleno_cuenta_cero(servidor_hibp):
+    assert hibp.contar_online("relleno", cache=hibp.CacheRangos()) == 0
+    assert main_generador_final.chequear_hibp("comprometida", "online") is True
+    assert main_generador_final.chequear_hibp("relleno", "online") is False
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_error_http_devuelve_none_y_no_se_cachea(monkeypatch, status):
+    bloqueada = "bloqueada"
+    with ServidorHIBPLocal(entradas_por_rango=50, errores={_prefijo(bloqueada): status}) as srv:
+        monkeypatch.setattr(hibp, "HIBP_API_URL", srv.url)
+        monkeypatch.setattr(hibp, "_cache", hibp.CacheRangos())
+        monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+        assert main_generador_final.chequear_hibp(bloqueada, "online") is None
+        assert hibp.obtener_cache().obtener(_prefijo(bloqueada)) is None
+        assert main_generador_final.chequear_hibp(bloqueada, "online") is None
+        assert srv.peticiones == 2
+
+
+def test_aciertos_de_cache_no_van_a_la_red(servidor_hibp):
+    cache = hibp.CacheRangos()
+    passwords = ["uno", "dos", "tres"]
+    primera = {pw: hibp.contar_online(pw, cache=cache) for pw in passwords}
+    peticiones = servidor_hibp.peticiones
+    assert peticiones == len({_prefijo(pw) for pw in passwords})
+    for pw in passwords:
+        assert hibp.contar_online(pw, cache=cache) == primera[pw]
+    assert servidor_hibp.peticiones == peticiones
+    assert cache.stats["hits_memoria"] == len(passwords)
+
+
+def test_chequear_hibp_usa_la_cache_del_proceso(servidor_hibp):
+    assert main_generador_final.chequear_hibp("repetida", "online") is False
+    assert main_generador_final.chequear_hibp("repetida", "online") is False
+    assert servidor_hibp.peticiones == 1
+
+
+def test_cache_en_disco_sobrevive_al_proceso(servidor_hibp, tmp_path):
+    cache = hibp.CacheRangos(directorio=str(tmp_path / "cache"))
+    primera = [hibp.contar_online(pw, cache=cache) for pw in ("uno", "dos")]
+    fria = hibp.CacheRangos(directorio=str(tmp_path / "cache"))
+    assert [hibp.contar_online(pw, cache=fria) for pw in ("uno", "dos")] == primera
+    assert fria.stats["hits_disco"] == 2 and servidor_hibp.peticiones == 2
@@ -0,0 +1,57 @@
+"""Consultas HIBP online por lotes (cliente asíncrono) contra el servidor local de benchmarks/."""
+import asyncio
+import hashlib
+
+import pytest
+
+import hibp
+from servidor_hibp_local import ServidorHIBPLocal
+
+
+def _prefijo(password: str) -> str:
+    return hashlib.sha1(password.encode("utf-8")).hexdigest().upper()[:5]
+
+
+MISMO_PREFIJO = ["compartida-728", "compartida-46683", "compartida-92451"]
+#Contraseñas distintas cuyo SHA-1 comparte los 5 primeros hex
+
+
+def test_lote_deduplica_prefijos_compartidos(servidor_hibp):
+    assert len({_prefijo(pw) for pw in MISMO_PREFIJO}) == 1
+    otras = ["otra-1", "otra-2"]
+    conteos = asyncio.run(hibp.contar_lote_async(MISMO_PREFIJO + otras + MISMO_PREFIJO, cache=hibp.CacheRangos()))
+    assert conteos == dict.fromkeys(MISMO_PREFIJO + otras, 0)
+    assert sorted(servidor_hibp.prefijos) == sorted({_prefijo(pw) for pw in MISMO_PREFIJO + otras})
+
+
+@pytest.mark.parametrize("servidor_hibp", [{"comprometidas": ["comprometida"], "relleno": ["relleno"]}],
+                         indirect=True)
+def test_respuesta_con_relleno_cuenta_cero(servidor_hibp):
+    conteos = hibp.contar_lote(["comprometida", "relleno", "limpia"], cache=hibp.CacheRangos())
+    assert conteos == {"comprometida": 42, "relleno": 0, "limpia": 0}
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_error_http_devuelve_none(monkeypatch, status):
+    bloqueada = "bloqueada"
+    with ServidorHIBPLocal(entradas_por_rango=50, errores={_prefijo(bloqueada): status}) as srv:
+        monkeypatch.setattr(hibp, "HIBP_API_URL", srv.url)
+        monkeypatch.setattr(hibp, "_cache", hibp.CacheRangos())
+        monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+        cache = hibp.CacheRangos()
+        conteos = hibp.contar_lote([bloqueada, "limpia"], concurrencia=1, cache=cache)
+        assert conteos == {bloqueada: None, "limpia": 0}
+        assert cache.obtener(_prefijo(bloqueada)) is None and cache.obtener(_prefijo("limpia")) is not None
+
+
+def test_lote_atraviesa_el_proxy_configurado(servidor_hibp, monkeypatch):
+    #El servidor local también responde como proxy HTTP (recibe la URL absoluta); el host de la API no resuelve.
+    monkeypatch.setattr(hibp, "HIBP_API_URL", "http://hibp.invalid/range/")
+    monkeypatch.setenv("HTTP_PROXY", servidor_hibp.url.rsplit("/range/", 1)[0])
+    monkeypatch.setenv("NO_PROXY", "")
+    assert hibp.contar_lote(["uno", "dos"], cache=hibp.CacheRangos()) == {"uno": 0, "dos": 0}
+    assert servidor_hibp.peticiones == 2
+    monkeypatch.setenv("NO_PROXY", "hibp.invalid")
+    assert hibp.contar_lote(["tres"], cache=hibp.CacheRangos(), timeout=1) == {"tres": None}
+    assert servidor_hibp.peticiones == 2
+
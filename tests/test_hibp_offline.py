@@ -0,0 +1,56 @@
+"""Base HIBP offline: compilación del volcado SHA-1 y consulta por mmap, también desde chequear_hibp."""
+import hashlib
+import os
+
+import pytest
+
+import hibp
+import main_generador_final
+
+
+def _linea(password: str, conteo: int) -> str:
+    return f"{hashlib.sha1(password.encode('utf-8')).hexdigest().upper()}:{conteo}\n"
+
+
+@pytest.fixture
+def base(monkeypatch, tmp_path):
+    #Volcado desordenado (fuerza el ordenamiento de la segunda pasada) con líneas inválidas intercaladas.
+    dump = tmp_path / "pwned.txt"
+    dump.write_text(_linea("comprometida", 7) + "no-es-un-hash\n" + _linea("otra", 1) + "ABC:12\n"
+                    + "".join(_linea(f"relleno-{i}", i + 1) for i in range(300)), encoding="ascii")
+    db = str(tmp_path / "hibp.db")
+    assert hibp.compilar_base(str(dump), db) == 302
+    monkeypatch.setattr(main_generador_final, "HIBP_OFFLINE_DB", db)
+    monkeypatch.setattr(main_generador_final, "contar_online", lambda *a, **k: pytest.fail("consultó la red"))
+    yield db
+    for b in hibp._bases_abiertas.values():
+        b.cerrar()
+    hibp._bases_abiertas.clear()
+
+
+def test_conteos_del_volcado(base):
+    assert hibp.contar_offline("comprometida", base) == 7
+    assert hibp.contar_offline("otra", base) == 1
+    assert all(hibp.contar_offline(f"relleno-{i}", base) == i + 1 for i in range(300))
+    assert hibp.contar_offline("limpia", base) == 0
+    assert hibp.contar_offline("comprometida", base + ".no-existe") is None
+
+
+def test_chequear_hibp_offline_y_auto_sin_red(base):
+    for modo in ("offline", "auto"):
+        assert main_generador_final.chequear_hibp("comprometida", modo) is True
+        assert main_generador_final.chequear_hibp("limpia", modo) is False
+
+
+def test_sin_base_offline_devuelve_none(base, monkeypatch):
+    monkeypatch.setattr(main_generador_final, "HIBP_OFFLINE_DB", base + ".no-existe")
+    assert main_generador_final.chequear_hibp("comprometida", "offline") is None
+
+
+def test_base_recompilada_se_reabre(base, tmp_path):
+    assert hibp.contar_offline("nueva", base) == 0
+    dump = tmp_path / "pwned2.txt"
+    dump.write_text(_linea("nueva", 3), encoding="ascii")
+    hibp.compilar_base(str(dump), base)
+    os.utime(base, ns=(0, 1))  # mtime distinto aunque la recompilación caiga en el mismo tick del reloj
+    assert hibp.contar_offline("nueva", base) == 3
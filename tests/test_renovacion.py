@@ -0,0 +1,48 @@
+"""Menú de renovaciones: fechas de vencimiento con 'Z', con desplazamiento o inválidas en una bóveda json."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import audit
+import main_generador_final
+import storage
+
+
+@pytest.fixture
+def boveda_json(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(audit, "AUDIT_FILE", str(tmp_path / "audit.log"))
+    monkeypatch.setattr(storage, "KEY_FILE", str(tmp_path / "key.bin"))
+    monkeypatch.setattr(storage, "VAULT_FILE", str(tmp_path / "vault.json"))
+    monkeypatch.setattr(storage, "VAULT_DB", str(tmp_path / "vault.db"))
+    monkeypatch.setattr(storage, "VAULT_BACKEND", "json")
+    monkeypatch.setattr(main_generador_final, "pedir_bool", lambda *a: False)
+
+    def escribir(fechas: dict):
+        with open(storage.VAULT_FILE, "w", encoding="utf-8") as f:
+            json.dump([{"alias": a, "password": "x", "created_at": "", "expires_at": x, "meta": {}}
+                       for a, x in fechas.items()], f)
+    return escribir
+
+
+def test_fechas_con_zona_y_con_z(boveda_json, capsys):
+    en_3_dias = datetime.utcnow() + timedelta(days=3, hours=1)
+    boveda_json({"con_zona": "2020-01-01T00:00:00+00:00",
+                 "con_z": en_3_dias.isoformat() + "Z",
+                 "otra_zona": (en_3_dias + timedelta(hours=2)).isoformat() + "+02:00"})
+    main_generador_final.procesar_renovaciones()
+    salida = capsys.readouterr().out
+    assert "- con_z expira en 3 días" in salida
+    assert "- otra_zona expira en 3 días" in salida
+    assert "- con_zona expiró el 2020-01-01T00:00:00+00:00" in salida
+
+
+def test_fecha_invalida_no_corta_el_listado(boveda_json, capsys, monkeypatch):
+    boveda_json({"vencida": "2020-01-01T00:00:00Z", "rota": "2020-01-01T00:00:00Z"})
+    items = storage.vencimientos(7)
+    next(it for it in items if it["alias"] == "rota")["expires_at"] = "no es una fecha"
+    monkeypatch.setattr(main_generador_final, "vencimientos", lambda dias: items)
+    main_generador_final.procesar_renovaciones()
+    salida = capsys.readouterr().out
+    assert "- vencida expiró el" in salida and "rota" not in salida
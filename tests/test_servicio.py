@@ -0,0 +1,114 @@
+"""Autenticación del servicio HTTP (src/servicio.py), levantado como subproceso en un directorio temporal."""
+import json
+import os
+import stat
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+import servicio
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    entorno = {k: v for k, v in os.environ.items() if k != "SERVICIO_TOKEN"}
+    entorno.update(HIBP_MODO="offline", NO_PROXY="127.0.0.1")
+    proceso = subprocess.Popen([sys.executable, os.path.join(SRC, "servicio.py"), "--puerto", "0"],
+                               cwd=tmp_path, env=entorno, stdout=subprocess.PIPE, text=True)
+    try:
+        url = proceso.stdout.readline().split()[-1]
+        proceso.stdout.readline()
+        yield url, tmp_path
+    finally:
+        proceso.terminate()
+        proceso.wait(10)
+
+
+def _peticion(url: str, metodo: str = "GET", datos=None, token: str = None):
+    cabeceras = {"Authorization": f"Bearer {token}"} if token is not None else {}
+    cuerpo = json.dumps(datos).encode() if datos is not None else None
+    req = urllib.request.Request(url, data=cuerpo, method=metodo, headers=cabeceras)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_token_generado_y_exigido(servidor):
+    url, directorio = servidor
+    ruta = directorio / servicio.TOKEN_ARCHIVO
+    assert stat.S_IMODE(os.stat(ruta).st_mode) == 0o600
+    token = ruta.read_text().strip()
+    assert _peticion(url + "/salud")[0] == 200
+    assert _peticion(url + "/boveda", "POST", {"alias": "a", "forzar": True})[0] == 401
+    assert _peticion(url + "/boveda", "POST", {"alias": "a", "forzar": True}, token="otro")[0] == 401
+    status, guardada = _peticion(url + "/boveda", "POST", {"alias": "a", "forzar": True}, token=token)
+    assert status == 201
+    assert _peticion(url + "/boveda/a")[0] == 401
+    status, entrada = _peticion(url + "/boveda/a", token=token)
+    assert status == 200 and entrada["password_plain"] == guardada["password"]
+
+
+def test_entropia_en_evaluar(servidor):
+    url, directorio = servidor
+    token = (directorio / servicio.TOKEN_ARCHIVO).read_text().strip()
+    status, r = _peticion(url + "/evaluar", "POST", {"passwords": ["password1", "xK9#mQ2$vL7!"], "entropia": True},
+                          token=token)
+    assert status == 200
+    debil, fuerte = r["resultados"]
+    assert debil["nivel"] < fuerte["nivel"] and debil["bits"] < fuerte["bits"]
+
+
+def test_sin_autenticacion_solo_en_loopback():
+    assert servicio.es_loopback("127.0.0.1") and servicio.es_loopback("::1") and servicio.es_loopback("localhost")
+    assert not servicio.es_loopback("0.0.0.0") and not servicio.es_loopback("192.168.1.10")
+    with pytest.raises(SystemExit):
+        servicio.main(["--host", "0.0.0.0", "--sin-autenticacion"])
+
+
+def _respuesta_cruda(envios, tiempo_cabeceras: float = servicio.TIEMPO_CABECERAS) -> bytes:
+    #Levanta solo el manejador de conexiones en este proceso, envía bytes crudos y devuelve la respuesta completa.
+    import asyncio
+
+    async def probar():
+        app = servicio.ServicioContrasenas(token="t")
+        srv = await asyncio.start_server(app.atender, "127.0.0.1", 0)
+        try:
+            lector, escritor = await asyncio.open_connection(*srv.sockets[0].getsockname()[:2])
+            for datos in envios:
+                escritor.write(datos)
+                await escritor.drain()
+            respuesta = await asyncio.wait_for(lector.read(), 5)
+            escritor.close()
+            return respuesta
+        finally:
+            srv.close()
+            await srv.wait_closed()
+
+    original = servicio.TIEMPO_CABECERAS
+    servicio.TIEMPO_CABECERAS = tiempo_cabeceras
+    try:
+        return asyncio.run(probar())
+    finally:
+        servicio.TIEMPO_CABECERAS = original
+
+
+def test_cabeceras_fuera_de_limite():
+    linea_larga = b"X-Relleno: " + b"a" * (128 * 1024) + b"\r\n\r\n"
+    assert _respuesta_cruda([b"GET /salud HTTP/1.1\r\n", linea_larga]).startswith(b"HTTP/1.1 431 ")
+    muchas = b"".join(b"X-%d: 1\r\n" % i for i in range(servicio.MAX_CABECERAS + 1)) + b"\r\n"
+    assert _respuesta_cruda([b"GET /salud HTTP/1.1\r\n", muchas]).startswith(b"HTTP/1.1 431 ")
+    assert _respuesta_cruda([b"GET /" + b"a" * (128 * 1024) + b" HTTP/1.1\r\n"]).startswith(b"HTTP/1.1 400 ")
+
+
+def test_cabeceras_incompletas_expiran():
+    respuesta = _respuesta_cruda([b"GET /salud HTTP/1.1\r\nHost: x\r\n"], tiempo_cabeceras=0.2)
+    assert respuesta.startswith(b"HTTP/1.1 408 ")
+    ok = _respuesta_cruda([b"GET /salud HTTP/1.1\r\nConnection: close\r\n\r\n"])
+    assert ok.startswith(b"HTTP/1.1 200 ")
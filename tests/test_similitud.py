@@ -0,0 +1,59 @@
+"""El núcleo de similitud (ratio_similitud, ConsultaSimilitud) da exactamente lo mismo que difflib.SequenceMatcher."""
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from validator import LONGITUD_AUTOJUNK, ConsultaSimilitud, es_demasiado_similar, ratio_similitud
+
+UMBRALES = (0.0, 0.5, 0.8, 0.95)
+
+
+def _mutar(s: str, rnd: random.Random, alfabeto: str) -> str:
+    chars = list(s)
+    for _ in range(rnd.randint(0, 4)):
+        op = rnd.randrange(3)
+        if op == 0 and chars:
+            chars[rnd.randrange(len(chars))] = rnd.choice(alfabeto)
+        elif op == 1:
+            chars.insert(rnd.randint(0, len(chars)), rnd.choice(alfabeto))
+        elif chars:
+            del chars[rnd.randrange(len(chars))]
+    return "".join(chars)
+
+
+def _pares():
+    rnd = random.Random(9)
+    pares = [("", ""), ("", "a"), ("a", ""), ("abc", "abc"), ("Clave#2024", "Clave#2024"), ("aaaa", "aa"),
+             ("abcd", "dcba"), ("ñandú€", "ñandu€"), ("x" * 300, "x" * 300)]
+    for alfabeto in ("ab", "abcdef", "aB3!xyZ9#ñ", "".join(map(chr, range(33, 127)))):
+        for _ in range(150):
+            a = "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 24)))
+            b = _mutar(a, rnd, alfabeto) if rnd.random() < 0.6 else \
+                "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 24)))
+            pares.append((a, b))
+    # Alrededor de LONGITUD_AUTOJUNK, en ambas posiciones (difflib solo aplica autojunk a la segunda secuencia)
+    for n in (LONGITUD_AUTOJUNK - 1, LONGITUD_AUTOJUNK, LONGITUD_AUTOJUNK + 37):
+        for alfabeto in ("ab", "abcdefghij"):
+            largo = "".join(rnd.choice(alfabeto) for _ in range(n))
+            pares += [(largo, _mutar(largo, rnd, alfabeto)), (largo[:20], largo), (largo, largo[:20]), (largo, largo)]
+    return pares
+
+
+PARES = _pares()
+
+
+def test_ratio_igual_a_difflib():
+    for a, b in PARES:
+        assert ratio_similitud(a, b) == SequenceMatcher(None, a, b).ratio(), (a, b)
+
+
+@pytest.mark.parametrize("umbral", UMBRALES)
+def test_consulta_igual_a_difflib(umbral):
+    for a, b in PARES:
+        assert ConsultaSimilitud(a, umbral).demasiado_similar(b) == (SequenceMatcher(None, a, b).ratio() > umbral), (a, b)
+
+
+def test_es_demasiado_similar_umbral_por_defecto():
+    for a, b in PARES:
+        assert es_demasiado_similar(a, b) == (SequenceMatcher(None, a, b).ratio() > 0.8)
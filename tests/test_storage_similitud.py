@@ -0,0 +1,76 @@
+"""Filtro de similitud de la bóveda: los sketches solo existen en memoria y el filtro no pierde candidatas."""
+import json
+import random
+import sqlite3
+
+import pytest
+
+import storage
+from validator import ratio_similitud
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def boveda(request, monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "KEY_FILE", str(tmp_path / "key.bin"))
+    monkeypatch.setattr(storage, "VAULT_FILE", str(tmp_path / "vault.json"))
+    monkeypatch.setattr(storage, "VAULT_DB", str(tmp_path / "vault.db"))
+    monkeypatch.setattr(storage, "VAULT_BACKEND", request.param)
+    storage.generar_key()
+    yield request.param
+    for con in storage._conexiones.values():
+        con.close()
+    storage._conexiones.clear()
+    storage.invalidar_cache_cifrado()
+
+
+def test_no_se_guarda_sketch(boveda):
+    storage.guardar_contrasena_cifrada("Secreta#123", "a")
+    storage.guardar_contrasena_cifrada("Secreta#123", "b")
+    if boveda == "json":
+        with open(storage.VAULT_FILE, encoding="utf-8") as f:
+            assert all("sim" not in e for e in json.load(f))
+    else:
+        con = sqlite3.connect(storage.VAULT_DB)
+        assert con.execute("SELECT COUNT(*) FROM entradas WHERE sim IS NOT NULL").fetchone()[0] == 0
+        con.close()
+
+
+def test_sketches_de_versiones_anteriores_se_borran(boveda):
+    storage.guardar_contrasena_cifrada("Secreta#123", "a")
+    if boveda == "json":
+        with open(storage.VAULT_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        data[0]["sim"] = "01" * storage.SIM_BUCKETS
+        with open(storage.VAULT_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        storage.guardar_contrasena_cifrada("Otra!clave9", "b")
+        with open(storage.VAULT_FILE, encoding="utf-8") as f:
+            assert all("sim" not in e for e in json.load(f))
+    else:
+        for con in storage._conexiones.values():
+            con.close()
+        storage._conexiones.clear()
+        con = sqlite3.connect(storage.VAULT_DB)
+        con.execute("UPDATE entradas SET sim = ?", ("01" * storage.SIM_BUCKETS,))
+        con.execute("PRAGMA user_version = 0")
+        con.commit()
+        con.close()
+        storage.obtener_entrada("a")
+        con = sqlite3.connect(storage.VAULT_DB)
+        assert con.execute("SELECT COUNT(*) FROM entradas WHERE sim IS NOT NULL").fetchone()[0] == 0
+        con.close()
+
+
+def test_filtro_igual_a_fuerza_bruta(boveda):
+    rnd = random.Random(3)
+    alfabeto = "abcdefXYZ0123!?#"
+    guardadas = ["".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 20))) for _ in range(60)]
+    with storage.lote_boveda():
+        for i, pw in enumerate(guardadas):
+            storage.guardar_contrasena_cifrada(pw, f"a{i}")
+    filtro = storage.FiltroSimilitud(0.6)
+    for _ in range(40):
+        consulta = "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 20)))
+        candidatas = filtro.candidatos(consulta)
+        assert set(candidatas) <= set(guardadas)
+        assert {pw for pw in guardadas if ratio_similitud(consulta, pw) > 0.6} <= set(candidatas)